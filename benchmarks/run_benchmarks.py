@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for scanning, video lookup, frame extraction (accurate and fast) and page generation
+Runs the simple viewer against synthetic corpora at several scales, records
+wall time and peak memory (tracemalloc) per stage, and compares against a
+saved baseline: any stage slower or hungrier than the baseline by more than
+the tolerance fails the run.
+Usage: python3 benchmarks/run_benchmarks.py [--scales small,medium] [--baseline FILE] [--save-baseline]
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "src"))
+
+from synthetic_corpus import generate_corpus
+from simple_viewer import SimpleSignAnnotate
+from eaf_session import open_session, clear_sessions
+from records import FrameRef
+from frame_cache import preview_name
+from sampling import sample_annotation, SAMPLING_CONFIGS
+
+SCALES = {
+    'small': {'files': 10, 'annotations': 200, 'good': 10},
+    'medium': {'files': 50, 'annotations': 1000, 'good': 30},
+    'large': {'files': 200, 'annotations': 3000, 'good': 60},
+}
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+TOLERANCE = 0.25          # fail when 25% slower / larger than the baseline...
+MIN_SECONDS_DELTA = 0.05  # ...and by more than this, so tiny timings don't flap
+MIN_MB_DELTA = 1.0
+EXTRACT_ANNOTATIONS = 5   # annotations per extraction benchmark (each runs ffmpeg per video)
+
+def ffmpeg_available():
+    return shutil.which('ffmpeg') is not None
+
+def measure(func, repeat=3):
+    """Best wall time over repeat runs, then peak traced memory of one more run"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds': round(best, 4), 'peak_mb': round(peak / 1024 / 1024, 2)}, result
+
+def synthetic_frames(frame_cache, filename, count, preview_bytes=6000):
+    """FrameRefs shaped like prepare_file output, with preview-sized entries staged in the frame cache"""
+    frames = []
+    for i in range(count):
+        frame = FrameRef(f"ann{i // 2 + 1}_v{i % 2 + 1}_midpoint", 'midpoint', 0.475, i * 1.5,
+                         f"/videos/cam{i % 2 + 1}.mp4", 0, i // 2 + 1, "GOOD", i * 1000, i * 1000 + 600, i % 2 + 1)
+        frame_cache.stage(filename, preview_name(frame.key), b'\xff' * preview_bytes)
+        frames.append(frame)
+    return frames
+
+def run_scale(name, config, work_dir, with_videos):
+    corpus_dir = os.path.join(work_dir, name)
+    print(f"🏗️  Generating {name} corpus: {config['files']} files, "
+          f"{config['annotations']} annotations, {config['good']} GOOD")
+    generate_corpus(corpus_dir, with_videos=with_videos, **config)
+
+    viewer = SimpleSignAnnotate(output_dir=corpus_dir)
+    viewer.shard = None  # benchmark the whole synthetic corpus whatever BSL_SHARD says
+    results = {}
+
+    def scan_cold():
+        if os.path.exists(viewer.scan_index.index_file):
+            os.remove(viewer.scan_index.index_file)
+        viewer.scan_index.entries = {}
+        clear_sessions()
+        return viewer.find_conversation_files()
+
+    results['find_conversation_files (cold)'], files = measure(scan_cold)
+    results['find_conversation_files (indexed)'], files = measure(viewer.find_conversation_files)
+    if len(files) != config['files']:
+        print(f"  ⚠️  Expected {config['files']} qualifying files, scan found {len(files)}")
+
+    # Cold: includes the EAF parse; the session cache would otherwise hide it after the first repeat
+    def find_videos_cold():
+        clear_sessions()
+        return [viewer.find_video_files(f) for f in files]
+
+    results['find_video_files'], videos = measure(find_videos_cold)
+    results['find_video_files (session)'], videos = measure(lambda: [viewer.find_video_files(f) for f in files])
+
+    if with_videos and files:
+        file_path = files[0]
+        filename = os.path.basename(file_path)
+        session = open_session(file_path)
+        annotations = session.good_annotations[:EXTRACT_ANNOTATIONS]
+        file_videos = viewer.find_video_files(file_path, session)
+        viewer.frame_cache.decode_mode = 'accurate'  # whatever BSL_DECODE_MODE says; fast mode has its own stage
+
+        offsets_ms = [session.video_offset(os.path.basename(video_path)) for video_path in file_videos]
+
+        def extract():
+            frames = []
+            for ann_idx, annotation in enumerate(annotations, 1):
+                for vid_idx, (video_path, offset_ms) in enumerate(zip(file_videos, offsets_ms), 1):
+                    frames.extend(sample_annotation(viewer.frame_cache, filename, ann_idx, annotation, vid_idx,
+                                                    video_path, offset_ms, viewer.sampling_points))
+            return frames
+
+        results['extract_annotation_frames'], frames = measure(extract, repeat=1)
+        if len(frames) != len(annotations) * len(file_videos):
+            print(f"  ⚠️  Extracted {len(frames)} of {len(annotations) * len(file_videos)} frames")
+
+        # Fast triage mode: keyframe-only decode; mean_drift_s is how far its frames land from the requested points
+        viewer.frame_cache.decode_mode = 'fast'
+        results['extract_annotation_frames (fast)'], fast_frames = measure(extract, repeat=1)
+        viewer.frame_cache.decode_mode = 'accurate'
+        if fast_frames:
+            results['extract_annotation_frames (fast)']['mean_drift_s'] = round(
+                sum(abs(frame.drift_seconds) for frame in fast_frames) / len(fast_frames), 3)
+
+        # Four points per annotation: one decode pass each vs. one seek-and-decode per point
+        points = SAMPLING_CONFIGS['four_point']
+
+        def extract_four_points(single_pass):
+            frames = []
+            for ann_idx, annotation in enumerate(annotations, 1):
+                for vid_idx, video_path in enumerate(file_videos, 1):
+                    for batch in ([points] if single_pass else [(point,) for point in points]):
+                        frames.extend(sample_annotation(viewer.frame_cache, filename, ann_idx, annotation,
+                                                        vid_idx, video_path, 0, batch))
+            return frames
+
+        results['four_point (per point)'], _ = measure(lambda: extract_four_points(False), repeat=1)
+        results['four_point (single pass)'], _ = measure(lambda: extract_four_points(True), repeat=1)
+
+    # One archive per prepared file, then the page rendered from it (previews read through the memory map)
+    def write_archive():
+        frames = synthetic_frames(viewer.frame_cache, "synthetic.eaf", config['good'] * 2)
+        viewer.frame_cache.save_payload("synthetic.eaf", frames, viewer.sampling_points)
+        return frames
+
+    results['save_payload (archive)'], frames = measure(write_archive)
+    results['generate_simple_html'], html = measure(
+        lambda: viewer.generate_simple_html("synthetic.eaf", frames, config['files']))
+    results['generate_simple_html']['html_kb'] = round(len(html) / 1024, 1)
+
+    return results
+
+def compare(results, baseline, tolerance):
+    """Regressions against the baseline as printable lines"""
+    regressions = []
+    for scale, stages in results.items():
+        for stage, now in stages.items():
+            before = baseline.get(scale, {}).get(stage)
+            if not before:
+                continue
+            if now['seconds'] > before['seconds'] * (1 + tolerance) and now['seconds'] - before['seconds'] > MIN_SECONDS_DELTA:
+                regressions.append(f"{scale} / {stage}: {before['seconds']:.3f}s -> {now['seconds']:.3f}s")
+            if now['peak_mb'] > before['peak_mb'] * (1 + tolerance) and now['peak_mb'] - before['peak_mb'] > MIN_MB_DELTA:
+                regressions.append(f"{scale} / {stage}: {before['peak_mb']:.1f}MB -> {now['peak_mb']:.1f}MB peak")
+    return regressions
+
+def print_table(results, baseline):
+    print(f"\n{'scale':<8} {'stage':<36} {'seconds':>9} {'peak MB':>9} {'baseline':>9}")
+    print("-" * 75)
+    for scale, stages in results.items():
+        for stage, now in stages.items():
+            before = baseline.get(scale, {}).get(stage)
+            before_text = f"{before['seconds']:.4f}" if before else "-"
+            print(f"{scale:<8} {stage:<36} {now['seconds']:>9.4f} {now['peak_mb']:>9.2f} {before_text:>9}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the review pipeline on synthetic corpora")
+    parser.add_argument('--scales', default='small,medium', help=f"Comma-separated, from: {', '.join(SCALES)}")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Write these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--output', help="Also write results JSON here")
+    parser.add_argument('--keep', action='store_true', help="Keep the generated corpora")
+    args = parser.parse_args()
+
+    scales = [s.strip() for s in args.scales.split(',') if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        print(f"❌ Unknown scale(s): {', '.join(unknown)}")
+        sys.exit(2)
+
+    with_videos = ffmpeg_available()
+    if not with_videos:
+        print("⚠️  ffmpeg not found - skipping synthetic videos and extract_annotation_frames")
+
+    work_dir = tempfile.mkdtemp(prefix="bsl-bench-")
+    results = {}
+    try:
+        for scale in scales:
+            results[scale] = run_scale(scale, SCALES[scale], work_dir, with_videos)
+    finally:
+        if args.keep:
+            print(f"📁 Corpora kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Baseline saved: {args.baseline}")
+        return
+
+    if not baseline:
+        print(f"\nℹ️  No baseline at {args.baseline} - run with --save-baseline to create one")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"   {line}")
+        sys.exit(1)
+    print("\n✅ No regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Synthetic BSL corpus for benchmarks
+Generates EAFs with a configurable number of annotations and GOOD signs
+(RH and _LH variants, TIME_ORIGIN offsets per camera) and matching
+ffmpeg testsrc videos, laid out like CAVA_Data/EAFs and CAVA_Data/Videos.
+Usage: python3 synthetic_corpus.py OUTPUT_DIR [--files N] [--annotations N] [--good N]
+"""
+
+import os
+import shutil
+import argparse
+import subprocess
+import pympi
+
+REGIONS = ['BF', 'BM', 'CF', 'GW', 'LN', 'MC']
+FILLER_ANNOTATIONS = 600  # other tiers; keeps every EAF above the 100KB scan threshold
+
+def video_name(base_name, camera):
+    return f"{base_name}-cam{camera}.mp4"
+
+def make_video(path, seconds, width=320, height=240):
+    cmd = [
+        'ffmpeg', '-f', 'lavfi', '-i', f'testsrc=duration={seconds}:size={width}x{height}:rate=25',
+        '-pix_fmt', 'yuv420p', '-g', '50', '-y', path
+    ]
+    subprocess.run(cmd, capture_output=True, check=True)
+
+def make_eaf(path, base_name, annotations, good, video_seconds, offsets_ms, left_handed=False):
+    eaf = pympi.Elan.Eaf()
+    tier = "LH-IDgloss" if left_handed else "RH-IDgloss"
+    eaf.add_tier(tier)
+    eaf.add_tier("Free Translation")
+
+    for camera, offset_ms in enumerate(offsets_ms, 1):
+        eaf.add_linked_file(f"file:///corpus/{video_name(base_name, camera)}",
+                            mimetype="video/mp4", time_origin=offset_ms)
+
+    # Spread annotations over the video, leaving room for the largest offset
+    span_ms = video_seconds * 1000 - max(offsets_ms) - 100
+    step_ms = max(span_ms // annotations, 2)
+    good_every = max(annotations // good, 1) if good else 0
+    good_left = good
+    for i in range(annotations):
+        start = i * step_ms
+        is_good = good_left and i % good_every == 0
+        eaf.add_annotation(tier, start, start + max(step_ms * 3 // 4, 1), "GOOD" if is_good else f"SIGN{i % 400}")
+        good_left -= 1 if is_good else 0
+
+    step_filler = max(span_ms // FILLER_ANNOTATIONS, 2)
+    for i in range(FILLER_ANNOTATIONS):
+        start = i * step_filler
+        eaf.add_annotation("Free Translation", start, start + 1,
+                           f"Synthetic translation line {i} padded to a realistic length for the corpus")
+
+    eaf.to_file(path)
+
+def generate_corpus(output_dir, files=10, annotations=200, good=10, video_seconds=60,
+                    cameras=2, lh_fraction=0.2, offsets_ms=(0, 1200), with_videos=True):
+    """Write a synthetic corpus under output_dir/CAVA_Data; returns the EAF paths"""
+    eaf_folder = os.path.join(output_dir, "CAVA_Data", "EAFs")
+    video_folder = os.path.join(output_dir, "CAVA_Data", "Videos")
+    os.makedirs(eaf_folder, exist_ok=True)
+    os.makedirs(video_folder, exist_ok=True)
+
+    offsets_ms = list(offsets_ms)[:cameras] + [0] * max(cameras - len(offsets_ms), 0)
+
+    # One encode per camera, linked under every file's video names
+    sources = []
+    if with_videos:
+        for camera in range(1, cameras + 1):
+            source = os.path.join(video_folder, f".source-cam{camera}.mp4")
+            if not os.path.exists(source):
+                make_video(source, video_seconds)
+            sources.append(source)
+
+    lh_every = int(1 / lh_fraction) if lh_fraction else 0
+    paths = []
+    for i in range(files):
+        left_handed = bool(lh_every) and i % lh_every == 0
+        base_name = f"{REGIONS[i % len(REGIONS)]}{i // len(REGIONS) + 1:02d}F{i:03d}"
+        filename = f"{base_name}_LH.eaf" if left_handed else f"{base_name}.eaf"
+        path = os.path.join(eaf_folder, filename)
+        make_eaf(path, base_name, annotations, good, video_seconds, offsets_ms, left_handed)
+        paths.append(path)
+
+        for camera, source in enumerate(sources, 1):
+            target = os.path.join(video_folder, video_name(base_name, camera))
+            if not os.path.exists(target):
+                try:
+                    os.link(source, target)
+                except OSError:
+                    shutil.copyfile(source, target)
+
+    return paths
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic BSL corpus")
+    parser.add_argument('output_dir')
+    parser.add_argument('--files', type=int, default=10)
+    parser.add_argument('--annotations', type=int, default=200, help="Dominant-hand annotations per file")
+    parser.add_argument('--good', type=int, default=10, help="GOOD annotations per file")
+    parser.add_argument('--video-seconds', type=int, default=60)
+    parser.add_argument('--lh-fraction', type=float, default=0.2, help="Share of _LH (left-handed) files")
+    parser.add_argument('--offsets', default="0,1200", help="TIME_ORIGIN per camera in ms (default: 0,1200)")
+    parser.add_argument('--no-videos', action='store_true')
+    args = parser.parse_args()
+
+    paths = generate_corpus(args.output_dir, args.files, args.annotations, args.good, args.video_seconds,
+                            lh_fraction=args.lh_fraction,
+                            offsets_ms=[int(v) for v in args.offsets.split(',')],
+                            with_videos=not args.no_videos)
+    print(f"✅ Generated {len(paths)} EAFs in {os.path.join(args.output_dir, 'CAVA_Data')}")
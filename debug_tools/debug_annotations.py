@@ -4,7 +4,14 @@ Debug script to check what annotations are found in EAF files
 """
 
 import os
-import pympi
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+from timing import Timer, default_log_file
+from profiling import run_main
+from eaf_session import open_session
+
+timer = Timer(default_log_file())
 
 def debug_eaf_file(file_path):
     """Debug annotations in a single EAF file"""
@@ -13,25 +20,27 @@ def debug_eaf_file(file_path):
     print("=" * 50)
 
     try:
-        eaf = pympi.Elan.Eaf(file_path)
+        with timer.span('eaf_parse', file=filename) as span:
+            session = open_session(file_path)
+            span['bytes'] = os.path.getsize(file_path)
 
         # Check dominant hand based on filename
         is_left_handed = filename.upper().endswith('_LH.EAF')
-        dominant_tier = "LH-IDgloss" if is_left_handed else "RH-IDgloss"
+        dominant_tier = session.dominant_tier
 
         print(f"📋 Dominant hand: {'Left' if is_left_handed else 'Right'}")
         print(f"🎯 Target tier: {dominant_tier}")
 
         # Get all tier names
-        all_tiers = list(eaf.get_tier_names())
+        all_tiers = list(session.eaf.get_tier_names())
         print(f"📊 Available tiers: {all_tiers}")
 
-        if dominant_tier not in all_tiers:
+        if not session.has_dominant_tier:
             print(f"❌ Dominant tier '{dominant_tier}' not found!")
             return False
 
         # Get dominant tier data
-        dominant_data = eaf.get_annotation_data_for_tier(dominant_tier)
+        dominant_data = session.dominant_data
 
         # Check all annotations
         all_annotations = []
@@ -89,12 +98,14 @@ def main():
     print("=" * 50)
 
     files_found = []
-    for root, dirs, files in os.walk(eaf_folder):
-        for file in files:
-            if file.endswith('.eaf'):
-                file_path = os.path.join(root, file)
-                if os.path.getsize(file_path) > 100 * 1024:  # >100KB
-                    files_found.append(file_path)
+    with timer.span('scan') as span:
+        for root, dirs, files in os.walk(eaf_folder):
+            for file in files:
+                if file.endswith('.eaf'):
+                    file_path = os.path.join(root, file)
+                    if os.path.getsize(file_path) > 100 * 1024:  # >100KB
+                        files_found.append(file_path)
+        span['files'] = len(files_found)
 
     print(f"📁 Found {len(files_found)} EAF files to check")
 
@@ -105,6 +116,7 @@ def main():
             suitable_count += 1
 
     print(f"\n📊 Summary: {suitable_count}/3 files suitable")
+    timer.summary()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run_main("debug_annotations", main)  # --profile [cprofile|sampled]
\ No newline at end of file
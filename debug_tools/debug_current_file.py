@@ -4,9 +4,16 @@ Debug the current file being processed to check video extraction
 """
 
 import os
+import sys
 import tempfile
 import subprocess
-import pympi
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+from timing import Timer, default_log_file
+from profiling import run_main
+from eaf_session import open_session
+
+timer = Timer(default_log_file())
 
 def debug_current_file():
     # This should match BF02M25WDC.eaf based on the output
@@ -21,10 +28,10 @@ def debug_current_file():
     print("=" * 50)
 
     # Get GOOD annotations
-    eaf = pympi.Elan.Eaf(file_path)
-    is_left_handed = filename.upper().endswith('_LH.EAF')
-    dominant_tier = "LH-IDgloss" if is_left_handed else "RH-IDgloss"
-    dominant_data = eaf.get_annotation_data_for_tier(dominant_tier)
+    with timer.span('eaf_parse', file=filename) as span:
+        session = open_session(file_path)
+        dominant_data = session.dominant_data
+        span['annotations'] = len(dominant_data)
 
     good_annotations = []
     for start_time, end_time, value in dominant_data:
@@ -75,7 +82,9 @@ def debug_current_file():
 
         return found_videos
 
-    videos = find_video_files(filename)
+    with timer.span('video_lookup', file=filename) as span:
+        videos = find_video_files(filename)
+        span['videos'] = len(videos)
     print(f"📹 Found {len(videos)} video files:")
     for i, video in enumerate(videos, 1):
         print(f"  Video {i}: {video}")
@@ -108,7 +117,10 @@ def debug_current_file():
                     'ffmpeg', '-ss', str(frame_time_seconds), '-i', video_path,
                     '-vframes', '1', '-q:v', '2', '-y', frame_path
                 ]
-                result = subprocess.run(cmd, capture_output=True, check=True)
+                with timer.span('ffmpeg', kind='full', file=filename, video=os.path.basename(video_path),
+                                time_seconds=frame_time_seconds) as span:
+                    result = subprocess.run(cmd, capture_output=True, check=True)
+                    span['bytes'] = os.path.getsize(frame_path) if os.path.exists(frame_path) else 0
 
                 if os.path.exists(frame_path):
                     file_size = os.path.getsize(frame_path)
@@ -125,5 +137,7 @@ def debug_current_file():
         import shutil
         shutil.rmtree(temp_dir, ignore_errors=True)
 
+    timer.summary()
+
 if __name__ == "__main__":
-    debug_current_file()
\ No newline at end of file
+    run_main("debug_current_file", debug_current_file)  # --profile [cprofile|sampled]
\ No newline at end of file
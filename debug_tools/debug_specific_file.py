@@ -4,7 +4,14 @@ Debug specific file BF01F28WDC.eaf to check GOOD annotations and timing
 """
 
 import os
-import pympi
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+from timing import Timer, default_log_file
+from profiling import run_main
+from eaf_session import open_session
+
+timer = Timer(default_log_file())
 
 def debug_specific_file():
     file_path = "/Volumes/2TB HD/BSLC EAFs (copy)/Conversation/Belfast/BF01F28WDC.eaf"
@@ -17,19 +24,21 @@ def debug_specific_file():
     print("=" * 50)
 
     try:
-        eaf = pympi.Elan.Eaf(file_path)
+        with timer.span('eaf_parse', file=os.path.basename(file_path)) as span:
+            session = open_session(file_path)
+            span['bytes'] = os.path.getsize(file_path)
 
         # Check dominant hand (should be right hand for this file)
         filename = "BF01F28WDC.eaf"
         is_left_handed = filename.upper().endswith('_LH.EAF')
-        dominant_tier = "LH-IDgloss" if is_left_handed else "RH-IDgloss"
+        dominant_tier = session.dominant_tier
 
         print(f"📋 Filename: {filename}")
         print(f"📋 Dominant hand: {'Left' if is_left_handed else 'Right'}")
         print(f"🎯 Target tier: {dominant_tier}")
 
         # Get dominant tier data
-        dominant_data = eaf.get_annotation_data_for_tier(dominant_tier)
+        dominant_data = session.dominant_data
 
         # Find all GOOD annotations with detailed timing
         good_annotations = []
@@ -74,17 +83,20 @@ def debug_specific_file():
         ]
 
         found_videos = []
-        for pattern in video_patterns:
-            video_path = os.path.join(video_folder, pattern)
-            if os.path.exists(video_path):
-                found_videos.append(video_path)
-                print(f"  ✅ Found: {pattern}")
-            else:
-                print(f"  ❌ Missing: {pattern}")
+        with timer.span('video_lookup', file=filename) as span:
+            for pattern in video_patterns:
+                video_path = os.path.join(video_folder, pattern)
+                if os.path.exists(video_path):
+                    found_videos.append(video_path)
+                    print(f"  ✅ Found: {pattern}")
+                else:
+                    print(f"  ❌ Missing: {pattern}")
+            span['videos'] = len(found_videos)
 
         if len(found_videos) < 2:
             print(f"⚠️  Warning: Only found {len(found_videos)} video files, expected 2")
 
+        timer.summary()
         return good_annotations, found_videos
 
     except Exception as e:
@@ -92,4 +104,4 @@ def debug_specific_file():
         return None, None
 
 if __name__ == "__main__":
-    debug_specific_file()
\ No newline at end of file
+    run_main("debug_specific_file", debug_specific_file)  # --profile [cprofile|sampled]
\ No newline at end of file
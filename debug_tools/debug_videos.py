@@ -4,6 +4,13 @@ Debug video file finding for BF01F28WDC.eaf
 """
 
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+from timing import Timer, default_log_file
+from profiling import run_main
+
+timer = Timer(default_log_file())
 
 def debug_video_finding():
     filename = "BF01F28WDC.eaf"
@@ -37,21 +44,24 @@ def debug_video_finding():
 
     print(f"🔍 Checking video files:")
     found_videos = []
-    for pattern in patterns:
-        video_path = os.path.join(video_folder, pattern)
-        print(f"  📁 Checking: {video_path}")
-        if os.path.exists(video_path):
-            found_videos.append(video_path)
-            print(f"    ✅ Found!")
-        else:
-            print(f"    ❌ Not found")
+    with timer.span('video_lookup', file=filename) as span:
+        for pattern in patterns:
+            video_path = os.path.join(video_folder, pattern)
+            print(f"  📁 Checking: {video_path}")
+            if os.path.exists(video_path):
+                found_videos.append(video_path)
+                print(f"    ✅ Found!")
+            else:
+                print(f"    ❌ Not found")
+        span['videos'] = len(found_videos)
 
     print(f"\n📊 Summary:")
     print(f"  Found {len(found_videos)} videos:")
     for i, video in enumerate(found_videos, 1):
         print(f"    Video {i}: {video}")
 
+    timer.summary()
     return found_videos
 
 if __name__ == "__main__":
-    debug_video_finding()
\ No newline at end of file
+    run_main("debug_videos", debug_video_finding)  # --profile [cprofile|sampled]
\ No newline at end of file
@@ -8,8 +8,46 @@ import subprocess
 import sys
 import os
 import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from profiling import run_main
+from leases import default_server_url, default_server_port
+
+SERVER_URL = default_server_url()
+SERVICE_NAME = "bsl-decision-server"
+STARTUP_TIMEOUT = 15  # seconds to wait for a freshly started server
+
+def server_health(server_url=SERVER_URL, timeout=0.5):
+    """'ok' if our decision server answers /health, 'other' if something else does, None if nothing"""
+    import json
+    import urllib.request
+    import urllib.error
+
+    try:
+        with urllib.request.urlopen(f"{server_url}/health", timeout=timeout) as response:
+            health = json.loads(response.read().decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        return 'starting' if e.code == 503 else 'other'
+    except (OSError, ValueError):
+        return None
+    return health.get('status') if health.get('service') == SERVICE_NAME else 'other'
+
+def wait_for_server(server_process, timeout=STARTUP_TIMEOUT):
+    """Poll /health with short exponential backoff until the server is ready"""
+    deadline = time.monotonic() + timeout
+    delay = 0.02
+    while time.monotonic() < deadline:
+        if server_health() == 'ok':
+            return True
+        if server_process is not None and server_process.poll() is not None:
+            return False  # server exited (e.g. port taken)
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+    return False
 
 def main():
+    started = time.perf_counter()
     print("Bad Offset Identifier Tool")
     print("=" * 50)
 
@@ -27,50 +65,54 @@ def main():
     print("Starting assessment system...")
 
     try:
-        # Start decision server in background
-        print("Starting decision server...")
-        server_process = subprocess.Popen([
-            sys.executable, "src/decision_server.py"
-        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=os.getcwd())
-
-        # Give server time to start and verify it's working
-        time.sleep(3)
-
-        # Test if server is responding
-        try:
-            import urllib.request
-            import json
-
-            # Test with a simple request
-            test_data = json.dumps({"test": "connection"}).encode('utf-8')
-            req = urllib.request.Request('http://localhost:8000/', data=test_data,
-                                       headers={'Content-Type': 'application/json'})
-            response = urllib.request.urlopen(req, timeout=2)
-            print("Decision server started and responding on port 8000")
-        except:
-            print("Decision server started but may not be fully ready")
-            print("(This is normal - it will work when you make decisions)")
-
-        # Run the simple arrow navigation viewer
-        import sys
-        sys.path.append('src')
-        from simple_viewer import SimpleSignAnnotate
+        # Reuse a decision server that is already running instead of starting a duplicate
+        server_process = None
+        health = server_health()
+        if health == 'ok':
+            print(f"Decision server already running at {SERVER_URL} - reusing it")
+        elif health == 'starting':
+            print(f"Decision server at {SERVER_URL} is starting - reusing it")
+        elif health == 'other':
+            print(f"WARNING: Something other than the decision server is answering at {SERVER_URL}")
+        elif urlparse(SERVER_URL).hostname not in ['localhost', '127.0.0.1']:
+            print(f"WARNING: Decision server at {SERVER_URL} is not reachable - decisions stay queued in the page")
+        else:
+            # Start decision server in background (its log goes to a file so a full pipe never blocks it)
+            print("Starting decision server...")
+            # The server keeps its own copy of the log handle; ours is closed once it has started
+            with open(os.path.join(base_dir, "decision_server.log"), 'a') as server_log:
+                server_process = subprocess.Popen([
+                    sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "decision_server.py")
+                ], stdout=server_log, stderr=subprocess.STDOUT, cwd=base_dir)
 
+        # Load the viewer while the server starts up (pympi itself is only imported if an EAF needs parsing)
+        from simple_viewer import SimpleSignAnnotate
         processor = SimpleSignAnnotate()
+
+        if server_process is not None or health == 'starting':
+            if wait_for_server(server_process):
+                print(f"Decision server ready on port {default_server_port()} ({time.perf_counter() - started:.2f}s)")
+            elif server_process is not None and server_process.poll() is not None:
+                print(f"WARNING: Decision server exited (see {os.path.join(base_dir, 'decision_server.log')})")
+            else:
+                print("WARNING: Decision server is not answering /health yet - decisions stay queued in the page until it does")
+
         processor.generate_html()
+        print(f"Time to first page: {time.perf_counter() - started:.2f}s")
 
         print("\nBad Offset Identifier Tool is ready!")
         print(f"HTML file: {processor.output_file}")
         print(f"CSV file: {processor.csv_file}")
-        print("Decision server: http://localhost:8000")
+        print(f"Decision server: {SERVER_URL}")
         print("Data source: BSL Corpus")
         print("\nInstructions:")
         print("1. The HTML file will open automatically in your browser")
         print("2. Review all 'GOOD' sign frames (scroll down to see all)")
         print("3. Click Accept or Reject for the entire file")
-        print("4. CSV updates immediately with decisions")
+        print("4. Decisions are saved as soon as the server acknowledges them (decisions.log)")
         print("5. Page refreshes automatically for next file")
-        print("6. No need to run collect_decisions.py - CSV updates in real-time")
+        print("6. decisions.csv is rewritten by the server's background flush (every 30s or 100 decisions) and on shutdown")
+        print("7. Decisions from other annotators' shards reach the CSV via collect_decisions.py")
 
     except ImportError:
         print("ERROR: Missing dependencies. Please install:")
@@ -79,4 +121,4 @@ def main():
         print(f"ERROR: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run_main("run_bot", main)  # --profile [cprofile|sampled]
\ No newline at end of file
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Annotation-to-video alignment scoring against EAF TIME_ORIGIN
+For each video, the motion energy around every GOOD annotation is decoded
+once (after applying the video's TIME_ORIGIN). Candidate offsets within a
+sweep window are then scored in one NumPy pass over all annotations of the
+file: a well-aligned video shows its motion peak inside the annotated
+intervals. The best-fitting offset is suggested as a correction, with a
+mismatch score (0 = TIME_ORIGIN is the best fit, 1 = it is the worst).
+
+Usage: python3 alignment_scorer.py [--sweep SECONDS] [--workers N] [--shard SPEC] [--force] [file.eaf ...]
+"""
+
+import os
+import io
+import time
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from simple_viewer import SimpleSignAnnotate
+from analysis_store import AnalysisStore
+from offset_estimator import ANALYSIS_FPS, read_gray_window, motion_energy, _standardize
+from eaf_session import open_session
+from shards import parse_shard
+
+SWEEP_SECONDS = 2.0      # candidate offsets are TIME_ORIGIN +/- this
+CONTEXT_SECONDS = 1.0    # extra decoded context beyond the sweep on each side
+MISMATCH_WARNING = 0.5   # flagged in the console output
+
+def score_shifts(signals, starts, ends, max_shift):
+    """Mean standardized motion inside the annotated intervals for every shift -max_shift..max_shift
+
+    signals: one motion-energy array per annotation; starts/ends: interval bounds (frame indices
+    into each signal) at TIME_ORIGIN. Returns (shifts, scores) with scores[j] averaged over annotations.
+    """
+    length = max(len(s) for s in signals)
+    cumulative = np.zeros((len(signals), length + 1), dtype=np.float64)
+    lengths = np.array([len(s) for s in signals])
+    for i, signal in enumerate(signals):
+        cumulative[i, 1:len(signal) + 1] = np.cumsum(_standardize(signal))
+        cumulative[i, len(signal) + 1:] = cumulative[i, len(signal)]
+
+    shifts = np.arange(-max_shift, max_shift + 1)
+    lo = np.clip(np.asarray(starts)[:, None] + shifts[None, :], 0, lengths[:, None])
+    hi = np.clip(np.asarray(ends)[:, None] + shifts[None, :], 0, lengths[:, None])
+    rows = np.arange(len(signals))[:, None]
+    width = hi - lo
+    inside = np.where(width > 0, (cumulative[rows, hi] - cumulative[rows, lo]) / np.maximum(width, 1), np.nan)
+
+    valid = ~np.isnan(inside).all(axis=0)
+    scores = np.full(len(shifts), -np.inf)
+    scores[valid] = np.nanmean(inside[:, valid], axis=0)
+    return shifts, scores
+
+def mismatch_score(shifts, scores):
+    """Share of the achievable in-interval motion contrast lost by using the shift-0 (TIME_ORIGIN) alignment"""
+    finite = np.isfinite(scores)
+    best, worst = scores[finite].max(), scores[finite].min()
+    at_origin = scores[shifts == 0][0]
+    if best - worst < 1e-9 or not np.isfinite(at_origin):
+        return 0.0
+    return float(np.clip((best - at_origin) / (best - worst), 0, 1))
+
+def score_video(video_path, time_origin_ms, good, sweep_seconds=SWEEP_SECONDS):
+    """Suggested offset (ms) and mismatch for one video, or None when nothing could be decoded"""
+    margin = sweep_seconds + CONTEXT_SECONDS
+    signals, starts, ends = [], [], []
+    for start_ms, end_ms in good:
+        interval_start = (start_ms + time_origin_ms) / 1000.0
+        duration = (end_ms - start_ms) / 1000.0
+        window_start = max(interval_start - margin, 0.0)  # ffmpeg clamps the seek at 0
+        signal = motion_energy(read_gray_window(video_path, window_start, interval_start - window_start + duration + margin))
+        if len(signal) < 2:
+            continue
+        first = int(round((interval_start - window_start) * ANALYSIS_FPS))
+        signals.append(signal)
+        starts.append(first)
+        ends.append(first + max(int(round(duration * ANALYSIS_FPS)), 1))
+
+    if not signals:
+        return None
+    shifts, scores = score_shifts(signals, starts, ends, int(round(sweep_seconds * ANALYSIS_FPS)))
+    best_shift = int(shifts[np.argmax(scores)])
+    return {
+        'video': os.path.basename(video_path),
+        'time_origin_ms': int(time_origin_ms),
+        'suggested_offset_ms': int(round(time_origin_ms + best_shift * 1000 / ANALYSIS_FPS)),
+        'mismatch': mismatch_score(shifts, scores),
+        'annotations': len(signals)
+    }
+
+def score_file(viewer, file_path, sweep_seconds=SWEEP_SECONDS):
+    """Per-video alignment scores for one EAF ([] when it has no videos or GOOD annotations)"""
+    session = open_session(file_path, viewer.target_sign)
+    good = session.good_intervals
+    if not good:
+        return []
+
+    scores = []
+    for video_path in viewer.find_video_files(session.filename, session):
+        score = score_video(video_path, session.video_offset(os.path.basename(video_path)), good, sweep_seconds)
+        if score:
+            scores.append(score)
+    return scores
+
+_viewer = None
+
+def _init_worker(eaf_folder, video_folder):
+    global _viewer
+    _viewer = SimpleSignAnnotate(eaf_folder, video_folder)
+
+def _score(file_path, sweep_seconds):
+    started = time.monotonic()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            scores = score_file(_viewer, file_path, sweep_seconds)
+        return file_path, scores, time.monotonic() - started, None
+    except Exception as e:
+        return file_path, None, time.monotonic() - started, str(e)
+
+def score_alignment(files=None, sweep_seconds=SWEEP_SECONDS, workers=None, force=False, shard=None):
+    viewer = SimpleSignAnnotate()
+    if shard:
+        viewer.shard = shard
+    store = AnalysisStore()
+
+    if not files:
+        files = viewer.get_unprocessed_files(viewer.find_conversation_files())
+    done_already = store.aligned_files()
+    todo = [f for f in files if force or os.path.basename(f) not in done_already]
+    print(f"📊 {len(files)} files, {len(files) - len(todo)} already scored, {len(todo)} to score (sweep ±{sweep_seconds:g}s)")
+    if not todo:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    started = time.monotonic()
+    scored = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(viewer.eaf_folder, viewer.video_folder)) as pool:
+        futures = [pool.submit(_score, f, sweep_seconds) for f in todo]
+        for done, future in enumerate(as_completed(futures), 1):
+            file_path, scores, seconds, error = future.result()
+            filename = os.path.basename(file_path)
+            if error:
+                print(f"  ❌ [{done}/{len(todo)}] {filename}: {error}")
+                continue
+            if not scores:
+                print(f"  ⏭️ [{done}/{len(todo)}] {filename}: no videos or GOOD annotations to score")
+                continue
+            store.save_alignment(filename, scores)
+            scored += 1
+            print(f"  📋 [{done}/{len(todo)}] {filename} ({seconds:.2f}s)")
+            for score in scores:
+                flag = '⚠️ ' if score['mismatch'] >= MISMATCH_WARNING else '✅'
+                print(f"     {flag} {score['video']}: TIME_ORIGIN {score['time_origin_ms']}ms, "
+                      f"suggested {score['suggested_offset_ms']}ms, mismatch {score['mismatch']:.2f} "
+                      f"({score['annotations']} annotations)")
+
+    elapsed = time.monotonic() - started
+    print(f"✅ Scored {scored}/{len(todo)} files in {elapsed:.1f}s ({elapsed / len(todo):.2f}s per file)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check EAF TIME_ORIGIN offsets against motion in the videos")
+    parser.add_argument('files', nargs='*', help="EAF files (default: every pending file)")
+    parser.add_argument('--sweep', type=float, default=SWEEP_SECONDS, help="Search TIME_ORIGIN +/- this many seconds")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--shard', help="Only one shard, e.g. region:BF or hash:0/4 (default: BSL_SHARD)")
+    parser.add_argument('--force', action='store_true', help="Re-score files that already have scores")
+    args = parser.parse_args()
+
+    print("🎯 Bad Offset Identifier Tool - Alignment Scorer")
+    print("=" * 40)
+    score_alignment(args.files, args.sweep, args.workers, args.force, parse_shard(args.shard))
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+SQLite store for automatic analysis results (analysis.db)
+Per-file inter-camera offset estimates, used to put likely-misaligned files
+at the front of the review queue, per-video TIME_ORIGIN alignment scores, and
+the automatic decisions proposed from them (including those held for audit),
+and frozen / black / duplicate video flags from the frame fingerprints.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+
+# A file is likely misaligned when the cameras disagree by more than this...
+BAD_OFFSET_SECONDS = 0.2
+# ...and the estimate is at least this confident
+MIN_CONFIDENCE = 0.3
+
+def flagged_files_policy():
+    """BSL_FLAGGED_FILES: 'front' reviews frozen/black/duplicate videos first (default), 'skip' leaves them out"""
+    policy = os.environ.get('BSL_FLAGGED_FILES', 'front')
+    if policy not in ['front', 'skip']:
+        raise ValueError(f"Invalid BSL_FLAGGED_FILES '{policy}' (use front or skip)")
+    return policy
+
+OFFSET_FIELDS = ['filename', 'lag_seconds', 'confidence', 'windows', 'agreeing', 'video1', 'video2', 'computed_at']
+AUTO_FIELDS = ['filename', 'decision', 'reason', 'audit', 'decided_at']
+ALIGNMENT_FIELDS = ['filename', 'video', 'time_origin_ms', 'suggested_offset_ms', 'mismatch', 'annotations', 'computed_at']
+
+class AnalysisStore:
+    def __init__(self, base_dir=None):
+        base_dir = base_dir or os.getcwd()
+        self.db_file = os.path.join(base_dir, "analysis.db")
+        self._local = threading.local()
+
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS offset_estimates (
+                    filename TEXT PRIMARY KEY,
+                    lag_seconds REAL NOT NULL,
+                    confidence REAL NOT NULL,
+                    windows INTEGER NOT NULL,
+                    agreeing INTEGER NOT NULL,
+                    video1 TEXT NOT NULL,
+                    video2 TEXT NOT NULL,
+                    computed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS alignment_scores (
+                    filename TEXT NOT NULL,
+                    video TEXT NOT NULL,
+                    time_origin_ms INTEGER NOT NULL,
+                    suggested_offset_ms INTEGER NOT NULL,
+                    mismatch REAL NOT NULL,
+                    annotations INTEGER NOT NULL,
+                    computed_at REAL NOT NULL,
+                    PRIMARY KEY (filename, video)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS video_flags (
+                    filename TEXT PRIMARY KEY,
+                    flags TEXT NOT NULL,
+                    detail TEXT NOT NULL,
+                    computed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS auto_decisions (
+                    filename TEXT PRIMARY KEY,
+                    decision TEXT NOT NULL,
+                    reason TEXT NOT NULL,
+                    audit INTEGER NOT NULL,
+                    decided_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        """One connection per thread (sqlite3 connections are not shareable)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def save_offset(self, filename, estimate):
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO offset_estimates
+                (filename, lag_seconds, confidence, windows, agreeing, video1, video2, computed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (filename, estimate['lag_seconds'], estimate['confidence'], estimate['windows'],
+                  estimate['agreeing'], estimate['video1'], estimate['video2'], time.time()))
+
+    def offset(self, filename):
+        row = self._connect().execute(
+            f"SELECT {', '.join(OFFSET_FIELDS)} FROM offset_estimates WHERE filename = ?", (filename,)
+        ).fetchone()
+        return dict(zip(OFFSET_FIELDS, row)) if row else None
+
+    def offsets(self):
+        return {row[0]: dict(zip(OFFSET_FIELDS, row)) for row in
+                self._connect().execute(f"SELECT {', '.join(OFFSET_FIELDS)} FROM offset_estimates")}
+
+    def save_alignment(self, filename, scores):
+        """Replace a file's per-video alignment scores"""
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.execute("DELETE FROM alignment_scores WHERE filename = ?", (filename,))
+            conn.executemany("""
+                INSERT INTO alignment_scores
+                (filename, video, time_origin_ms, suggested_offset_ms, mismatch, annotations, computed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [(filename, score['video'], score['time_origin_ms'], score['suggested_offset_ms'],
+                   score['mismatch'], score['annotations'], now) for score in scores])
+
+    def alignment(self, filename):
+        rows = self._connect().execute(
+            f"SELECT {', '.join(ALIGNMENT_FIELDS)} FROM alignment_scores WHERE filename = ? ORDER BY video", (filename,)
+        ).fetchall()
+        return [dict(zip(ALIGNMENT_FIELDS, row)) for row in rows]
+
+    def aligned_files(self):
+        return {row[0] for row in self._connect().execute("SELECT DISTINCT filename FROM alignment_scores")}
+
+    def save_flags(self, filename, flags, detail=''):
+        """Frozen / black / blank / duplicate flags for a file (an empty list clears them)"""
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO video_flags (filename, flags, detail, computed_at) VALUES (?, ?, ?, ?)
+            """, (filename, ','.join(flags), detail, time.time()))
+
+    def flags(self):
+        """filename -> {'flags': [...], 'detail': ...} for files with at least one flag"""
+        return {row[0]: {'flags': row[1].split(','), 'detail': row[2]} for row in
+                self._connect().execute("SELECT filename, flags, detail FROM video_flags WHERE flags != ''")}
+
+    def save_auto_decision(self, filename, decision, reason, audit):
+        """Remember a policy decision; audit=True means it was sent to a human instead of recorded"""
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO auto_decisions (filename, decision, reason, audit, decided_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (filename, decision, reason, int(audit), time.time()))
+
+    def auto_decisions(self):
+        return {row[0]: dict(zip(AUTO_FIELDS, row)) for row in
+                self._connect().execute(f"SELECT {', '.join(AUTO_FIELDS)} FROM auto_decisions")}
+
+    def review_order(self, file_paths):
+        """Flagged videos first (or skipped), then likely-misaligned files (largest confident lag first),
+        then unknown, then likely fine"""
+        offsets = self.offsets()
+        flagged = self.flags()
+        if flagged and flagged_files_policy() == 'skip':
+            file_paths = [f for f in file_paths if os.path.basename(f) not in flagged]
+
+        def priority(file_path):
+            if os.path.basename(file_path) in flagged:
+                return (-1, 0)
+            estimate = offsets.get(os.path.basename(file_path))
+            if estimate is None or estimate['confidence'] < MIN_CONFIDENCE:
+                return (1, 0)
+            if abs(estimate['lag_seconds']) > BAD_OFFSET_SECONDS:
+                return (0, -abs(estimate['lag_seconds']) * estimate['confidence'])
+            return (2, estimate['confidence'])
+
+        return sorted(file_paths, key=priority)  # stable: scan order within a tier
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Confidence-gated automatic decisions
+Pending files whose alignment scores (alignment_scorer.py) and inter-camera
+offset estimate (offset_estimator.py) are clearly fine are accepted, and
+clearly misaligned ones rejected, through the decision journal with notes
+starting "auto:". Ambiguous files stay in the HTML review queue. A random
+fraction of automatic decisions is held back for a human to review instead,
+and the audit command reports how often the humans agreed. When the decision
+server is running, decisions are posted to it (so it stops leasing those
+files at once); otherwise they are appended to the journal directly.
+
+Thresholds come from the command line or BSL_AUTO_* environment variables.
+Usage: python3 auto_decisions.py run [--audit 0.1] [--dry-run] [threshold options]
+       python3 auto_decisions.py audit
+"""
+
+import os
+import uuid
+import random
+import argparse
+from decision_log import DecisionLog
+from analysis_store import AnalysisStore, BAD_OFFSET_SECONDS, MIN_CONFIDENCE
+from simple_viewer import SimpleSignAnnotate
+from shards import parse_shard
+from leases import default_server_url, post_decisions
+
+AUTO_NOTE_PREFIX = "auto:"
+
+# name -> (environment variable, default, help)
+THRESHOLDS = {
+    'accept_mismatch': ('BSL_AUTO_ACCEPT_MISMATCH', 0.15, "Accept only if every video's mismatch is at most this"),
+    'accept_correction_ms': ('BSL_AUTO_ACCEPT_CORRECTION_MS', 120, "...and its suggested correction is at most this many ms"),
+    'min_annotations': ('BSL_AUTO_MIN_ANNOTATIONS', 5, "Accept or reject only on evidence from at least this many GOOD annotations"),
+    'reject_mismatch': ('BSL_AUTO_REJECT_MISMATCH', 0.8, "Reject if a video's mismatch is at least this"),
+    'reject_correction_ms': ('BSL_AUTO_REJECT_CORRECTION_MS', 400, "...and its suggested correction is at least this many ms"),
+    'reject_lag_seconds': ('BSL_AUTO_REJECT_LAG', 0.5, "Also reject if the cameras disagree by at least this many seconds"),
+    'reject_confidence': ('BSL_AUTO_REJECT_CONFIDENCE', 0.6, "...with at least this offset-estimate confidence"),
+}
+
+def default_policy():
+    """Thresholds from BSL_AUTO_* environment variables, falling back to the defaults above"""
+    return {name: float(os.environ.get(env, default)) for name, (env, default, _) in THRESHOLDS.items()}
+
+def default_audit_fraction():
+    return float(os.environ.get('BSL_AUTO_AUDIT', 0.1))
+
+def decide(policy, alignment, estimate):
+    """('accept' | 'reject' | None, reason) for one file; None leaves it to a human
+
+    Every automatic decision, reject or accept, needs at least min_annotations annotations of evidence
+    (offset-estimate windows, or scored annotations per video), so one noisy window never decides a file.
+    """
+    if estimate and estimate['confidence'] >= policy['reject_confidence'] \
+            and abs(estimate['lag_seconds']) >= policy['reject_lag_seconds'] \
+            and estimate['windows'] >= policy['min_annotations']:
+        return 'reject', (f"cameras disagree by {estimate['lag_seconds']:+.2f}s "
+                          f"(confidence {estimate['confidence']:.2f}, {estimate['windows']} windows)")
+
+    for score in alignment:
+        correction = abs(score['suggested_offset_ms'] - score['time_origin_ms'])
+        if score['mismatch'] >= policy['reject_mismatch'] and correction >= policy['reject_correction_ms'] \
+                and score['annotations'] >= policy['min_annotations']:
+            return 'reject', (f"{score['video']} mismatch {score['mismatch']:.2f}, "
+                              f"TIME_ORIGIN {score['time_origin_ms']}ms vs suggested {score['suggested_offset_ms']}ms")
+
+    if not alignment:
+        return None, "no alignment scores"
+    if min(score['annotations'] for score in alignment) < policy['min_annotations']:
+        return None, f"too few scored annotations ({min(score['annotations'] for score in alignment)})"
+    if estimate and estimate['confidence'] >= MIN_CONFIDENCE and abs(estimate['lag_seconds']) > BAD_OFFSET_SECONDS:
+        return None, f"cameras may disagree by {estimate['lag_seconds']:+.2f}s"
+    worst_mismatch = max(score['mismatch'] for score in alignment)
+    worst_correction = max(abs(score['suggested_offset_ms'] - score['time_origin_ms']) for score in alignment)
+    if worst_mismatch <= policy['accept_mismatch'] and worst_correction <= policy['accept_correction_ms']:
+        reason = f"max mismatch {worst_mismatch:.2f}, max correction {worst_correction}ms"
+        if estimate:
+            reason += f", camera lag {estimate['lag_seconds']:+.2f}s"
+        return 'accept', reason
+    return None, f"ambiguous (max mismatch {worst_mismatch:.2f}, max correction {worst_correction}ms)"
+
+def run(policy, audit_fraction, dry_run=False, shard=None, seed=None):
+    viewer = SimpleSignAnnotate()
+    if shard:
+        viewer.shard = shard
+    store = AnalysisStore()
+    decision_log = DecisionLog()
+    rng = random.Random(seed)
+
+    pending = viewer.get_unprocessed_files(viewer.find_conversation_files())
+    already_audited = {f for f, row in store.auto_decisions().items() if row['audit']}
+    offsets = store.offsets()
+
+    entries = []
+    counts = {'accept': 0, 'reject': 0, 'audit': 0, 'human': 0}
+    for file_path in pending:
+        filename = os.path.basename(file_path)
+        if filename in already_audited:
+            counts['audit'] += 1
+            continue  # held for a human on an earlier run
+
+        decision, reason = decide(policy, store.alignment(filename), offsets.get(filename))
+        if decision is None:
+            counts['human'] += 1
+            continue
+
+        audit = rng.random() < audit_fraction
+        counts['audit' if audit else decision] += 1
+        print(f"  {'🔎' if audit else ('✅' if decision == 'accept' else '❌')} {filename}: "
+              f"{decision}{' (held for audit)' if audit else ''} - {reason}")
+        if dry_run:
+            continue
+        store.save_auto_decision(filename, decision, reason, audit)
+        if not audit:
+            entries.append(decision_log.make_entry(filename, decision, notes=f"{AUTO_NOTE_PREFIX} {reason}",
+                                                   decision_id=f"auto-{uuid.uuid4().hex}"))
+
+    if entries:
+        record_entries(decision_log, entries)
+
+    total = len(pending) or 1
+    automatic = counts['accept'] + counts['reject']
+    print(f"\n📊 {len(pending)} pending: {counts['accept']} auto-accepted, {counts['reject']} auto-rejected, "
+          f"{counts['audit']} held for audit, {counts['human']} left for review")
+    print(f"   Review queue cut by {automatic / total:.0%}{' (dry run - nothing recorded)' if dry_run else ''}")
+
+def record_entries(decision_log, entries, server_url=None):
+    """Post decisions to a running decision server, whose cache would otherwise keep leasing
+    these files until its next refresh; append them to the journal when it is not running"""
+    server_url = server_url or default_server_url()
+    try:
+        result = post_decisions(server_url, [dict(entry, annotator='auto') for entry in entries])
+    except (OSError, ValueError):
+        decision_log.append_entries(entries)
+        print(f"📝 Decision server not running at {server_url} - {len(entries)} decisions appended to the journal")
+        return
+    print(f"🌐 {len(result.get('accepted', []))} decisions recorded through {server_url} "
+          f"({len(result.get('duplicates', []))} already recorded)")
+    if result.get('invalid'):
+        print(f"⚠️  The server rejected {len(result['invalid'])} decisions")
+
+def audit_report():
+    """Compare audited automatic decisions with the human decisions recorded for them"""
+    store = AnalysisStore()
+    decision_log = DecisionLog()
+    journal = {entry['filename']: entry for entry in decision_log.read_journal()}
+
+    agreed = disagreed = waiting = 0
+    for filename, auto in sorted(store.auto_decisions().items()):
+        if not auto['audit']:
+            continue
+        human = journal.get(filename) or decision_log.store.get(filename)
+        if human is None:
+            waiting += 1
+        elif human['decision'] == auto['decision']:
+            agreed += 1
+        else:
+            disagreed += 1
+            print(f"  ⚠️ {filename}: policy said {auto['decision']} ({auto['reason']}), reviewer said {human['decision']}")
+
+    reviewed = agreed + disagreed
+    print(f"📊 Audit: {reviewed} reviewed, {waiting} waiting for review")
+    if reviewed:
+        print(f"   Reviewers agreed with the policy on {agreed}/{reviewed} ({agreed / reviewed:.0%})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record clear-cut decisions automatically; leave ambiguous files for review")
+    parser.add_argument('command', choices=['run', 'audit'])
+    parser.add_argument('--audit', type=float, default=default_audit_fraction(),
+                        help="Fraction of automatic decisions sent to a human instead (default: BSL_AUTO_AUDIT or 0.1)")
+    parser.add_argument('--dry-run', action='store_true', help="Show what would be decided without recording anything")
+    parser.add_argument('--shard', help="Only one shard, e.g. region:BF or hash:0/4 (default: BSL_SHARD)")
+    parser.add_argument('--seed', type=int, help="Seed for the audit sample (default: random)")
+    policy = default_policy()
+    for name, (env, _, help_text) in THRESHOLDS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=float, default=policy[name],
+                            help=f"{help_text} (default: {env} or {policy[name]:g})")
+    args = parser.parse_args()
+
+    print("🎯 Bad Offset Identifier Tool - Automatic Decisions")
+    print("=" * 40)
+    if args.command == 'audit':
+        audit_report()
+    else:
+        run({name: getattr(args, name) for name in THRESHOLDS}, args.audit, args.dry_run, parse_shard(args.shard), args.seed)
@@ -1,31 +1,60 @@
 #!/usr/bin/env python3
 """
 Collect all individual decision CSV files from Downloads folder
-and merge them into one master decisions.csv file
+and merge them into the decision store and master decisions.csv file
+(The assessment page now queues decisions locally and sends them to the
+decision server, so this is only needed for files from older pages)
+
+Fragments are parsed in parallel; when several fragments (or the store)
+disagree about a file, the decision with the latest timestamp wins.
+Fragments merged on an earlier run are skipped unless they changed.
+Usage: python3 collect_decisions.py [--downloads FOLDER] [--workers N]
 """
 
 import os
 import csv
 import glob
-from datetime import datetime
-from pathlib import Path
-
-def collect_decisions():
-    """Collect decision files from Downloads and merge into master CSV"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from decision_store import DecisionStore
+from decision_log import normalize_timestamp
+
+def read_fragment(file_path):
+    """Parse one decision_*.csv fragment into decision rows"""
+    rows = []
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        for parts in csv.reader(f):
+            if len(parts) >= 3 and parts[0] and parts[1] in ['accept', 'reject']:
+                rows.append({
+                    'filename': parts[0],
+                    'decision': parts[1],
+                    'timestamp': normalize_timestamp(parts[2]) or parts[2],
+                    'notes': parts[3] if len(parts) > 3 else ''
+                })
+    return rows
+
+def _safe_read(file_path):
+    try:
+        return read_fragment(file_path)
+    except Exception as e:
+        print(f"    ❌ Error reading {os.path.basename(file_path)}: {e}")
+        return None
 
+def find_downloads_folder():
     # Common Downloads folder locations
     downloads_folders = [
         os.path.expanduser("~/Downloads"),
         os.path.join(os.path.expanduser("~"), "Downloads")
     ]
-
-    # Find Downloads folder
-    downloads_folder = None
     for folder in downloads_folders:
         if os.path.exists(folder):
-            downloads_folder = folder
-            break
+            return folder
+    return None
+
+def collect_decisions(downloads_folder=None, workers=8):
+    """Collect decision files from Downloads and merge into the decision store and master CSV"""
 
+    downloads_folder = downloads_folder or find_downloads_folder()
     if not downloads_folder:
         print("❌ Could not find Downloads folder")
         return
@@ -33,80 +62,69 @@ def collect_decisions():
     print(f"🔍 Searching in: {downloads_folder}")
 
     # Find all decision CSV files
-    decision_files = glob.glob(os.path.join(downloads_folder, "decision_*.csv"))
+    decision_files = sorted(glob.glob(os.path.join(downloads_folder, "decision_*.csv")))
 
     if not decision_files:
         print("📭 No decision files found in Downloads folder")
         print("   Files should be named like: decision_accept_BF01F28WDC.eaf.csv")
         return
 
-    print(f"📊 Found {len(decision_files)} decision files")
-
-    # Collect all decisions
-    all_decisions = []
-    processed_files = set()
-
-    for file_path in sorted(decision_files):
-        filename = os.path.basename(file_path)
-        print(f"  📁 Processing: {filename}")
-
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                if content:
-                    # Parse CSV line
-                    parts = content.split(',')
-                    if len(parts) >= 3:
-                        eaf_filename = parts[0]
-                        decision = parts[1]
-                        timestamp = parts[2]
-                        notes = parts[3] if len(parts) > 3 else ''
-
-                        # Avoid duplicates (keep latest decision for same file)
-                        if eaf_filename not in processed_files:
-                            all_decisions.append({
-                                'filename': eaf_filename,
-                                'decision': decision,
-                                'timestamp': timestamp,
-                                'notes': notes
-                            })
-                            processed_files.add(eaf_filename)
-                            print(f"    ✅ {eaf_filename} -> {decision}")
-                        else:
-                            print(f"    ⏭️  {eaf_filename} (duplicate, skipped)")
-        except Exception as e:
-            print(f"    ❌ Error reading {filename}: {e}")
-
-    if not all_decisions:
-        print("❌ No valid decisions found")
-        return
+    store = DecisionStore(os.getcwd())
+
+    # Only fragments that are new or changed since the last run
+    merged = store.merged_fragments()
+    new_fragments = []
+    for file_path in decision_files:
+        stat = os.stat(file_path)
+        if merged.get(file_path) != (stat.st_size, stat.st_mtime):
+            new_fragments.append((file_path, stat.st_size, stat.st_mtime))
+
+    print(f"📊 Found {len(decision_files)} decision files ({len(new_fragments)} not merged yet)")
+
+    # Latest timestamp per EAF across all new fragments
+    latest = {}
+    merged_fragments = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda fragment: (fragment, _safe_read(fragment[0])), new_fragments)
+        for fragment, rows in results:
+            if rows is None:
+                continue
+            merged_fragments.append(fragment)
+            for row in rows:
+                current = latest.get(row['filename'])
+                if current is None or row['timestamp'] > current['timestamp']:
+                    latest[row['filename']] = row
+
+    changed = store.merge_latest(latest.values()) if latest else 0
+    store.mark_fragments_merged(merged_fragments)
 
-    # Write master CSV file
     master_csv = os.path.join(os.getcwd(), "decisions.csv")
-
     try:
-        with open(master_csv, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=['filename', 'decision', 'timestamp', 'notes'])
-            writer.writeheader()
-            writer.writerows(all_decisions)
-
-        print(f"✅ Master CSV created: {master_csv}")
-        print(f"📊 Total decisions: {len(all_decisions)}")
-        print(f"   Accept: {sum(1 for d in all_decisions if d['decision'] == 'accept')}")
-        print(f"   Reject: {sum(1 for d in all_decisions if d['decision'] == 'reject')}")
-
-        # Optionally clean up individual files
-        print(f"\\n🧹 Clean up individual decision files? (y/n)")
-        choice = input().strip().lower()
-        if choice == 'y':
-            for file_path in decision_files:
-                os.remove(file_path)
-                print(f"  🗑️  Deleted: {os.path.basename(file_path)}")
-
+        total = store.export_csv(master_csv)
     except Exception as e:
         print(f"❌ Error writing master CSV: {e}")
+        return
+
+    print(f"✅ Master CSV updated: {master_csv}")
+    print(f"📊 Decisions in new fragments: {len(latest)} ({changed} newer than the store)")
+    print(f"   Accept: {sum(1 for d in latest.values() if d['decision'] == 'accept')}")
+    print(f"   Reject: {sum(1 for d in latest.values() if d['decision'] == 'reject')}")
+    print(f"📊 Total decisions: {total}")
+
+    # Optionally clean up individual files
+    print(f"\n🧹 Clean up individual decision files? (y/n)")
+    choice = input().strip().lower()
+    if choice == 'y':
+        for file_path in decision_files:
+            os.remove(file_path)
+            print(f"  🗑️  Deleted: {os.path.basename(file_path)}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge downloaded decision files into decisions.csv")
+    parser.add_argument('--downloads', help="Folder containing decision_*.csv files (default: ~/Downloads)")
+    parser.add_argument('--workers', type=int, default=8, help="Parallel readers (default: 8)")
+    args = parser.parse_args()
+
     print("🎯 Bad Offset Identifier Tool - Decision Collector")
     print("=" * 40)
-    collect_decisions()
\ No newline at end of file
+    collect_decisions(args.downloads, args.workers)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Corpus statistics and per-file inspection from the scan index
+Answers the questions the debug tools used to reparse EAFs for - tier
+inventory, gloss frequencies, GOOD timings and durations, files near the
+selection thresholds and missing videos - from scan_index.json, for one file,
+a region or the whole corpus. The scan only parses new or changed EAFs
+(--cached skips even the folder walk).
+
+Usage: python3 corpus_stats.py summary|tiers|glosses|durations|thresholds|videos [--region BF] [--shard SPEC]
+       python3 corpus_stats.py file BF01F28WDC.eaf
+"""
+
+import os
+import sys
+import argparse
+import statistics
+from collections import Counter, defaultdict
+from scan_index import ScanIndex, qualifies, MIN_ANNOTATIONS, MIN_GOOD
+from eaf_session import match_videos
+from shards import parse_shard, region_of
+
+DURATION_BUCKETS = [250, 500, 1000, 2000]  # ms; GOOD durations are histogrammed below/between/above these
+MIDPOINT = 0.475  # where the simple viewer extracts its frame
+
+def load_entries(eaf_folder, shard=None, cached=False):
+    """Index entries under eaf_folder (in shard, if given); parses only new or changed files unless cached"""
+    index = ScanIndex()
+    if not cached:
+        return index.scan(eaf_folder, shard)
+    folder = os.path.join(os.path.abspath(eaf_folder), '')
+    return [entry for path, entry in sorted(index.entries.items())
+            if os.path.abspath(path).startswith(folder) and (shard is None or shard.contains(entry['filename']))]
+
+def bar(count, largest, width=30):
+    return '█' * max(1, round(width * count / largest)) if count else ''
+
+def summary(entries):
+    good_files = [entry for entry in entries if qualifies(entry)]
+    errors = [entry for entry in entries if 'error' in entry]
+    print(f"📁 {len(entries)} indexed EAFs, {len(good_files)} qualifying (≥{MIN_ANNOTATIONS} annotations, ≥{MIN_GOOD} GOOD), "
+          f"{len(errors)} with errors")
+    print(f"📊 {sum(entry['total'] for entry in entries)} dominant-tier annotations, "
+          f"{sum(entry['good'] for entry in entries)} GOOD")
+    print(f"✋ {sum(1 for entry in entries if entry['dominant_tier'].startswith('LH'))} left-handed (_LH) files")
+
+    by_region = defaultdict(lambda: [0, 0, 0])
+    for entry in entries:
+        counts = by_region[region_of(entry['filename'])]
+        counts[0] += 1
+        counts[1] += qualifies(entry)
+        counts[2] += entry['good']
+    print(f"\n{'region':<8} {'files':>6} {'qualifying':>11} {'GOOD':>7}")
+    for region, (files, qualifying, good) in sorted(by_region.items()):
+        print(f"{region:<8} {files:>6} {qualifying:>11} {good:>7}")
+
+    for entry in errors[:10]:
+        print(f"  ⚠️ {entry['filename']}: {entry['error']}")
+    if len(errors) > 10:
+        print(f"  ... and {len(errors) - 10} more")
+
+def tiers(entries):
+    files_with = Counter()
+    annotations = Counter()
+    for entry in entries:
+        for tier, count in entry.get('tiers', {}).items():
+            files_with[tier] += 1
+            annotations[tier] += count
+    print(f"📊 {len(files_with)} tiers across {len(entries)} files")
+    print(f"\n{'tier':<32} {'files':>6} {'annotations':>12}")
+    for tier, files in files_with.most_common():
+        print(f"{tier:<32} {files:>6} {annotations[tier]:>12}")
+
+    missing = [entry for entry in entries if entry['dominant_tier'] not in entry.get('tiers', {})]
+    if missing:
+        print(f"\n❌ {len(missing)} files without their dominant tier:")
+        for entry in missing:
+            print(f"   {entry['filename']} (expected {entry['dominant_tier']})")
+
+def glosses(entries, top):
+    occurrences = Counter()
+    files_with = Counter()
+    for entry in entries:
+        for gloss, count in entry.get('glosses', {}).items():
+            occurrences[gloss] += count
+            files_with[gloss] += 1
+    total = sum(occurrences.values()) or 1
+    print(f"🏷️ {len(occurrences)} distinct glosses, {sum(occurrences.values())} dominant-tier annotations")
+    print(f"\n{'gloss':<28} {'count':>7} {'share':>6} {'files':>6}")
+    for gloss, count in occurrences.most_common(top):
+        print(f"{gloss[:28]:<28} {count:>7} {count / total:>6.1%} {files_with[gloss]:>6}")
+    if len(occurrences) > top:
+        print(f"... and {len(occurrences) - top} more (--top N)")
+
+def durations(entries):
+    values = sorted(end - start for entry in entries for start, end in entry.get('good_intervals', []))
+    if not values:
+        print("ℹ️  No GOOD annotations indexed")
+        return
+    print(f"⏱️ {len(values)} GOOD annotations in {sum(1 for entry in entries if entry.get('good_intervals'))} files")
+    deciles = statistics.quantiles(values, n=10) if len(values) > 1 else [values[0]] * 9
+    print(f"   min {values[0]}ms | p10 {deciles[0]:.0f}ms | median {statistics.median(values):.0f}ms | "
+          f"p90 {deciles[-1]:.0f}ms | max {values[-1]}ms | mean {statistics.mean(values):.0f}ms")
+
+    edges = [0] + DURATION_BUCKETS
+    labels = [f"{low}-{high}ms" for low, high in zip(edges, edges[1:])] + [f"≥{edges[-1]}ms"]
+    counts = [0] * len(labels)
+    for value in values:
+        counts[sum(value >= edge for edge in DURATION_BUCKETS)] += 1
+    print()
+    for label, count in zip(labels, counts):
+        print(f"   {label:>12} {count:>6} {bar(count, max(counts))}")
+
+def thresholds(entries, annotation_margin, good_margin):
+    """Files whose counts are within a margin of either selection threshold, on either side"""
+    near = [entry for entry in entries
+            if abs(entry['total'] - MIN_ANNOTATIONS) <= annotation_margin or abs(entry['good'] - MIN_GOOD) <= good_margin]
+    print(f"🎚️ {len(near)} files within {annotation_margin} annotations of {MIN_ANNOTATIONS} "
+          f"or {good_margin} GOOD of {MIN_GOOD}")
+    print(f"\n{'file':<36} {'total':>6} {'GOOD':>5}  qualifies")
+    for entry in sorted(near, key=lambda entry: (entry['good'], entry['total'])):
+        print(f"{entry['filename']:<36} {entry['total']:>6} {entry['good']:>5}  {'✅' if qualifies(entry) else '❌'}")
+
+def videos(entries, video_folder, all_files):
+    """Files whose media descriptors do not all resolve to a video in video_folder"""
+    checked = missing = 0
+    for entry in entries:
+        if not all_files and not qualifies(entry):
+            continue
+        checked += 1
+        found = match_videos(entry.get('media', []), entry['filename'], video_folder)
+        if len(found) >= max(len(entry.get('media', [])), 1):
+            continue
+        missing += 1
+        names = ', '.join(os.path.basename(url) for url in entry.get('media', [])) or 'no media descriptors'
+        print(f"  ❌ {entry['filename']}: {len(found)} of {len(entry.get('media', []))} videos found ({names})")
+    print(f"📹 {missing} of {checked} {'indexed' if all_files else 'qualifying'} files are missing videos in {video_folder}")
+
+def inspect_file(entries, name, video_folder):
+    matches = [entry for entry in entries if entry['filename'] == os.path.basename(name) or entry['path'] == name]
+    if not matches:
+        print(f"❌ {name} is not in the scan index (under 100KB, outside the EAF folder or not an .eaf?)")
+        return False
+    entry = matches[0]
+    print(f"📋 {entry['filename']}  ({entry['path']})")
+    print(f"🎯 Dominant tier: {entry['dominant_tier']} "
+          f"({'Left' if entry['dominant_tier'].startswith('LH') else 'Right'} hand)")
+    print(f"📊 {entry['total']} annotations, {entry['good']} GOOD - "
+          f"{'✅ qualifies' if qualifies(entry) else f'❌ needs ≥{MIN_ANNOTATIONS} total and ≥{MIN_GOOD} GOOD'}")
+    if 'error' in entry:
+        print(f"⚠️  {entry['error']}")
+
+    print("\n📊 Tiers:")
+    for tier, count in sorted(entry.get('tiers', {}).items()):
+        print(f"   {tier:<32} {count:>6}")
+
+    top = Counter(entry.get('glosses', {})).most_common(20)
+    print(f"\n🏷️ Glosses ({len(entry.get('glosses', {}))} distinct):")
+    for gloss, count in top:
+        print(f"   {gloss[:32]:<32} {count:>6}")
+
+    print("\n🎯 GOOD annotations:")
+    for i, (start, end) in enumerate(entry.get('good_intervals', []), 1):
+        print(f"   {i:>3}. {start / 1000:.2f}s - {end / 1000:.2f}s ({(end - start) / 1000:.2f}s), "
+              f"frame at {(start + (end - start) * MIDPOINT) / 1000:.2f}s (47.5%)")
+
+    print("\n📹 Videos:")
+    found = match_videos(entry.get('media', []), entry['filename'], video_folder)
+    for url in entry.get('media', []):
+        print(f"   linked: {url}")
+    for path, how in found:
+        print(f"   ✅ {os.path.basename(path)} ({how} match)")
+    if len(found) < len(entry.get('media', [])):
+        print(f"   ❌ {len(entry['media']) - len(found)} linked video(s) not found in {video_folder}")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Corpus statistics and file inspection from the scan index")
+    parser.add_argument('command', choices=['summary', 'tiers', 'glosses', 'durations', 'thresholds', 'videos', 'file'])
+    parser.add_argument('name', nargs='?', help="EAF filename or path for the file command")
+    parser.add_argument('--eaf-folder', help="EAF folder (default: CAVA_Data/EAFs)")
+    parser.add_argument('--video-folder', help="Video folder (default: CAVA_Data/Videos)")
+    parser.add_argument('--region', help="Only these region prefixes, e.g. BF or BF,LN")
+    parser.add_argument('--shard', help="Only one shard, e.g. region:BF or hash:0/4")
+    parser.add_argument('--cached', action='store_true', help="Use the index as it is, without walking the EAF folder")
+    parser.add_argument('--top', type=int, default=30, help="Glosses to list (default: 30)")
+    parser.add_argument('--annotation-margin', type=int, default=5, help=f"thresholds: distance from {MIN_ANNOTATIONS} annotations (default: 5)")
+    parser.add_argument('--good-margin', type=int, default=2, help=f"thresholds: distance from {MIN_GOOD} GOOD (default: 2)")
+    parser.add_argument('--all', action='store_true', help="videos: check every indexed file, not only qualifying ones")
+    args = parser.parse_args()
+
+    if args.command == 'file' and not args.name:
+        parser.error("the file command needs an EAF filename")
+    eaf_folder = args.eaf_folder or os.path.join(os.getcwd(), "CAVA_Data", "EAFs")
+    video_folder = args.video_folder or os.path.join(os.getcwd(), "CAVA_Data", "Videos")
+    shard = parse_shard(f"region:{args.region}" if args.region else args.shard)
+
+    print("🎯 Bad Offset Identifier Tool - Corpus Statistics")
+    print("=" * 40)
+    if shard:
+        print(f"🧩 {shard}")
+    entries = load_entries(eaf_folder, shard, args.cached)
+
+    if args.command == 'summary':
+        summary(entries)
+    elif args.command == 'tiers':
+        tiers(entries)
+    elif args.command == 'glosses':
+        glosses(entries, args.top)
+    elif args.command == 'durations':
+        durations(entries)
+    elif args.command == 'thresholds':
+        thresholds(entries, args.annotation_margin, args.good_margin)
+    elif args.command == 'videos':
+        videos(entries, video_folder, args.all)
+    elif not inspect_file(entries, args.name, video_folder):
+        sys.exit(1)
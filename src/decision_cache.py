@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Write-behind decision cache for the decision server
+Decisions are acknowledged once they are in memory and appended to the journal
+(durable according to the journal's policy); a background thread folds the
+journal into the decision store and decisions.csv on a timer or after a
+number of new decisions, and once more on shutdown. Each timed pass also
+re-reads the store, so decisions merged into it by collect_decisions.py or
+shards.py merge reach the running server.
+"""
+
+import os
+import time
+import threading
+from decision_log import normalize_timestamp
+
+FLUSH_INTERVAL = 30   # seconds between background flushes
+FLUSH_THRESHOLD = 100 # flush early after this many unflushed decisions
+
+class DecisionCache:
+    def __init__(self, decision_log, flush_interval=None, flush_threshold=None, metrics=None):
+        self.decision_log = decision_log
+        self.metrics = metrics  # optional metrics.Metrics for write/flush timings and hit rates
+        self.flush_interval = flush_interval or float(os.environ.get('BSL_FLUSH_INTERVAL', FLUSH_INTERVAL))
+        self.flush_threshold = flush_threshold or int(os.environ.get('BSL_FLUSH_THRESHOLD', FLUSH_THRESHOLD))
+
+        # Everything decided so far, plus every client id already applied
+        self._lock = threading.Lock()
+        self._decisions = {}
+        self._decided = decision_log.store.filenames()
+        self._ids = decision_log.store.decision_ids()
+        for entry in decision_log.read_journal():
+            self._remember(entry)
+        self._unflushed = 0
+
+        self._wake = threading.Event()
+        self._stopping = False
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    def _remember(self, entry):
+        self._decisions[entry['filename']] = entry
+        self._decided.add(entry['filename'])
+        if entry.get('id'):
+            self._ids.add(entry['id'])
+
+    def record(self, decisions):
+        """Record decisions; client ids already seen are returned as duplicates instead"""
+        with self._lock:
+            entries = []
+            duplicates = []
+            batch_ids = set()
+            for d in decisions:
+                decision_id = d.get('id')
+                if decision_id and (decision_id in self._ids or decision_id in batch_ids):
+                    duplicates.append(decision_id)
+                    continue
+                entry = self.decision_log.make_entry(
+                    d['filename'], d['decision'], normalize_timestamp(d.get('timestamp')),
+                    d.get('notes', ''), decision_id
+                )
+                if decision_id:
+                    batch_ids.add(decision_id)
+                entries.append(entry)
+
+            # Acknowledge only after the journal append; if it fails nothing is remembered,
+            # so the client's retry is recorded rather than answered as a duplicate
+            started = time.perf_counter()
+            self.decision_log.append_entries(entries)
+            if self.metrics and entries:
+                self.metrics.observe('journal_append', time.perf_counter() - started)
+            for entry in entries:
+                self._remember(entry)
+            self._unflushed += len(entries)
+            if self._unflushed >= self.flush_threshold:
+                self._wake.set()
+
+        self._count_lookups(len(duplicates), sum(1 for d in decisions if d.get('id')))
+        return entries, duplicates
+
+    def _count_lookups(self, hits, total):
+        """Hit rate: the share of lookups (files, client ids) that found a decision in the cache"""
+        if self.metrics and total:
+            self.metrics.increment('decision_cache_hits', hits)
+            self.metrics.increment('decision_cache_misses', total - hits)
+
+    def is_decided(self, filename):
+        with self._lock:
+            decided = filename in self._decided
+        self._count_lookups(int(decided), 1)
+        return decided
+
+    def pending(self, filenames):
+        with self._lock:
+            pending = [f for f in filenames if f not in self._decided]
+        self._count_lookups(len(filenames) - len(pending), len(filenames))
+        return pending
+
+    def unflushed(self):
+        with self._lock:
+            return self._unflushed
+
+    def flush(self):
+        """Fold the journal into the store and CSV (also picks up save_decision.py entries)"""
+        with self._lock:
+            flushed = self._unflushed
+            self._unflushed = 0
+        try:
+            started = time.perf_counter()
+            entries = self.decision_log.compact()
+            if self.metrics:
+                self.metrics.observe('store_flush', time.perf_counter() - started)
+        except Exception:
+            with self._lock:
+                self._unflushed += flushed
+            raise
+
+        with self._lock:
+            for entry in entries:
+                self._decided.add(entry['filename'])
+                if entry.get('id'):
+                    self._ids.add(entry['id'])
+                # Flushed decisions now live in the store (unless a newer one arrived meanwhile)
+                if self._decisions.get(entry['filename']) == entry:
+                    del self._decisions[entry['filename']]
+        return len(entries)
+
+    def refresh(self):
+        """Pick up decisions written straight to the store by other processes (merged shard fragments)"""
+        decided = self.decision_log.store.filenames()
+        ids = self.decision_log.store.decision_ids()
+        with self._lock:
+            # Decisions recorded since the store was read are still held in memory
+            self._decided = decided | set(self._decisions)
+            self._ids |= ids
+
+    def _flush_loop(self):
+        # Wake often enough to honour an interval:T fsync policy as well as the flush timer
+        mode, value = self.decision_log.durability
+        wait = min(self.flush_interval, value) if mode == 'interval' else self.flush_interval
+        last_flush = time.monotonic()
+
+        while not self._stopping:
+            woken = self._wake.wait(wait)
+            self._wake.clear()
+            if self._stopping:
+                break
+            try:
+                self.decision_log.sync()
+                if not woken and time.monotonic() - last_flush < self.flush_interval:
+                    continue
+                last_flush = time.monotonic()
+                journal_file = self.decision_log.journal_file
+                if self.unflushed() or (os.path.exists(journal_file) and os.path.getsize(journal_file) > 0):
+                    self.flush()
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️  Background decision flush failed: {e}")
+
+    def close(self):
+        """Stop the background flusher and flush everything that is left"""
+        self._stopping = True
+        self._wake.set()
+        self._flusher.join(timeout=5)
+        self.decision_log.sync()
+        self.flush()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Append-only decision journal
+Each decision is appended to decisions.log and fsynced; the latest entry
+per filename wins. Compaction folds the journal into the SQLite decision
+store and exports decisions.csv.
+
+Durability (BSL_DECISION_DURABILITY):
+  always        fsync every write (default)
+  every:N       fsync after every N decisions
+  interval:T    fsync at most every T seconds (call sync() from a timer)
+
+Usage: python3 decision_log.py compact
+"""
+
+import sys
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from decision_store import DecisionStore
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+def parse_durability(policy):
+    """'always', 'every:N' or 'interval:T' -> (mode, number)"""
+    mode, _, value = (policy or 'always').partition(':')
+    if mode == 'always' and not value:
+        return ('always', 1)
+    if mode == 'every' and value.isdigit() and int(value) > 0:
+        return ('every', int(value))
+    if mode == 'interval':
+        try:
+            if float(value) > 0:
+                return ('interval', float(value))
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid durability policy '{policy}' (use always, every:N or interval:T)")
+
+def normalize_timestamp(value):
+    """Browser ISO timestamps (UTC, 'Z') to the local naive ISO format used in decisions.csv"""
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.isoformat()
+
+class DecisionLog:
+    def __init__(self, base_dir=None, durability=None):
+        base_dir = base_dir or os.getcwd()
+        self.journal_file = os.path.join(base_dir, "decisions.log")
+        self.csv_file = os.path.join(base_dir, "decisions.csv")
+        self.lock_file = os.path.join(base_dir, "decisions.lock")
+        self.store = DecisionStore(base_dir)
+        self.durability = parse_durability(durability or os.environ.get('BSL_DECISION_DURABILITY'))
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    @contextmanager
+    def locked(self):
+        """Serialise journal writers across threads and processes (server, save_decision.py, ...)"""
+        with self._lock:
+            with open(self.lock_file, 'a+') as f:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                    else:
+                        f.seek(0)
+                        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def make_entry(self, filename, decision, timestamp=None, notes='', decision_id=None):
+        entry = {
+            'filename': filename,
+            'decision': decision,
+            'timestamp': timestamp or datetime.now().isoformat(),
+            'notes': notes or ''
+        }
+        if decision_id:
+            entry['id'] = decision_id
+        return entry
+
+    def _write(self, entries):
+        """Append entries, fsyncing according to the durability policy (caller holds the lock)"""
+        if not entries:
+            return
+        with open(self.journal_file, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(entry) + '\n' for entry in entries))
+            f.flush()
+
+            self._unsynced += len(entries)
+            mode, value = self.durability
+            if (mode == 'always'
+                    or (mode == 'every' and self._unsynced >= value)
+                    or (mode == 'interval' and time.monotonic() - self._last_sync >= value)):
+                os.fsync(f.fileno())
+                self._unsynced = 0
+                self._last_sync = time.monotonic()
+
+    def sync(self):
+        """fsync anything written but not yet synced (for the every:N / interval:T policies)"""
+        with self.locked():
+            if self._unsynced and os.path.exists(self.journal_file):
+                with open(self.journal_file, 'a', encoding='utf-8') as f:
+                    os.fsync(f.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def append(self, filename, decision, timestamp=None, notes=''):
+        """Append one decision; durable on return under the default 'always' policy"""
+        entry = self.make_entry(filename, decision, timestamp, notes)
+        self.append_entries([entry])
+        return entry
+
+    def append_entries(self, entries):
+        with self.locked():
+            self._write(entries)
+
+    def read_journal(self):
+        """Read journal entries in append order, skipping a torn last line"""
+        entries = []
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        return entries
+
+    def journal_filenames(self):
+        """Filenames decided since the last compaction"""
+        return {entry['filename'] for entry in self.read_journal()}
+
+    def is_decided(self, filename):
+        return self.store.is_decided(filename) or filename in self.journal_filenames()
+
+    def pending(self, filenames):
+        """Filenames with no decision in the store or the journal, in the order given"""
+        journal_filenames = self.journal_filenames()
+        return [f for f in self.store.pending(filenames) if f not in journal_filenames]
+
+    def compact(self):
+        """Apply the journal to the store, export decisions.csv, then empty the journal
+        Returns the journal entries that were applied"""
+        with self.locked():
+            entries = self.read_journal()
+            if entries:
+                self.store.record_many(entries)
+            self.store.export_csv(self.csv_file)
+
+            # The store now holds every journal entry, so the journal can start over
+            if entries:
+                with open(self.journal_file, 'w', encoding='utf-8') as f:
+                    os.fsync(f.fileno())
+                self._unsynced = 0
+
+        return entries
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] != 'compact':
+        print("Usage: python3 decision_log.py compact")
+        sys.exit(1)
+
+    entries = DecisionLog().compact()
+    print(f"✅ Compacted {len(entries)} journal entries into {os.path.join(os.getcwd(), 'decisions.csv')}")
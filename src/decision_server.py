@@ -2,73 +2,240 @@
 """
 Simple HTTP server to handle CSV decisions
 Run this alongside the HTML interface
+Each request is handled on its own thread; decision writes are serialised
+by the decision journal's lock, so many annotators can post at once.
+Decisions are held in memory and acknowledged after the journal append;
+the decision store and decisions.csv are updated in the background
+(see decision_cache.py and BSL_DECISION_DURABILITY in decision_log.py).
+Latency, throughput and cache metrics are served at /metrics (Prometheus
+text) and /metrics.json.
+Frames under /frame_cache/<eaf>/ are served from the file's frame archive
+through a memory map, with HTTP Range support.
 """
 
 import http.server
-import socketserver
 import json
-import csv
+import mimetypes
 import os
-from datetime import datetime
-from urllib.parse import urlparse, parse_qs
+import signal
+import time
+from urllib.parse import urlparse, unquote
+from frame_cache import FrameCache, full_name
+from decision_log import DecisionLog
+from decision_cache import DecisionCache
+from leases import LeaseManager, default_server_port
+from metrics import Metrics
+
+SERVICE_NAME = "bsl-decision-server"  # /health identifies us, so run_bot.py can reuse a running server
+
+POST_ROUTES = ['/record_decision', '/record_decisions', '/lease', '/lease/renew', '/lease/release']
+
+def route_for(path):
+    """Collapse request paths into a small set of metric labels"""
+    path = urlparse(path).path
+    if path in POST_ROUTES or path in ['/health', '/metrics', '/metrics.json']:
+        return path
+    if path.startswith('/frame_cache/'):
+        return '/frame_cache/full' if path.endswith('_full.png') else '/frame_cache'
+    if path.endswith('.html') or path == '/':
+        return 'page'
+    return 'static'
+
+def parse_range(header, size):
+    """A single 'bytes=a-b', 'bytes=a-' or 'bytes=-n' range -> (start, end) inclusive, or None for the whole entry
+
+    Raises ValueError if the range lies outside the entry (416).
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None  # no range, or several ranges: answer with the whole entry
+    first, _, last = header[len('bytes='):].strip().partition('-')
+    try:
+        if first:
+            start, end = int(first), int(last) if last else size - 1
+        else:
+            start, end = size - int(last), size - 1
+    except ValueError:
+        return None
+    if start < 0:
+        start = 0
+    if start >= size or end < start:
+        raise ValueError(f"Range {header} outside {size} bytes")
+    return start, min(end, size - 1)
 
 class DecisionHandler(http.server.SimpleHTTPRequestHandler):
+    frame_cache = FrameCache(os.path.join(os.getcwd(), "frame_cache"))
+    decisions = None  # DecisionCache, created when the server starts
+    leases = LeaseManager()
+    metrics = Metrics()
+
+    def timed(self, method, handler):
+        started = time.perf_counter()
+        try:
+            handler()
+        finally:
+            self.metrics.observe_request(method, route_for(self.path), time.perf_counter() - started)
+
+    def do_GET(self):
+        self.timed('GET', self.handle_get)
+
     def do_POST(self):
+        self.timed('POST', self.handle_post)
+
+    def handle_get(self):
+        path = unquote(urlparse(self.path).path)
+        if path == '/health':
+            # Readiness probe: only answered once the decision cache is loaded
+            ready = self.decisions is not None
+            self.send_json({
+                "status": "ok" if ready else "starting",
+                "service": SERVICE_NAME,
+                "pid": os.getpid(),
+                "uptime_seconds": round(time.time() - self.metrics.started, 1)
+            }, status=200 if ready else 503)
+            return
+
+        if path == '/metrics':
+            body = self.metrics.to_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if path == '/metrics.json':
+            self.send_json(self.metrics.to_json())
+            return
+
+        if path.startswith('/frame_cache/'):
+            parts = path[len('/frame_cache/'):].split('/')
+            if len(parts) != 2:
+                self.send_response(404)
+                self.end_headers()
+                return
+            eaf_filename, name = parts
+            if name.endswith('_full.png'):
+                # Full-resolution frames are only extracted when a reviewer asks for them
+                frame_key = name[:-len('_full.png')]
+                cached = full_name(frame_key) in self.frame_cache.archive(eaf_filename)
+                self.metrics.increment('frame_cache_hits' if cached else 'frame_cache_misses')
+                if not cached:
+                    started = time.perf_counter()
+                    extracted = self.frame_cache.extract_full(eaf_filename, frame_key)
+                    self.metrics.observe('frame_extract', time.perf_counter() - started)
+                    if not extracted:
+                        self.send_response(404)
+                        self.end_headers()
+                        return
+            self.send_archived(eaf_filename, name)
+            return
+
+        super().do_GET()
+
+    def send_archived(self, eaf_filename, name):
+        """One frame archive entry, sliced from the archive's memory map (whole, or the requested byte range)"""
+        view = self.frame_cache.archive(eaf_filename).view(name)
+        if view is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        size = len(view)
+        try:
+            byte_range = parse_range(self.headers.get('Range'), size)
+        except ValueError:
+            self.send_response(416)
+            self.send_header('Content-Range', f"bytes */{size}")
+            self.end_headers()
+            return
+
+        start, end = byte_range or (0, size - 1)
+        self.send_response(206 if byte_range else 200)
+        self.send_header('Content-type', mimetypes.guess_type(name)[0] or 'application/octet-stream')
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(end - start + 1))
+        if byte_range:
+            self.send_header('Content-Range', f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        self.wfile.write(view[start:end + 1])
+
+    def read_json(self):
+        content_length = int(self.headers['Content-Length'])
+        post_data = self.rfile.read(content_length)
+        return json.loads(post_data.decode('utf-8'))
+
+    def send_json(self, payload, status=200):
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(json.dumps(payload).encode())
+
+    def handle_post(self):
         if self.path == '/record_decision':
             # Handle decision recording
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
-
-            # Record to CSV
-            csv_file = os.path.join(os.getcwd(), "decisions.csv")
-
-            # Ensure CSV exists
-            if not os.path.exists(csv_file):
-                with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(['filename', 'decision', 'timestamp', 'notes'])
-
-            # Read existing data
-            existing_data = []
-            updated = False
-
-            if os.path.exists(csv_file):
-                with open(csv_file, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        if row['filename'] == data['filename']:
-                            # Update existing entry
-                            row['decision'] = data['decision']
-                            row['timestamp'] = datetime.now().isoformat()
-                            row['notes'] = data.get('notes', '')
-                            updated = True
-                        existing_data.append(row)
-
-            # Add new entry if not updated
-            if not updated:
-                existing_data.append({
-                    'filename': data['filename'],
-                    'decision': data['decision'],
-                    'timestamp': datetime.now().isoformat(),
-                    'notes': data.get('notes', '')
-                })
-
-            # Write back to CSV
-            with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                if existing_data:
-                    writer = csv.DictWriter(f, fieldnames=['filename', 'decision', 'timestamp', 'notes'])
-                    writer.writeheader()
-                    writer.writerows(existing_data)
+            data = self.read_json()
+
+            # Journal append now, decision store and CSV in the background
+            self.decisions.record([{
+                'filename': data['filename'],
+                'decision': data['decision'],
+                'notes': data.get('notes', '')
+            }])
+            self.leases.release(data['filename'])
+            self.metrics.record_decisions(1, data.get('annotator'))
 
             print(f"✅ Recorded: {data['filename']} -> {data['decision']}")
 
-            # Send response
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({"status": "success"}).encode())
+            self.send_json({"status": "success"})
+
+        elif self.path == '/record_decisions':
+            # Batched, idempotent decisions from the page's local queue
+            try:
+                valid = []
+                invalid = []
+                for d in self.read_json().get('decisions', []):
+                    if d.get('filename') and d.get('decision') in ['accept', 'reject']:
+                        valid.append(d)
+                    else:
+                        invalid.append(d.get('id'))
+            except (ValueError, AttributeError, TypeError):
+                self.send_json({"status": "error", "message": "Expected {\"decisions\": [...]}"}, status=400)
+                return
+
+            entries, duplicates = self.decisions.record(valid)
+
+            annotators = {d.get('id'): d.get('annotator') for d in valid}
+            for entry in entries:
+                self.leases.release(entry['filename'])
+                self.metrics.record_decisions(1, annotators.get(entry.get('id')))
+                print(f"✅ Recorded: {entry['filename']} -> {entry['decision']}")
+
+            self.send_json({
+                "status": "success",
+                "accepted": [entry.get('id') for entry in entries],
+                "duplicates": duplicates,
+                "invalid": invalid
+            })
+
+        elif self.path == '/lease':
+            # Hand this annotator a pending file nobody else is reviewing
+            data = self.read_json()
+            pending = self.decisions.pending(data.get('candidates', []))
+            filename = self.leases.acquire(data['annotator'], pending)
+            self.send_json({"filename": filename, "lease_seconds": self.leases.lease_seconds})
+
+        elif self.path == '/lease/renew':
+            # Page heartbeat
+            data = self.read_json()
+            if self.leases.renew(data['annotator'], data['filename']):
+                self.send_json({"status": "success", "lease_seconds": self.leases.lease_seconds})
+            else:
+                self.send_json({"status": "lost", "message": "File is leased by another annotator"}, status=409)
+
+        elif self.path == '/lease/release':
+            data = self.read_json()
+            self.leases.release(data['filename'], data.get('annotator'))
+            self.send_json({"status": "success"})
 
         else:
             self.send_response(404)
@@ -81,17 +248,38 @@ class DecisionHandler(http.server.SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
 
+class DecisionServer(http.server.ThreadingHTTPServer):
+    """One thread per request, so a slow page or frame never blocks a decision POST"""
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 128  # many annotators connecting at once
+
+def stop_on_sigterm(signum, frame):
+    raise KeyboardInterrupt
+
 if __name__ == "__main__":
-    PORT = 8000
+    PORT = default_server_port()  # from BSL_DECISION_SERVER (default 8000)
     Handler = DecisionHandler
 
-    with socketserver.TCPServer(("", PORT), Handler) as httpd:
+    Handler.decisions = DecisionCache(DecisionLog(os.getcwd()), metrics=Handler.metrics)
+    Handler.metrics.gauge('decision_queue_depth', Handler.decisions.unflushed)
+    Handler.metrics.gauge('active_leases', lambda: len(Handler.leases.active()))
+    signal.signal(signal.SIGTERM, stop_on_sigterm)
+
+    with DecisionServer(("", PORT), Handler) as httpd:
         print(f"🌐 Decision server running at http://localhost:{PORT}")
         print(f"📊 CSV decisions will be saved to: {os.path.join(os.getcwd(), 'decisions.csv')}")
+        print(f"📝 Decision journal: {Handler.decisions.decision_log.journal_file}")
+        print(f"💾 Journal fsync policy: {':'.join(str(v) for v in Handler.decisions.decision_log.durability)}")
+        print(f"📈 Metrics: http://localhost:{PORT}/metrics (JSON: /metrics.json)")
         print("Press Ctrl+C to stop")
 
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
             print("\n🛑 Server stopped")
-            httpd.shutdown()
\ No newline at end of file
+            httpd.shutdown()
+        finally:
+            # Clean flush so decisions.db and decisions.csv are complete on exit
+            Handler.decisions.close()
+            Handler.frame_cache.close()
\ No newline at end of file
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+SQLite decision store shared by the decision server, save_decision.py and the viewers
+One row per filename (primary key), WAL mode, CSV import/export in the decisions.csv schema
+Usage: python3 decision_store.py import decisions.csv
+       python3 decision_store.py export [decisions.csv]
+       python3 decision_store.py status filename.eaf
+"""
+
+import sys
+import os
+import csv
+import sqlite3
+import threading
+
+CSV_FIELDS = ['filename', 'decision', 'timestamp', 'notes']
+
+# Keep IN (...) lists well under SQLite's host parameter limit
+QUERY_CHUNK = 500
+
+class DecisionStore:
+    def __init__(self, base_dir=None):
+        base_dir = base_dir or os.getcwd()
+        self.db_file = os.path.join(base_dir, "decisions.db")
+        self.csv_file = os.path.join(base_dir, "decisions.csv")
+        self._local = threading.local()
+
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS decisions (
+                    filename TEXT PRIMARY KEY,
+                    decision TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    notes TEXT NOT NULL DEFAULT ''
+                )
+            """)
+            # Client-generated decision ids already applied, so retried batches stay idempotent
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS decision_ids (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL
+                )
+            """)
+            # Downloaded decision fragments already merged by collect_decisions.py
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS merged_fragments (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL
+                )
+            """)
+
+        # First run against an existing project: bring the old CSV across
+        if self.count() == 0 and os.path.exists(self.csv_file):
+            self.import_csv(self.csv_file)
+
+    def _connect(self):
+        """One connection per thread (sqlite3 connections are not shareable)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")  # compaction empties the journal after committing here
+            self._local.conn = conn
+        return conn
+
+    def record(self, filename, decision, timestamp, notes=''):
+        self.record_many([{'filename': filename, 'decision': decision, 'timestamp': timestamp, 'notes': notes}])
+
+    def record_many(self, rows):
+        """Upsert decisions in order; a later row for the same filename wins"""
+        conn = self._connect()
+        with conn:
+            conn.executemany("""
+                INSERT INTO decisions (filename, decision, timestamp, notes)
+                VALUES (:filename, :decision, :timestamp, :notes)
+                ON CONFLICT(filename) DO UPDATE SET
+                    decision = excluded.decision,
+                    timestamp = excluded.timestamp,
+                    notes = excluded.notes
+            """, [{field: row.get(field) or '' for field in CSV_FIELDS} for row in rows])
+            conn.executemany(
+                "INSERT OR IGNORE INTO decision_ids (id, filename) VALUES (?, ?)",
+                [(row['id'], row['filename']) for row in rows if row.get('id')]
+            )
+
+    def merge_latest(self, rows):
+        """Upsert decisions, keeping whichever of stored/incoming has the later timestamp"""
+        conn = self._connect()
+        before = conn.total_changes
+        with conn:
+            conn.executemany("""
+                INSERT INTO decisions (filename, decision, timestamp, notes)
+                VALUES (:filename, :decision, :timestamp, :notes)
+                ON CONFLICT(filename) DO UPDATE SET
+                    decision = excluded.decision,
+                    timestamp = excluded.timestamp,
+                    notes = excluded.notes
+                WHERE excluded.timestamp > decisions.timestamp
+            """, [{field: row.get(field) or '' for field in CSV_FIELDS} for row in rows])
+        return conn.total_changes - before
+
+    def merged_fragments(self):
+        """path -> (size, mtime) of fragment files merged so far"""
+        return {path: (size, mtime) for path, size, mtime in
+                self._connect().execute("SELECT path, size, mtime FROM merged_fragments")}
+
+    def mark_fragments_merged(self, fragments):
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO merged_fragments (path, size, mtime) VALUES (?, ?, ?)", fragments
+            )
+
+    def get(self, filename):
+        row = self._connect().execute(
+            "SELECT filename, decision, timestamp, notes FROM decisions WHERE filename = ?", (filename,)
+        ).fetchone()
+        return dict(zip(CSV_FIELDS, row)) if row else None
+
+    def is_decided(self, filename):
+        return self._connect().execute(
+            "SELECT 1 FROM decisions WHERE filename = ?", (filename,)
+        ).fetchone() is not None
+
+    def decided_among(self, filenames):
+        """Subset of filenames that already have a decision (indexed lookups)"""
+        filenames = list(filenames)
+        decided = set()
+        conn = self._connect()
+        for i in range(0, len(filenames), QUERY_CHUNK):
+            chunk = filenames[i:i + QUERY_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            for (filename,) in conn.execute(
+                f"SELECT filename FROM decisions WHERE filename IN ({placeholders})", chunk
+            ):
+                decided.add(filename)
+        return decided
+
+    def filenames(self):
+        return {filename for (filename,) in self._connect().execute("SELECT filename FROM decisions")}
+
+    def decision_ids(self):
+        return {decision_id for (decision_id,) in self._connect().execute("SELECT id FROM decision_ids")}
+
+    def known_ids(self, decision_ids):
+        """Subset of client decision ids that have already been applied"""
+        decision_ids = list(decision_ids)
+        known = set()
+        conn = self._connect()
+        for i in range(0, len(decision_ids), QUERY_CHUNK):
+            chunk = decision_ids[i:i + QUERY_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            for (decision_id,) in conn.execute(
+                f"SELECT id FROM decision_ids WHERE id IN ({placeholders})", chunk
+            ):
+                known.add(decision_id)
+        return known
+
+    def pending(self, filenames):
+        """Filenames without a decision, in the order given"""
+        filenames = list(filenames)
+        decided = self.decided_among(filenames)
+        return [f for f in filenames if f not in decided]
+
+    def rows(self):
+        """Every decision as a dict, ordered by filename"""
+        for row in self._connect().execute(
+            "SELECT filename, decision, timestamp, notes FROM decisions ORDER BY filename"
+        ):
+            yield dict(zip(CSV_FIELDS, row))
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+
+    def import_csv(self, csv_path):
+        rows = []
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if row.get('filename') and row.get('decision'):
+                    rows.append(row)
+        self.record_many(rows)
+        return len(rows)
+
+    def export_csv(self, csv_path=None):
+        """Write every decision to CSV (same schema as decisions.csv) via an atomic replace"""
+        csv_path = csv_path or self.csv_file
+        temp_file = f"{csv_path}.{os.getpid()}.{threading.get_ident()}.tmp"  # unique per writer
+        count = 0
+        with open(temp_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_FIELDS)
+            for row in self._connect().execute(
+                "SELECT filename, decision, timestamp, notes FROM decisions ORDER BY rowid"
+            ):
+                writer.writerow(row)
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, csv_path)
+        return count
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ['import', 'export', 'status']:
+        print("Usage: python3 decision_store.py import decisions.csv")
+        print("       python3 decision_store.py export [decisions.csv]")
+        print("       python3 decision_store.py status filename.eaf")
+        sys.exit(1)
+
+    store = DecisionStore()
+    command = sys.argv[1]
+
+    if command == 'import':
+        if len(sys.argv) != 3:
+            print("Usage: python3 decision_store.py import decisions.csv")
+            sys.exit(1)
+        count = store.import_csv(sys.argv[2])
+        print(f"✅ Imported {count} decisions from {sys.argv[2]}")
+    elif command == 'export':
+        csv_path = sys.argv[2] if len(sys.argv) > 2 else None
+        count = store.export_csv(csv_path)
+        print(f"✅ Exported {count} decisions to {csv_path or store.csv_file}")
+    else:
+        if len(sys.argv) != 3:
+            print("Usage: python3 decision_store.py status filename.eaf")
+            sys.exit(1)
+        row = store.get(sys.argv[2])
+        if row:
+            print(f"✅ {row['filename']} -> {row['decision']} ({row['timestamp']}) {row['notes']}")
+        else:
+            print(f"⏳ {sys.argv[2]} is pending")
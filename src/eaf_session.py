@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Per-file EAF session shared by the scanner, the viewers, the analysis tools and the debug tools
+Each EAF is parsed once per process. The session keeps the dominant tier,
+its GOOD intervals, the video-to-offset map from the media descriptors and
+the resolved video paths. Sessions are memoised (most recently used first)
+and reparsed only when the file's size or modification time changes.
+"""
+
+import os
+import glob
+import threading
+from collections import Counter, OrderedDict
+from records import Annotation
+
+SESSION_CACHE_SIZE = 64  # parsed EAFs kept per process
+VIDEO_EXTENSIONS = ['.mov', '.mp4', '.avi']
+
+def dominant_tier_for(filename):
+    """Left-handed signers are annotated on the LH tier (filename ends in _LH.eaf)"""
+    return "LH-IDgloss" if filename.upper().endswith('_LH.EAF') else "RH-IDgloss"
+
+def match_videos(media_urls, eaf_filename, video_folder):
+    """Video files in video_folder for an EAF's media URLs, as (path, how) with how 'exact', 'partial' or 'filename'"""
+    found_videos = []
+    for media_url in media_urls:
+        # Look for this video file in our video folder under any of the usual extensions
+        base_name = os.path.splitext(os.path.basename(media_url))[0]
+        for ext in VIDEO_EXTENSIONS:
+            video_path = os.path.join(video_folder, base_name + ext)
+            if os.path.exists(video_path):
+                found_videos.append((video_path, 'exact'))
+                break
+        else:
+            # If exact match not found, try partial matching
+            matches = glob.glob(os.path.join(video_folder, f"*{base_name.replace('-comp', '')}*"))
+            for match in matches:
+                if match not in [path for path, _ in found_videos]:
+                    found_videos.append((match, 'partial'))
+                    break
+
+    # If still no videos found, try basic filename matching
+    if not found_videos:
+        base_name = os.path.splitext(eaf_filename)[0]
+        for pattern in [os.path.join(video_folder, f"{base_name}.*"), os.path.join(video_folder, f"*{base_name}*")]:
+            for match in glob.glob(pattern):
+                if match.lower().endswith(tuple(VIDEO_EXTENSIONS)):
+                    found_videos.append((match, 'filename'))
+    return found_videos
+
+class EafSession:
+    def __init__(self, file_path, target_sign="GOOD"):
+        import pympi  # only needed once an EAF is actually parsed
+
+        stat = os.stat(file_path)
+        self.path = file_path
+        self.filename = os.path.basename(file_path)
+        self.size, self.mtime = stat.st_size, stat.st_mtime
+        self.target_sign = target_sign
+        self.eaf = pympi.Elan.Eaf(file_path)
+
+        self.dominant_tier = dominant_tier_for(self.filename)
+        self.has_dominant_tier = self.dominant_tier in self.eaf.get_tier_names()
+        self.dominant_data = self.eaf.get_annotation_data_for_tier(self.dominant_tier) if self.has_dominant_tier else []
+        self.total = sum(1 for _, _, value in self.dominant_data if value and value.strip())
+        self.good_annotations = [
+            Annotation(start_time, end_time, value)
+            for start_time, end_time, value in self.dominant_data
+            if value and value.strip().upper() == target_sign.upper()
+        ]
+
+        # (MEDIA_URL, TIME_ORIGIN or None) for every linked media file, in EAF order
+        self.media = [(descriptor["MEDIA_URL"], descriptor.get("TIME_ORIGIN"))
+                      for descriptor in getattr(self.eaf, 'media_descriptors', []) if "MEDIA_URL" in descriptor]
+        self._offsets = {}
+        self._videos = {}
+
+    @property
+    def good_intervals(self):
+        return [(annotation.start_time, annotation.end_time) for annotation in self.good_annotations]
+
+    def tier_counts(self):
+        """Non-empty annotations per tier, for every tier in the file"""
+        return {tier: sum(1 for annotation in self.eaf.get_annotation_data_for_tier(tier)
+                          if annotation[2] and annotation[2].strip())
+                for tier in self.eaf.get_tier_names()}
+
+    def gloss_counts(self):
+        """How often each value occurs on the dominant tier"""
+        return dict(Counter(value.strip() for _, _, value in self.dominant_data if value and value.strip()))
+
+    def video_offset(self, video_filename):
+        """TIME_ORIGIN (ms) of the first media descriptor naming this video, 0 if none"""
+        if video_filename not in self._offsets:
+            offset = 0
+            for media_url, time_origin in self.media:
+                if time_origin is not None and video_filename in media_url:
+                    try:
+                        offset = int(time_origin)
+                    except ValueError as e:
+                        print(f"   WARNING: Could not get video offset for {video_filename}: {e}")
+                    break
+            self._offsets[video_filename] = offset
+        return self._offsets[video_filename]
+
+    def find_videos(self, video_folder):
+        """Video files in video_folder for this EAF's media descriptors (resolved once per folder)"""
+        if video_folder in self._videos:
+            return list(self._videos[video_folder])
+
+        found_videos = []
+        for video_path, how in match_videos([media_url for media_url, _ in self.media], self.filename, video_folder):
+            found_videos.append(video_path)
+            if how == 'exact':
+                print(f"   Video: Found video: {os.path.basename(video_path)}")
+            elif how == 'partial':
+                print(f"   Video: Found video (partial match): {os.path.basename(video_path)}")
+
+        self._videos[video_folder] = found_videos
+        return list(found_videos)
+
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+
+def open_session(file_path, target_sign="GOOD"):
+    """The memoised session for an EAF, reparsed only if the file changed since it was opened"""
+    key = (os.path.abspath(file_path), target_sign.upper())
+    stat = os.stat(file_path)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is not None and (session.size, session.mtime) == (stat.st_size, stat.st_mtime):
+            _sessions.move_to_end(key)
+            return session
+
+    session = EafSession(file_path, target_sign)
+    with _sessions_lock:
+        _sessions[key] = session
+        _sessions.move_to_end(key)
+        while len(_sessions) > SESSION_CACHE_SIZE:
+            _sessions.popitem(last=False)
+    return session
+
+def clear_sessions():
+    """Forget every parsed EAF (benchmarks use this to measure cold parses)"""
+    with _sessions_lock:
+        _sessions.clear()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Packed per-file frame archive
+All frames and metadata for one EAF live in a single append-only file:
+entries are appended back to back, followed by a compact binary offset index
+and a fixed-size trailer pointing at it. Appending writes new entries, a new
+index and a new trailer after the old ones (then fsyncs), leaving the previous
+trailer in place: if an append is interrupted, readers fall back to the last
+complete trailer and the next append truncates the torn tail. Reads go
+through a memory map, so the decision server can answer frame and Range
+requests by slicing.
+
+Layout: [entry bytes ...][index][trailer]
+  index    per entry: offset (u64), length (u32), name length (u16), name (UTF-8)
+  trailer  index offset (u64), index length (u32), magic
+"""
+
+import os
+import mmap
+import struct
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialised within the process
+    fcntl = None
+
+MAGIC = b'BSLPACK1'
+TRAILER = struct.Struct('<QI8s')
+ENTRY = struct.Struct('<QIH')
+
+def pack_index(entries):
+    parts = []
+    for name, (offset, length) in entries.items():
+        encoded = name.encode('utf-8')
+        parts.append(ENTRY.pack(offset, length, len(encoded)) + encoded)
+    return b''.join(parts)
+
+def unpack_index(data):
+    entries = {}
+    position = 0
+    while position < len(data):
+        offset, length, name_length = ENTRY.unpack_from(data, position)
+        position += ENTRY.size
+        entries[data[position:position + name_length].decode('utf-8')] = (offset, length)
+        position += name_length
+    return entries
+
+def write_entries(f, start, files, entries):
+    """Append files at start, then the index and trailer; returns the updated entries"""
+    f.seek(start)
+    position = start
+    entries = dict(entries)
+    for name, data in files.items():
+        f.write(data)
+        entries[name] = (position, len(data))
+        position += len(data)
+    index = pack_index(entries)
+    f.write(index)
+    f.write(TRAILER.pack(position, len(index), MAGIC))
+    return entries
+
+class FrameArchive:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        # (stamp, entries, map), swapped together so readers never mix them; the stamp is the
+        # (inode, size, mtime) of the file the index and map come from
+        self._state = (None, {}, None)
+
+    @staticmethod
+    def write(path, files):
+        """New archive holding {name: bytes}, atomically replacing any archive already at path"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_file = f"{path}.{os.getpid()}.tmp"
+        with open(temp_file, 'wb') as f:
+            write_entries(f, 0, files, {})
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, path)
+
+    def append(self, files):
+        """Add {name: bytes} to the archive (a name added again replaces the earlier entry)"""
+        with self._lock:
+            with open(self.path, 'r+b') as f:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    entries, end = self._read_index(f, f.seek(0, os.SEEK_END))
+                    f.truncate(end)  # drops the tail of an interrupted append, if any
+                    # Old indexes stay behind as a few unused bytes; the new one follows them
+                    write_entries(f, end, files, entries)
+                    f.flush()
+                    os.fsync(f.fileno())
+                finally:
+                    if fcntl:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            self._state = (None,) + self._state[1:]
+
+    def _read_index(self, f, size):
+        """(entries, end of the archive) from the last complete trailer at or before size"""
+        if size >= TRAILER.size:
+            f.seek(size - TRAILER.size)
+            index_offset, index_length, magic = TRAILER.unpack(f.read(TRAILER.size))
+            if magic == MAGIC and index_offset + index_length + TRAILER.size == size:
+                f.seek(index_offset)
+                return unpack_index(f.read(index_length)), size
+            if size > TRAILER.size:
+                return self._recover_index(f, size)
+        raise ValueError(f"{self.path} is not a frame archive")
+
+    def _recover_index(self, f, size):
+        """Search back past a torn append for the previous complete trailer"""
+        with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as data:
+            position = size
+            while True:
+                position = data.rfind(MAGIC, 0, position)
+                end = position + len(MAGIC)
+                if position < 0:
+                    raise ValueError(f"{self.path} is not a frame archive")
+                if end < TRAILER.size:
+                    continue
+                index_offset, index_length, _ = TRAILER.unpack_from(data, end - TRAILER.size)
+                if index_offset + index_length + TRAILER.size != end:
+                    continue  # the magic bytes inside a frame, not a trailer
+                try:
+                    entries = unpack_index(data[index_offset:index_offset + index_length])
+                except (struct.error, UnicodeDecodeError):
+                    continue
+                if all(offset + length <= index_offset for offset, length in entries.values()):
+                    return entries, end
+
+    def _refresh(self):
+        """(entries, map), re-read and remapped if the archive was appended to or replaced"""
+        stat = os.stat(self.path)
+        stamp, entries, archive_map = self._state
+        if archive_map is None or (stat.st_ino, stat.st_size, stat.st_mtime_ns) != stamp:
+            with self._lock:
+                with open(self.path, 'rb') as f:
+                    stat = os.fstat(f.fileno())  # the file actually opened, if it was just replaced
+                    entries, _ = self._read_index(f, stat.st_size)
+                    archive_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                # The previous map is left to the garbage collector: responses may still be slicing it
+                self._state = ((stat.st_ino, stat.st_size, stat.st_mtime_ns), entries, archive_map)
+        return entries, archive_map
+
+    def close(self):
+        """Release the memory map (and its file descriptor); the next read maps the archive again"""
+        with self._lock:
+            archive_map = self._state[2]
+            self._state = (None, {}, None)
+        if archive_map is not None:
+            try:
+                archive_map.close()
+            except BufferError:
+                pass  # a response is still slicing it: the garbage collector closes it afterwards
+
+    def names(self):
+        try:
+            return set(self._refresh()[0])
+        except (OSError, ValueError):
+            return set()
+
+    def __contains__(self, name):
+        try:
+            return name in self._refresh()[0]
+        except (OSError, ValueError):
+            return False
+
+    def view(self, name):
+        """Zero-copy memoryview of one entry, or None if the archive or entry is missing"""
+        for _ in range(2):  # once more if the map was closed under us (archive evicted by FrameCache)
+            try:
+                entries, archive_map = self._refresh()
+                location = entries.get(name)
+                if location is None:
+                    return None
+                offset, length = location
+                return memoryview(archive_map)[offset:offset + length]
+            except (OSError, ValueError):
+                continue
+        return None
+
+    def read(self, name):
+        view = self.view(name)
+        return None if view is None else bytes(view)
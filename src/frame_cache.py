@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Two-tier frame cache for the assessment pages
+Tiny previews are extracted for every frame; full-resolution frames
+are only extracted when a reviewer clicks on a preview. The same decode
+also yields a 32x32 grayscale thumbnail for the frame's fingerprint
+
+Each prepared EAF is one file on disk, frame_cache/<eaf>.frames (see
+frame_archive.py): previews, the frame index, fingerprints and the page
+payload are written together once a file is prepared, and full-resolution
+frames are appended as they are requested. ffmpeg writes into a local
+scratch directory, never into the cache itself.
+
+Decode mode (BSL_DECODE_MODE):
+  accurate   the frame at (or just after) each requested point (default)
+  fast       the keyframe at or before each point, decoding keyframes only,
+             for first-pass triage; the frame's true timestamp is recorded
+"""
+
+import os
+import re
+import glob
+import json
+import atexit
+import base64
+import shutil
+import itertools
+import tempfile
+import threading
+import subprocess
+from collections import OrderedDict
+from urllib.parse import quote
+from timing import Timer
+from records import FrameRef
+from frame_archive import FrameArchive
+
+PREVIEW_WIDTH = 160
+FINGERPRINT_SIZE = 32  # grayscale thumbnail side for frame_fingerprints.py
+SAMPLE_TAIL_SECONDS = 0.5  # decoded past the last point of a multi-point pass
+DECODE_MODES = ('accurate', 'fast')
+FAST_DECODE_THREADS = 2  # frame threads delay the first decoded frame; one keyframe needs few
+ARCHIVE_SUFFIX = ".frames"
+OPEN_ARCHIVES = 64  # memory-mapped archives kept open (one file descriptor each)
+
+def parse_decode_mode(mode):
+    mode = (mode or 'accurate').strip().lower()
+    if mode not in DECODE_MODES:
+        raise ValueError(f"Invalid decode mode '{mode}' (use {' or '.join(DECODE_MODES)})")
+    return mode
+
+def default_decode_mode():
+    return parse_decode_mode(os.environ.get('BSL_DECODE_MODE'))
+
+def preview_name(frame_key):
+    return f"{frame_key}_preview.jpg"
+
+def full_name(frame_key):
+    return f"{frame_key}_full.png"
+
+class FrameCache:
+    def __init__(self, cache_dir=None, timer=None, decode_mode=None):
+        self.cache_dir = cache_dir or os.path.join(os.getcwd(), "frame_cache")
+        self.timer = timer or Timer()  # every ffmpeg call is a timed span
+        self.decode_mode = parse_decode_mode(decode_mode) if decode_mode else default_decode_mode()
+        self.thumbnails = {}  # eaf filename -> {frame_key: (video filename, 32x32 gray bytes)}
+        self.staged = {}      # eaf filename -> {archive entry name: bytes} until the archive is written
+        self.archives = OrderedDict()  # eaf filename -> FrameArchive, least recently used first
+        self._archives_lock = threading.Lock()  # the decision server looks archives up from many threads
+        self._scratch_dir = None
+        self._scratch_names = itertools.count()
+
+    def archive_path(self, eaf_filename):
+        return os.path.join(self.cache_dir, eaf_filename + ARCHIVE_SUFFIX)
+
+    def archive(self, eaf_filename):
+        """The file's FrameArchive; only the OPEN_ARCHIVES most recently used stay mapped"""
+        evicted = []
+        with self._archives_lock:
+            archive = self.archives.pop(eaf_filename, None) or FrameArchive(self.archive_path(eaf_filename))
+            self.archives[eaf_filename] = archive
+            while len(self.archives) > OPEN_ARCHIVES:
+                evicted.append(self.archives.popitem(last=False)[1])
+        for old in evicted:
+            old.close()
+        return archive
+
+    def close(self):
+        """Close every open archive"""
+        with self._archives_lock:
+            archives = list(self.archives.values())
+            self.archives.clear()
+        for archive in archives:
+            archive.close()
+
+    def prepared_files(self):
+        """EAF filenames with an archive in the cache"""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return sorted(name[:-len(ARCHIVE_SUFFIX)] for name in os.listdir(self.cache_dir) if name.endswith(ARCHIVE_SUFFIX))
+
+    def full_url(self, eaf_filename, frame_key, server_url="http://localhost:8000"):
+        """URL the decision server answers with the full-resolution frame"""
+        return f"{server_url}/frame_cache/{quote(eaf_filename)}/{quote(full_name(frame_key))}"
+
+    def scratch_path(self, suffix):
+        """A fresh path in this process's local scratch directory for ffmpeg output"""
+        if self._scratch_dir is None:
+            self._scratch_dir = tempfile.mkdtemp(prefix="bsl-frames-")
+            atexit.register(shutil.rmtree, self._scratch_dir, True)
+        return os.path.join(self._scratch_dir, f"{next(self._scratch_names)}{suffix}")
+
+    def take(self, path):
+        """Read and remove a scratch file"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        os.remove(path)
+        return data
+
+    def stage(self, eaf_filename, name, data):
+        """Hold an entry for the file's archive (written by save_payload / write_archive)"""
+        self.staged.setdefault(eaf_filename, {})[name] = data
+
+    def read(self, eaf_filename, name):
+        """An entry's bytes, staged or archived, or None"""
+        data = self.staged.get(eaf_filename, {}).get(name)
+        return data if data is not None else self.archive(eaf_filename).read(name)
+
+    def write_archive(self, eaf_filename):
+        """Write everything staged for this file as its archive, replacing any earlier one"""
+        FrameArchive.write(self.archive_path(eaf_filename), self.staged.pop(eaf_filename, {}))
+
+    def discard(self, eaf_filename):
+        """Drop staged entries for a file that will not be archived"""
+        self.staged.pop(eaf_filename, None)
+        self.thumbnails.pop(eaf_filename, None)
+
+    def extract_preview(self, eaf_filename, frame_key, video_path, time_seconds):
+        """Extract a small JPEG preview and the fingerprint thumbnail in a single seek-and-decode pass
+
+        Returns the time (seconds) of the frame actually decoded, or None if extraction failed.
+        """
+        if self.decode_mode == 'fast':
+            return self._extract_keyframe(eaf_filename, frame_key, video_path, time_seconds)
+
+        output_path = self.scratch_path('.jpg')
+        try:
+            cmd = [
+                'ffmpeg', '-ss', str(time_seconds), '-i', video_path,
+                '-filter_complex', f'[0:v]split[p][f];[p]scale={PREVIEW_WIDTH}:-2[preview];'
+                                   f'[f]scale={FINGERPRINT_SIZE}:{FINGERPRINT_SIZE},format=gray[thumb]',
+                '-map', '[preview]', '-vframes', '1', '-q:v', '5', '-y', output_path,
+                '-map', '[thumb]', '-vframes', '1', '-f', 'rawvideo', '-'
+            ]
+            with self.timer.span('ffmpeg', kind='preview', file=eaf_filename,
+                                 video=os.path.basename(video_path), time_seconds=time_seconds) as span:
+                thumbnail = subprocess.run(cmd, capture_output=True, check=True).stdout
+                preview = self.take(output_path)
+                span['bytes'] = len(preview)
+            self.stage(eaf_filename, preview_name(frame_key), preview)
+            self._keep_thumbnail(eaf_filename, frame_key, video_path, thumbnail)
+            return time_seconds
+        except:
+            return None
+
+    def _extract_keyframe(self, eaf_filename, frame_key, video_path, time_seconds):
+        """Fast mode: decode only the keyframe at or before time_seconds, reporting its timestamp"""
+        output_path = self.scratch_path('.jpg')
+        try:
+            cmd = [
+                # Seek to the preceding keyframe and keep it (no decoding forward to the exact time);
+                # -copyts keeps showinfo's pts_time on the video's own clock
+                'ffmpeg', '-threads', str(FAST_DECODE_THREADS), '-skip_frame', 'nokey', '-flags2', '+fast',
+                '-noaccurate_seek', '-ss', str(time_seconds), '-copyts', '-i', video_path,
+                '-an', '-sn', '-dn',
+                '-filter_complex', f'[0:v]showinfo,split[p][f];[p]scale={PREVIEW_WIDTH}:-2:flags=fast_bilinear[preview];'
+                                   f'[f]scale={FINGERPRINT_SIZE}:{FINGERPRINT_SIZE}:flags=fast_bilinear,format=gray[thumb]',
+                '-map', '[preview]', '-frames:v', '1', '-q:v', '5', '-y', output_path,
+                '-map', '[thumb]', '-frames:v', '1', '-f', 'rawvideo', '-'
+            ]
+            with self.timer.span('ffmpeg', kind='keyframe', file=eaf_filename,
+                                 video=os.path.basename(video_path), time_seconds=time_seconds) as span:
+                result = subprocess.run(cmd, capture_output=True, check=True)
+                preview = self.take(output_path)
+                span['bytes'] = len(preview)
+            self.stage(eaf_filename, preview_name(frame_key), preview)
+            self._keep_thumbnail(eaf_filename, frame_key, video_path, result.stdout)
+            decoded = re.search(r'pts_time:\s*([-\d.]+)', result.stderr.decode('utf-8', 'replace'))
+            return round(float(decoded.group(1)), 3) if decoded else time_seconds
+        except:
+            return None
+
+    def _keep_thumbnail(self, eaf_filename, frame_key, video_path, thumbnail):
+        if len(thumbnail) == FINGERPRINT_SIZE * FINGERPRINT_SIZE:
+            self.thumbnails.setdefault(eaf_filename, {})[frame_key] = (os.path.basename(video_path), thumbnail)
+
+    def extract_points(self, eaf_filename, video_path, targets):
+        """Previews for several (frame_key, time_seconds) points from one seek-and-decode pass
+
+        Seeks once to the earliest point and decodes forward, selecting the first frame at or after
+        each point; showinfo reports which frames were emitted. Returns {frame_key: decoded time in
+        seconds} for the points extracted. Falls back to one extract_preview per point if the pass fails.
+        In fast mode each point is a keyframe seek of its own, which is cheaper than decoding forward.
+        """
+        targets = sorted(targets, key=lambda target: target[1])
+        if len(targets) == 1 or self.decode_mode == 'fast':
+            return self._extract_each(eaf_filename, video_path, targets)
+
+        start = max(targets[0][1], 0.0)
+        offsets = [max(time_seconds - start, 0.0) for _, time_seconds in targets]
+        selection = '+'.join(f"gte(t,{offset:.4f})*(lt(prev_t,{offset:.4f})+isnan(prev_t))" for offset in offsets)
+        output_pattern = self.scratch_path('-%03d.jpg')
+        try:
+            cmd = [
+                'ffmpeg', '-ss', f"{start:.4f}", '-t', f"{offsets[-1] + SAMPLE_TAIL_SECONDS:.4f}", '-i', video_path,
+                '-an', '-sn', '-vsync', '0',
+                '-filter_complex', f"[0:v]select='{selection}',showinfo,split[p][f];"
+                                   f"[p]scale={PREVIEW_WIDTH}:-2[preview];"
+                                   f"[f]scale={FINGERPRINT_SIZE}:{FINGERPRINT_SIZE},format=gray[thumb]",
+                '-map', '[preview]', '-frames:v', str(len(targets)), '-q:v', '5', '-y', output_pattern,
+                '-map', '[thumb]', '-frames:v', str(len(targets)), '-f', 'rawvideo', '-'
+            ]
+            with self.timer.span('ffmpeg', kind='multi', file=eaf_filename, video=os.path.basename(video_path),
+                                 time_seconds=start, points=len(targets)) as span:
+                try:
+                    result = subprocess.run(cmd, capture_output=True, check=True)
+                finally:
+                    # Read (and remove) whatever was written, even if ffmpeg failed part way
+                    previews = [self.take(path) for path in
+                                sorted(glob.glob(output_pattern.replace('%03d', '[0-9][0-9][0-9]')))]
+                span['bytes'] = sum(len(preview) for preview in previews)
+
+            # showinfo logs one line per emitted frame, in output order
+            decoded = [float(t) for t in re.findall(r'pts_time:\s*([-\d.]+)', result.stderr.decode('utf-8', 'replace'))]
+            if not previews or len(decoded) < len(previews):
+                raise ValueError("sampling pass produced no usable frames")
+            thumbnail_size = FINGERPRINT_SIZE * FINGERPRINT_SIZE
+
+            extracted = {}
+            frame_index = 0
+            for (frame_key, _), offset in zip(targets, offsets):
+                # The first emitted frame at or after this point (short annotations may share one)
+                while frame_index < len(previews) - 1 and decoded[frame_index] < offset - 1e-3:
+                    frame_index += 1
+                if decoded[frame_index] < offset - 1e-3:
+                    # The pass ended before this point (end of video): try it on its own
+                    extracted.update(self._extract_each(eaf_filename, video_path, [(frame_key, start + offset)]))
+                    continue
+                self.stage(eaf_filename, preview_name(frame_key), previews[frame_index])
+                thumbnail = result.stdout[frame_index * thumbnail_size:(frame_index + 1) * thumbnail_size]
+                self._keep_thumbnail(eaf_filename, frame_key, video_path, thumbnail)
+                extracted[frame_key] = round(start + decoded[frame_index], 3)
+            return extracted
+        except Exception:
+            return self._extract_each(eaf_filename, video_path, targets)
+
+    def _extract_each(self, eaf_filename, video_path, targets):
+        """One extract_preview per (frame_key, time_seconds) -> {frame_key: decoded time}"""
+        extracted = {}
+        for frame_key, time_seconds in targets:
+            decoded = self.extract_preview(eaf_filename, frame_key, video_path, time_seconds)
+            if decoded is not None:
+                extracted[frame_key] = decoded
+        return extracted
+
+    def read_preview(self, eaf_filename, frame_key):
+        data = self.read(eaf_filename, preview_name(frame_key))
+        if data is None:
+            raise FileNotFoundError(f"No preview {frame_key} for {eaf_filename}")
+        return data
+
+    def preview_base64(self, eaf_filename, frame_key):
+        """Preview as base64 text for inlining into a page (encoded only while rendering)"""
+        return base64.b64encode(self.read_preview(eaf_filename, frame_key)).decode('ascii')
+
+    def read_json(self, eaf_filename, name, default):
+        data = self.read(eaf_filename, name)
+        try:
+            return json.loads(data) if data is not None else default
+        except ValueError:
+            return default
+
+    def save_index(self, eaf_filename, sources):
+        """Remember which video and time each frame key was taken from"""
+        self.stage(eaf_filename, "index.json", json.dumps(sources).encode('utf-8'))
+
+    def load_index(self, eaf_filename):
+        return self.read_json(eaf_filename, "index.json", {})
+
+    def save_fingerprints(self, eaf_filename):
+        """Hash every thumbnail extracted for this file in one batch and stage fingerprints.json"""
+        import numpy as np
+        from frame_fingerprints import fingerprint
+
+        thumbnails = self.thumbnails.pop(eaf_filename, {})
+        if not thumbnails:
+            return {}
+        keys = list(thumbnails)
+        stack = np.frombuffer(b''.join(thumbnails[key][1] for key in keys), dtype=np.uint8)
+        hashes, means, variances = fingerprint(stack.reshape(len(keys), FINGERPRINT_SIZE, FINGERPRINT_SIZE))
+        fingerprints = {
+            key: {'video': thumbnails[key][0], 'phash': f"{int(h):016x}", 'mean': round(float(m), 2),
+                  'variance': round(float(v), 2)}
+            for key, h, m, v in zip(keys, hashes, means, variances)
+        }
+        self.stage(eaf_filename, "fingerprints.json", json.dumps(fingerprints).encode('utf-8'))
+        return fingerprints
+
+    def load_fingerprints(self, eaf_filename):
+        return self.read_json(eaf_filename, "fingerprints.json", {})
+
+    def save_payload(self, eaf_filename, frames, points):
+        """Store a prepared page's frame list and write the file's archive; written last, so it marks the file complete
+
+        points is the sampling configuration the frames were taken with (see sampling.py).
+        """
+        payload = {'decode_mode': self.decode_mode, 'points': [list(point) for point in points],
+                   'frames': [frame.to_dict() for frame in frames]}
+        self.stage(eaf_filename, "page.json", json.dumps(payload).encode('utf-8'))
+        self.write_archive(eaf_filename)
+
+    def load_payload(self, eaf_filename, points):
+        """Prepared FrameRefs, or None if the file is not prepared with this decode mode and these sampling points
+        (or a preview has gone missing)"""
+        archive = self.archive(eaf_filename)
+        try:
+            payload = json.loads(archive.read("page.json"))
+            if payload['decode_mode'] != self.decode_mode or payload['points'] != [list(point) for point in points]:
+                return None  # prepared in the other mode or for the other viewer: extract again
+            frames = [FrameRef.from_dict(values) for values in payload['frames']]
+        except (ValueError, KeyError, TypeError):
+            return None  # not prepared, or an older payload layout: prepared again
+        names = archive.names()
+        if not all(preview_name(frame.key) in names for frame in frames):
+            return None
+        return frames
+
+    def extract_full(self, eaf_filename, frame_key):
+        """Extract the full-resolution frame into the archive the first time it is requested"""
+        archive = self.archive(eaf_filename)
+        if full_name(frame_key) in archive:
+            return True
+
+        source = self.load_index(eaf_filename).get(frame_key)
+        if not source:
+            return False
+
+        output_path = self.scratch_path('.png')
+        try:
+            cmd = [
+                'ffmpeg', '-ss', str(source['time_seconds']), '-i', source['video_path'],
+                '-vframes', '1', '-q:v', '2', '-y', output_path
+            ]
+            with self.timer.span('ffmpeg', kind='full', file=eaf_filename,
+                                 video=os.path.basename(source['video_path']),
+                                 time_seconds=source['time_seconds']) as span:
+                subprocess.run(cmd, capture_output=True, check=True)
+                frame = self.take(output_path)
+                span['bytes'] = len(frame)
+            archive.append({full_name(frame_key): frame})
+            return True
+        except:
+            return False
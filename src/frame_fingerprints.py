@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Perceptual-hash fingerprints for extracted frames
+Every preview extraction also yields a 32x32 grayscale thumbnail. Each file's
+thumbnails are hashed in one batch (64-bit DCT perceptual hash, mean luminance,
+variance) into the file's frame archive (fingerprints.json). Videos whose frames are
+black, blank, frozen across annotations, or duplicated across camera angles
+are flagged in analysis.db and handled before normal review
+(BSL_FLAGGED_FILES=front, the default, or skip).
+
+Usage: python3 frame_fingerprints.py   (re-assess every fingerprinted file in the frame cache)
+"""
+
+import numpy as np
+from frame_cache import FrameCache, FINGERPRINT_SIZE
+from analysis_store import AnalysisStore
+
+HASH_SIZE = 8             # low-frequency DCT block -> 64-bit hash
+BLACK_MEAN = 16           # mean luminance (0-255) below which a frame is black
+FLAT_VARIANCE = 20.0      # luminance variance below which a frame is blank
+NEAR_IDENTICAL_BITS = 2   # hashes this close count as the same picture
+FLAG_FRACTION = 0.8       # share of frames (or frame pairs) that must match to flag a video
+MIN_ANNOTATIONS = 3       # frozen/duplicate checks need frames from this many annotations
+
+def _dct_matrix(n):
+    """Orthonormal DCT-II basis, so a 2-D DCT of a stack is two matrix products"""
+    k = np.arange(n)[:, None]
+    basis = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    basis[0] /= np.sqrt(2.0)
+    return basis
+
+_DCT = _dct_matrix(FINGERPRINT_SIZE)
+
+def fingerprint(thumbnails):
+    """(n, 32, 32) uint8 stack -> (hashes as uint64, mean luminance, variance), all vectorised"""
+    pixels = np.asarray(thumbnails, dtype=np.float64)
+    means = pixels.mean(axis=(1, 2))
+    variances = pixels.var(axis=(1, 2))
+
+    coefficients = _DCT @ pixels @ _DCT.T
+    low = coefficients[:, :HASH_SIZE, :HASH_SIZE].reshape(len(pixels), -1)
+    # Median without the DC term, so overall brightness does not decide the bits
+    bits = low > np.median(low[:, 1:], axis=1, keepdims=True)
+    hashes = (bits.astype(np.uint64) << np.arange(HASH_SIZE * HASH_SIZE, dtype=np.uint64)).sum(axis=1, dtype=np.uint64)
+    return hashes, means, variances
+
+def hamming(hashes1, hashes2):
+    """Pairwise bit distances between two arrays of 64-bit hashes"""
+    xor = np.bitwise_xor(np.asarray(hashes1, dtype=np.uint64)[:, None], np.asarray(hashes2, dtype=np.uint64)[None, :])
+    return np.unpackbits(xor[..., None].view(np.uint8), axis=-1).sum(axis=-1)
+
+def _frame_parts(frame_key):
+    """'ann3_v2_midpoint' -> ('ann3', 'v2', 'midpoint')"""
+    parts = frame_key.split('_', 2)
+    return tuple(parts) if len(parts) == 3 else (frame_key, '', '')
+
+def assess(fingerprints):
+    """Flags for one file's fingerprints: {'flags': [...], 'detail': '...'}"""
+    by_video = {}
+    for key, record in fingerprints.items():
+        annotation, video, point = _frame_parts(key)
+        by_video.setdefault(video, []).append((annotation, point, record))
+
+    flags, detail = [], []
+    hashes_by_video, names = {}, {}
+    for video, frames in sorted(by_video.items()):
+        hashes = np.array([int(record['phash'], 16) for _, _, record in frames], dtype=np.uint64)
+        means = np.array([record['mean'] for _, _, record in frames])
+        variances = np.array([record['variance'] for _, _, record in frames])
+        hashes_by_video[video] = {(annotation, point): h for (annotation, point, _), h in zip(frames, hashes)}
+        name = names[video] = frames[0][2].get('video') or video
+
+        flat = variances < FLAT_VARIANCE
+        if (flat & (means < BLACK_MEAN)).mean() >= FLAG_FRACTION:
+            flags.append('black')
+            detail.append(f"{name}: {(flat & (means < BLACK_MEAN)).sum()}/{len(frames)} frames black")
+            continue
+        if flat.mean() >= FLAG_FRACTION:
+            flags.append('blank')
+            detail.append(f"{name}: {flat.sum()}/{len(frames)} frames blank")
+            continue
+
+        # Frozen: frames from different annotations (seconds or minutes apart) look the same
+        annotations = np.array([annotation for annotation, _, _ in frames])
+        if len(set(annotations)) >= MIN_ANNOTATIONS:
+            across = annotations[:, None] != annotations[None, :]
+            same = (hamming(hashes, hashes) <= NEAR_IDENTICAL_BITS) & across
+            if same.sum() >= FLAG_FRACTION * across.sum():
+                flags.append('frozen')
+                detail.append(f"{name}: {same.sum() // 2}/{across.sum() // 2} frame pairs across annotations identical")
+
+    # Duplicate: two camera angles showing the same picture at the same moments
+    videos = sorted(hashes_by_video)
+    for i, first in enumerate(videos):
+        for second in videos[i + 1:]:
+            shared = sorted(set(hashes_by_video[first]) & set(hashes_by_video[second]))
+            if len({annotation for annotation, _ in shared}) < MIN_ANNOTATIONS:
+                continue
+            distances = np.diagonal(hamming([hashes_by_video[first][k] for k in shared],
+                                            [hashes_by_video[second][k] for k in shared]))
+            if (distances <= NEAR_IDENTICAL_BITS).mean() >= FLAG_FRACTION:
+                flags.append('duplicate')
+                detail.append(f"{names[first]} and {names[second]} identical in {(distances <= NEAR_IDENTICAL_BITS).sum()}/{len(shared)} frames")
+
+    return {'flags': sorted(set(flags)), 'detail': '; '.join(detail)}
+
+def fingerprint_file(frame_cache, store, eaf_filename):
+    """Store fingerprints for the frames just extracted, then flag the file if its videos look broken"""
+    fingerprints = frame_cache.save_fingerprints(eaf_filename)
+    if not fingerprints:
+        return None
+    result = assess(fingerprints)
+    store.save_flags(eaf_filename, result['flags'], result['detail'])
+    if result['flags']:
+        print(f"   WARNING: {', '.join(result['flags'])} video - {result['detail']}")
+    return result
+
+if __name__ == "__main__":
+    frame_cache = FrameCache()
+    store = AnalysisStore()
+    print("🎯 Bad Offset Identifier Tool - Frame Fingerprints")
+    print("=" * 40)
+
+    checked = flagged = 0
+    for filename in frame_cache.prepared_files():
+        fingerprints = frame_cache.load_fingerprints(filename)
+        if not fingerprints:
+            continue
+        result = assess(fingerprints)
+        store.save_flags(filename, result['flags'], result['detail'])
+        checked += 1
+        if result['flags']:
+            flagged += 1
+            print(f"  ⚠️ {filename}: {', '.join(result['flags'])} - {result['detail']}")
+
+    print(f"✅ Checked {checked} fingerprinted files, {flagged} flagged")
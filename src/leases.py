@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Time-limited file leases so concurrent annotators never review the same file
+The decision server hands out leases; the assessment page renews them with a
+heartbeat and they are reclaimed automatically when the heartbeat stops
+"""
+
+import os
+import json
+import time
+import socket
+import getpass
+import threading
+import urllib.request
+from urllib.parse import urlparse
+
+LEASE_SECONDS = 120
+HEARTBEAT_SECONDS = 30
+
+class LeaseManager:
+    def __init__(self, lease_seconds=LEASE_SECONDS):
+        self.lease_seconds = lease_seconds
+        self._leases = {}  # filename -> (annotator, expires_at)
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        for filename, (_, expires_at) in list(self._leases.items()):
+            if expires_at <= now:
+                del self._leases[filename]
+
+    def acquire(self, annotator, pending_files):
+        """Lease the first pending file not held by someone else (an annotator keeps their current file)"""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+
+            held = [f for f, (who, _) in self._leases.items() if who == annotator]
+            for filename in pending_files:
+                if filename in held:
+                    self._leases[filename] = (annotator, now + self.lease_seconds)
+                    return filename
+
+            # One file per annotator: moving on gives up anything else they held
+            for filename in held:
+                del self._leases[filename]
+
+            for filename in pending_files:
+                if filename not in self._leases:
+                    self._leases[filename] = (annotator, now + self.lease_seconds)
+                    return filename
+
+        return None
+
+    def renew(self, annotator, filename):
+        """Extend a lease; also re-takes it after expiry if nobody else has claimed the file"""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            lease = self._leases.get(filename)
+            if lease and lease[0] != annotator:
+                return False
+            self._leases[filename] = (annotator, now + self.lease_seconds)
+            return True
+
+    def release(self, filename, annotator=None):
+        with self._lock:
+            lease = self._leases.get(filename)
+            if lease and (annotator is None or lease[0] == annotator):
+                del self._leases[filename]
+
+    def active(self):
+        """Currently leased filenames -> annotator"""
+        with self._lock:
+            self._expire(time.monotonic())
+            return {filename: who for filename, (who, _) in self._leases.items()}
+
+def default_annotator():
+    return os.environ.get('BSL_ANNOTATOR') or f"{getpass.getuser()}@{socket.gethostname()}"
+
+def default_server_url():
+    return os.environ.get('BSL_DECISION_SERVER', 'http://localhost:8000').rstrip('/')
+
+def default_server_port():
+    """Port the decision server listens on: the one in BSL_DECISION_SERVER, so clients and server agree"""
+    url = urlparse(default_server_url())
+    return url.port or (443 if url.scheme == 'https' else 80)
+
+def request_lease(server_url, annotator, candidates, timeout=5):
+    """Ask the decision server for a file to review; None when every candidate is taken"""
+    body = json.dumps({'annotator': annotator, 'candidates': candidates}).encode('utf-8')
+    req = urllib.request.Request(f"{server_url}/lease", data=body,
+                                 headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return json.loads(response.read().decode('utf-8')).get('filename')
+
+def post_decisions(server_url, decisions, timeout=5):
+    """Record decisions through the server's /record_decisions; returns its accepted / duplicates / invalid ids"""
+    body = json.dumps({'decisions': decisions}).encode('utf-8')
+    req = urllib.request.Request(f"{server_url}/record_decisions", data=body,
+                                 headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+def lease_next_file(unprocessed_files, server_url, annotator):
+    """Pick the next file path to review under a lease, falling back to the first file offline"""
+    by_name = {os.path.basename(f): f for f in unprocessed_files}
+    try:
+        leased = request_lease(server_url, annotator, list(by_name))
+    except (OSError, ValueError):
+        print(f"WARNING: Decision server not reachable at {server_url} - reviewing the first pending file without a lease")
+        return unprocessed_files[0]
+
+    if leased is None:
+        print("⏳ All pending files are currently leased by other annotators")
+        return None
+
+    print(f"🔒 Leased {leased} to {annotator}")
+    return by_name.get(leased)
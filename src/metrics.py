@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+In-process metrics for the decision server
+Request latency histograms per route, decision store write timings, frame
+cache hit rates, queue depth and reviewer throughput, rendered as
+Prometheus text (/metrics) or JSON (/metrics.json)
+"""
+
+import time
+import threading
+from collections import deque
+
+# Seconds; covers a journal append (~ms) up to an on-demand full-frame extraction (~s)
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+TARGET_FILES_PER_HOUR = 50
+
+def label_value(value):
+    """Escape a label value for the Prometheus text format (annotator names come from clients)"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def counter_name(name):
+    return f"bsl_{name}" if name.endswith('_total') else f"bsl_{name}_total"
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'buckets': {str(bound): n for bound, n in zip(self.buckets, self.counts)}
+        }
+
+class Metrics:
+    def __init__(self):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.requests = {}       # (method, route) -> Histogram
+        self.timings = {}        # name -> Histogram (store writes, flushes, ...)
+        self.counters = {}       # name -> int
+        self.gauges = {}         # name -> callable returning the current value
+        self._decision_times = deque()
+        self._reviewers = {}     # annotator -> decisions recorded
+
+    def observe_request(self, method, route, seconds):
+        with self._lock:
+            self.requests.setdefault((method, route), Histogram()).observe(seconds)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            self.timings.setdefault(name, Histogram()).observe(seconds)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def gauge(self, name, func):
+        self.gauges[name] = func
+
+    def record_decisions(self, count, annotator=None):
+        now = time.time()
+        with self._lock:
+            self._decision_times.extend([now] * count)
+            if annotator:
+                self._reviewers[annotator] = self._reviewers.get(annotator, 0) + count
+            self.counters['decisions_total'] = self.counters.get('decisions_total', 0) + count
+
+    def _throughput(self):
+        now = time.time()
+        while self._decision_times and self._decision_times[0] < now - 3600:
+            self._decision_times.popleft()
+        hours = max((now - self.started) / 3600.0, 1 / 60.0)
+        return {
+            'decisions_last_hour': len(self._decision_times),
+            'decisions_per_hour_since_start': round(self.counters.get('decisions_total', 0) / hours, 2),
+            'target_files_per_hour': TARGET_FILES_PER_HOUR,
+            'reviewers': dict(self._reviewers)
+        }
+
+    def _hit_rates(self):
+        """<cache>_hits / <cache>_misses counter pairs -> hit rate per cache"""
+        caches = {name.rsplit('_', 1)[0] for name in self.counters if name.endswith(('_hits', '_misses'))}
+        rates = {}
+        for cache in caches:
+            hits = self.counters.get(f"{cache}_hits", 0)
+            total = hits + self.counters.get(f"{cache}_misses", 0)
+            rates[cache] = round(hits / total, 4) if total else None
+        return rates
+
+    def _read_gauges(self):
+        # Outside self._lock: gauges take other components' locks
+        return {name: func() for name, func in sorted(self.gauges.items())}
+
+    def to_json(self):
+        gauges = self._read_gauges()
+        with self._lock:
+            return {
+                'uptime_seconds': round(time.time() - self.started, 1),
+                'requests': {f"{method} {route}": h.snapshot() for (method, route), h in sorted(self.requests.items())},
+                'timings': {name: h.snapshot() for name, h in sorted(self.timings.items())},
+                'counters': dict(self.counters),
+                'hit_rates': self._hit_rates(),
+                'gauges': gauges,
+                'throughput': self._throughput()
+            }
+
+    def to_prometheus(self):
+        gauges = self._read_gauges()
+        lines = []
+
+        def histogram(metric, help_text, items):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for labels, h in items:
+                for bound, n in zip(h.buckets, h.counts):
+                    lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {n}')
+                lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {h.count}')
+                lines.append(f"{metric}_sum{{{labels}}} {h.sum:.6f}")
+                lines.append(f"{metric}_count{{{labels}}} {h.count}")
+
+        with self._lock:
+            histogram("bsl_request_seconds", "Request latency by route",
+                      [(f'method="{label_value(method)}",route="{label_value(route)}"', h)
+                       for (method, route), h in sorted(self.requests.items())])
+            histogram("bsl_operation_seconds", "Decision store and cache operation timings",
+                      [(f'operation="{label_value(name)}"', h) for name, h in sorted(self.timings.items())])
+
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {counter_name(name)} counter")
+                lines.append(f"{counter_name(name)} {value}")
+
+            lines.append("# TYPE bsl_cache_hit_ratio gauge")
+            for cache, rate in sorted(self._hit_rates().items()):
+                if rate is not None:
+                    lines.append(f'bsl_cache_hit_ratio{{cache="{label_value(cache)}"}} {rate}')
+
+            for name, value in gauges.items():
+                lines.append(f"# TYPE bsl_{name} gauge")
+                lines.append(f"bsl_{name} {value}")
+
+            throughput = self._throughput()
+            lines.append("# TYPE bsl_decisions_last_hour gauge")
+            lines.append(f"bsl_decisions_last_hour {throughput['decisions_last_hour']}")
+            lines.append("# TYPE bsl_decisions_per_hour gauge")
+            lines.append(f"bsl_decisions_per_hour {throughput['decisions_per_hour_since_start']}")
+            lines.append("# TYPE bsl_target_files_per_hour gauge")
+            lines.append(f"bsl_target_files_per_hour {TARGET_FILES_PER_HOUR}")
+            lines.append("# TYPE bsl_reviewer_decisions_total counter")
+            for annotator, count in sorted(throughput['reviewers'].items()):
+                lines.append(f'bsl_reviewer_decisions_total{{annotator="{label_value(annotator)}"}} {count}')
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Automatic inter-camera offset estimation
+For every GOOD annotation, short low-resolution grayscale windows are decoded
+from both videos (ffmpeg rawvideo piped into NumPy, after each video's
+TIME_ORIGIN offset is applied). Their motion-energy signals are
+cross-correlated in one batched FFT. The per-window lags are combined into a
+per-file lag with a confidence score (how many windows agree, and how strongly
+they correlate). Results go to analysis.db and reorder the review queue so
+likely-misaligned files come first.
+
+A positive lag means events appear later in Video 2 than in Video 1.
+Usage: python3 offset_estimator.py [--workers N] [--shard SPEC] [--force] [file.eaf ...]
+"""
+
+import os
+import io
+import time
+import argparse
+import subprocess
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from simple_viewer import SimpleSignAnnotate
+from analysis_store import AnalysisStore, BAD_OFFSET_SECONDS, MIN_CONFIDENCE
+from shards import parse_shard
+from eaf_session import open_session
+
+ANALYSIS_FPS = 25
+ANALYSIS_WIDTH = 64
+ANALYSIS_HEIGHT = 48
+WINDOW_SECONDS = 4.0       # decoded around each GOOD annotation's midpoint
+MAX_LAG_SECONDS = 1.0      # largest inter-camera lag searched for
+AGREEMENT_FRAMES = 2       # windows within this many frames of the file lag count as agreeing
+
+def read_gray_window(video_path, start_seconds, duration_seconds):
+    """Decode a window as (frames, height, width) uint8 grayscale at the analysis size and rate
+
+    start_seconds must not be negative: ffmpeg would clamp the seek to 0 and silently shift the window.
+    """
+    if start_seconds < 0:
+        raise ValueError(f"Window starts before the video ({start_seconds:.3f}s)")
+    cmd = [
+        'ffmpeg', '-v', 'error', '-ss', f"{start_seconds:.3f}", '-t', f"{duration_seconds:.3f}",
+        '-i', video_path, '-an', '-sn',
+        '-vf', f'fps={ANALYSIS_FPS},scale={ANALYSIS_WIDTH}:{ANALYSIS_HEIGHT}',
+        '-pix_fmt', 'gray', '-f', 'rawvideo', '-'
+    ]
+    raw = subprocess.run(cmd, capture_output=True, check=True).stdout
+    frame_size = ANALYSIS_WIDTH * ANALYSIS_HEIGHT
+    count = len(raw) // frame_size
+    return np.frombuffer(raw, dtype=np.uint8, count=count * frame_size).reshape(count, ANALYSIS_HEIGHT, ANALYSIS_WIDTH)
+
+def motion_energy(frames):
+    """Mean absolute difference between consecutive frames"""
+    if len(frames) < 2:
+        return np.zeros(0, dtype=np.float32)
+    return np.abs(np.diff(frames.astype(np.float32), axis=0)).mean(axis=(1, 2))
+
+def _standardize(signal):
+    std = signal.std()
+    return (signal - signal.mean()) / std if std > 1e-6 else np.zeros_like(signal)
+
+def cross_correlate(signals1, signals2, max_lag):
+    """Normalised cross-correlation of each signal pair for lags -max_lag..max_lag in one batched FFT
+
+    Returns (lags, correlation) where correlation[i, j] is the correlation of pair i when
+    Video 2 is shifted by lags[j] frames.
+    """
+    length = max(max(len(s) for s in signals1), max(len(s) for s in signals2))
+    batch1 = np.zeros((len(signals1), length), dtype=np.float32)
+    batch2 = np.zeros((len(signals2), length), dtype=np.float32)
+    overlap = np.zeros(len(signals1), dtype=np.float32)
+    for i, (a, b) in enumerate(zip(signals1, signals2)):
+        n = min(len(a), len(b))
+        batch1[i, :n] = _standardize(a[:n])
+        batch2[i, :n] = _standardize(b[:n])
+        overlap[i] = max(n, 1)
+
+    size = 1 << (2 * length - 1).bit_length()
+    # irfft(B * conj(A))[m] = sum_t a[t] * b[t + m]
+    correlation = np.fft.irfft(np.fft.rfft(batch2, size) * np.conj(np.fft.rfft(batch1, size)), size)
+    lags = np.arange(-max_lag, max_lag + 1)
+    return lags, correlation[:, lags % size] / overlap[:, None]
+
+def combine_windows(lags, correlation):
+    """File lag (seconds) and confidence from per-window correlation curves"""
+    best = correlation.argmax(axis=1)
+    window_lags = lags[best]
+    peaks = np.clip(correlation[np.arange(len(best)), best], 0, 1)
+
+    if peaks.sum() > 0:
+        # Weighted median: robust to the odd window dominated by a camera cut or occlusion
+        order = np.argsort(window_lags)
+        cumulative = np.cumsum(peaks[order])
+        lag = window_lags[order][np.searchsorted(cumulative, cumulative[-1] / 2)]
+    else:
+        lag = int(np.median(window_lags))
+
+    agreeing = np.abs(window_lags - lag) <= AGREEMENT_FRAMES
+    confidence = agreeing.mean() * (peaks[agreeing].mean() if agreeing.any() else 0.0)
+    return float(lag) / ANALYSIS_FPS, float(confidence), int(agreeing.sum())
+
+def estimate_file(viewer, file_path):
+    """Offset estimate for one EAF, or None when it does not have two videos and GOOD signs"""
+    session = open_session(file_path, viewer.target_sign)
+    good = session.good_intervals
+    videos = viewer.find_video_files(session.filename, session)[:2]
+    if len(videos) < 2 or not good:
+        return None
+    offsets_ms = [session.video_offset(os.path.basename(video)) for video in videos]
+
+    signals = [[], []]
+    for start_ms, end_ms in good:
+        midpoint_ms = (start_ms + end_ms) / 2
+        window_starts = [(midpoint_ms + offset_ms) / 1000.0 - WINDOW_SECONDS / 2 for offset_ms in offsets_ms]
+        # A window clamped at t=0 in one camera only would show up as a false lag
+        if min(window_starts) < 0:
+            continue
+        for i, video_path in enumerate(videos):
+            signals[i].append(motion_energy(read_gray_window(video_path, window_starts[i], WINDOW_SECONDS)))
+
+    usable = [i for i in range(len(signals[0])) if len(signals[0][i]) > 1 and len(signals[1][i]) > 1]
+    if not usable:
+        return None
+
+    lags, correlation = cross_correlate([signals[0][i] for i in usable], [signals[1][i] for i in usable],
+                                        int(MAX_LAG_SECONDS * ANALYSIS_FPS))
+    lag_seconds, confidence, agreeing = combine_windows(lags, correlation)
+    return {
+        'lag_seconds': lag_seconds,
+        'confidence': confidence,
+        'windows': len(usable),
+        'agreeing': agreeing,
+        'video1': os.path.basename(videos[0]),
+        'video2': os.path.basename(videos[1])
+    }
+
+_viewer = None
+
+def _init_worker(eaf_folder, video_folder):
+    global _viewer
+    _viewer = SimpleSignAnnotate(eaf_folder, video_folder)
+
+def _estimate(file_path):
+    started = time.monotonic()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            estimate = estimate_file(_viewer, file_path)
+        return file_path, estimate, time.monotonic() - started, None
+    except Exception as e:
+        return file_path, None, time.monotonic() - started, str(e)
+
+def estimate_offsets(files=None, workers=None, force=False, shard=None):
+    viewer = SimpleSignAnnotate()
+    if shard:
+        viewer.shard = shard
+    store = AnalysisStore()
+
+    if not files:
+        files = viewer.get_unprocessed_files(viewer.find_conversation_files())
+    done_already = store.offsets()
+    todo = [f for f in files if force or os.path.basename(f) not in done_already]
+    print(f"📊 {len(files)} files, {len(files) - len(todo)} already estimated, {len(todo)} to estimate")
+    if not todo:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    started = time.monotonic()
+    estimated = likely_bad = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(viewer.eaf_folder, viewer.video_folder)) as pool:
+        futures = [pool.submit(_estimate, f) for f in todo]
+        for done, future in enumerate(as_completed(futures), 1):
+            file_path, estimate, seconds, error = future.result()
+            filename = os.path.basename(file_path)
+            if error:
+                print(f"  ❌ [{done}/{len(todo)}] {filename}: {error}")
+            elif estimate is None:
+                print(f"  ⏭️ [{done}/{len(todo)}] {filename}: needs two videos and GOOD annotations")
+            else:
+                store.save_offset(filename, estimate)
+                estimated += 1
+                flag = abs(estimate['lag_seconds']) > BAD_OFFSET_SECONDS and estimate['confidence'] >= MIN_CONFIDENCE
+                likely_bad += flag
+                print(f"  {'⚠️ ' if flag else '✅'} [{done}/{len(todo)}] {filename}: lag {estimate['lag_seconds']:+.2f}s, "
+                      f"confidence {estimate['confidence']:.2f} ({estimate['agreeing']}/{estimate['windows']} windows agree, {seconds:.1f}s)")
+
+    print(f"✅ Estimated {estimated}/{len(todo)} files in {time.monotonic() - started:.1f}s - {likely_bad} likely misaligned (reviewed first)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimate inter-camera offsets to triage files before review")
+    parser.add_argument('files', nargs='*', help="EAF files (default: every pending file)")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--shard', help="Only one shard, e.g. region:BF or hash:0/4 (default: BSL_SHARD)")
+    parser.add_argument('--force', action='store_true', help="Re-estimate files that already have an estimate")
+    args = parser.parse_args()
+
+    print("🎯 Bad Offset Identifier Tool - Offset Estimator")
+    print("=" * 40)
+    estimate_offsets(args.files, args.workers, args.force, parse_shard(args.shard))
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Headless precompute for the review queue
+Extracts preview frames and the page payload for every qualifying, undecided
+EAF across a process pool, so generate_html never waits on ffmpeg during review.
+Files whose payload already exists are skipped, so an interrupted run resumes
+where it stopped.
+Payloads are per viewer: the simple viewer's midpoint frames by default, or
+the standalone viewer's sampling points with --viewer standalone.
+Usage: python3 precompute.py [--workers N] [--eaf-folder DIR] [--video-folder DIR] [--shard SPEC] [--force]
+                             [--decode-mode accurate|fast] [--viewer simple|standalone] [--sampling SPEC]
+"""
+
+import os
+import io
+import sys
+import time
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from simple_viewer import SimpleSignAnnotate
+from standalone_assessment import BadOffsetIdentifierStandalone
+from shards import parse_shard
+from frame_cache import DECODE_MODES
+from sampling import parse_sampling
+
+VIEWERS = {
+    'simple': SimpleSignAnnotate,
+    'standalone': BadOffsetIdentifierStandalone,
+}
+
+_viewer = None
+
+def _init_worker(viewer_name, eaf_folder, video_folder, output_dir, decode_mode, sampling_points):
+    global _viewer
+    _viewer = VIEWERS[viewer_name](eaf_folder, video_folder, output_dir)
+    _viewer.frame_cache.decode_mode = decode_mode
+    _viewer.sampling_points = sampling_points
+
+def _prepare(file_path):
+    """Worker: prepare one file, returning (file_path, frame count, seconds, error)"""
+    started = time.monotonic()
+    try:
+        # The viewer's per-frame progress lines would interleave across workers
+        with contextlib.redirect_stdout(io.StringIO()):
+            frames = _viewer.prepare_file(file_path)
+        return file_path, len(frames), time.monotonic() - started, None
+    except Exception as e:
+        return file_path, 0, time.monotonic() - started, str(e)
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+def precompute(eaf_folder=None, video_folder=None, output_dir=None, workers=None, force=False, shard=None,
+               decode_mode=None, viewer_name='simple', sampling_points=None):
+    viewer = VIEWERS[viewer_name](eaf_folder, video_folder, output_dir)
+    if shard:
+        viewer.shard = shard
+        print(f"🧩 Shard {shard}")
+    if decode_mode:
+        viewer.frame_cache.decode_mode = decode_mode
+    if sampling_points:
+        viewer.sampling_points = sampling_points
+    print(f"🎞️  Decode mode: {viewer.frame_cache.decode_mode}")
+    print(f"🖼️  Viewer: {viewer_name}, sampling {', '.join(f'{label} {fraction:.0%}' for label, fraction in viewer.sampling_points)}")
+    pending = viewer.get_unprocessed_files(viewer.find_conversation_files())
+
+    # A payload prepared in the other decode mode or with other sampling points counts as not prepared
+    todo = [f for f in pending
+            if force or viewer.frame_cache.load_payload(os.path.basename(f), viewer.sampling_points) is None]
+    viewer.frame_cache.close()  # workers open their own archives
+
+    print(f"📊 {len(pending)} undecided files, {len(pending) - len(todo)} already prepared, {len(todo)} to prepare")
+    if not todo:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    print(f"⚙️  Preparing with {workers} worker processes (Ctrl+C to stop; re-run to resume)")
+
+    started = time.monotonic()
+    done = 0
+    failed = 0
+    total_frames = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(viewer_name, viewer.eaf_folder, viewer.video_folder, output_dir,
+                                       viewer.frame_cache.decode_mode, viewer.sampling_points)) as pool:
+        futures = [pool.submit(_prepare, f) for f in todo]
+        try:
+            for future in as_completed(futures):
+                file_path, frame_count, seconds, error = future.result()
+                done += 1
+                elapsed = time.monotonic() - started
+                eta = elapsed / done * (len(todo) - done)
+                if error:
+                    failed += 1
+                    print(f"  ❌ [{done}/{len(todo)}] {os.path.basename(file_path)}: {error}")
+                else:
+                    total_frames += frame_count
+                    print(f"  ✅ [{done}/{len(todo)}] {os.path.basename(file_path)}: "
+                          f"{frame_count} frames in {seconds:.1f}s | ETA {format_duration(eta)}")
+        except KeyboardInterrupt:
+            print("\n🛑 Stopping - files prepared so far are kept")
+            for future in futures:
+                future.cancel()
+            raise
+
+    print(f"✅ Prepared {done - failed} files ({total_frames} frames) in {format_duration(time.monotonic() - started)}")
+    if failed:
+        print(f"⚠️  {failed} files failed - re-run to retry them")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prepare frames and pages for every pending EAF")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--eaf-folder', help="EAF folder (default: CAVA_Data/EAFs)")
+    parser.add_argument('--video-folder', help="Video folder (default: CAVA_Data/Videos)")
+    parser.add_argument('--shard', help="Only prepare one shard, e.g. region:BF or hash:0/4 (default: BSL_SHARD)")
+    parser.add_argument('--force', action='store_true', help="Re-prepare files that already have a payload")
+    parser.add_argument('--decode-mode', choices=DECODE_MODES,
+                        help="accurate frames, or fast keyframe-only triage previews (default: BSL_DECODE_MODE or accurate)")
+    parser.add_argument('--viewer', choices=list(VIEWERS), default='simple',
+                        help="Viewer to prepare pages for (default: simple)")
+    parser.add_argument('--sampling', help="standalone: sampling points, e.g. four_point or early:0.3,late:0.8 "
+                                           "(default: BSL_SAMPLING_POINTS or four_point)")
+    args = parser.parse_args()
+    if args.sampling and args.viewer != 'standalone':
+        parser.error("--sampling only applies to --viewer standalone (the simple viewer shows the midpoint frame)")
+    try:
+        sampling_points = parse_sampling(args.sampling) if args.sampling else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    print("🎯 Bad Offset Identifier Tool - Precompute")
+    print("=" * 40)
+    try:
+        precompute(args.eaf_folder, args.video_folder, workers=args.workers, force=args.force,
+                   shard=parse_shard(args.shard), decode_mode=args.decode_mode,
+                   viewer_name=args.viewer, sampling_points=sampling_points)
+    except KeyboardInterrupt:
+        sys.exit(1)
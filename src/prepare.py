@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Page preparation shared by the viewers and precompute.py
+Parses the EAF, finds its videos, samples preview frames for every GOOD
+annotation at the given sampling points (see sampling.py), fingerprints
+them and writes the file's frame archive with the page payload. The viewers
+differ only in how they find videos and which video offsets they apply.
+"""
+
+import os
+from eaf_session import open_session
+from sampling import sample_annotation
+
+def no_offset(session, video_path, video_num):
+    return 0
+
+def prepare_file(frame_cache, analysis_store, timer, file_path, sampling_points, find_videos,
+                 video_offset=no_offset, target_sign="GOOD"):
+    """Extract, fingerprint and archive one file's preview frames; returns its FrameRefs
+
+    find_videos(session) returns the file's video paths; video_offset(session, video_path, video_num)
+    the offset in ms applied before sampling.
+    """
+    filename = os.path.basename(file_path)
+    with timer.span('eaf_parse', file=filename) as span:
+        # Usually already parsed by the scan in this process; pympi is only imported if not
+        session = open_session(file_path, target_sign)
+        good_annotations = session.good_annotations
+        span['annotations'] = len(session.dominant_data)
+        span['good'] = len(good_annotations)
+
+    with timer.span('video_lookup', file=filename) as span:
+        videos = find_videos(session)
+        span['videos'] = len(videos)
+
+    # All sampling points of an annotation come from one decode pass per video
+    offsets_ms = [video_offset(session, video_path, vid_idx) for vid_idx, video_path in enumerate(videos, 1)]
+    all_frames = []
+    for ann_idx, annotation in enumerate(good_annotations, 1):
+        for vid_idx, (video_path, offset_ms) in enumerate(zip(videos, offsets_ms), 1):
+            all_frames.extend(sample_annotation(frame_cache, filename, ann_idx, annotation, vid_idx,
+                                                video_path, offset_ms, sampling_points))
+
+    with timer.span('fingerprints', file=filename, frames=len(all_frames)):
+        from frame_fingerprints import fingerprint_file  # imported here so startup never loads NumPy
+        fingerprint_file(frame_cache, analysis_store, filename)
+
+    # Previews, index, fingerprints and the payload become the file's frame archive
+    with timer.span('archive_write', file=filename, frames=len(all_frames)):
+        # Full-resolution frames are extracted later, only when clicked
+        frame_cache.save_index(filename, {
+            frame.key: {'video_path': frame.video_path, 'time_seconds': frame.time_seconds}
+            for frame in all_frames
+        })
+        # No frames usually means missing videos - leave the file unprepared so it is retried
+        if all_frames:
+            frame_cache.save_payload(filename, all_frames, sampling_points)
+        else:
+            frame_cache.discard(filename)
+    return all_frames
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Built-in profiling for the entry points (run_bot.py, the viewers, the debug tools)
+Run any of them with --profile to capture cProfile output, or with
+--profile sampled for a lower-overhead stack sampler only. Both modes write
+a collapsed-stack file for flamegraphs and a text report that includes the
+wall time spent in child processes such as ffmpeg, all under profiles/.
+"""
+
+import os
+import sys
+import time
+import pstats
+import cProfile
+import argparse
+import threading
+import subprocess
+from collections import Counter
+from contextlib import contextmanager
+
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+
+class StackSampler:
+    """Samples the main thread's stack on a timer; counts collapse into flamegraph input"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._target = threading.main_thread().ident
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._thread.join()
+
+    def write_collapsed(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top_functions(self, limit=25):
+        """Functions by share of samples where they were on the stack (self time = leaf)"""
+        leaf = Counter()
+        for stack, count in self.stacks.items():
+            leaf[stack.rsplit(';', 1)[-1]] += count
+        return leaf.most_common(limit)
+
+class ChildProcessTimer:
+    """Wall time of subprocess.run calls (ffmpeg and friends) while profiling"""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.seconds = Counter()
+        self._original_run = None
+
+    def _timed_run(self, *args, **kwargs):
+        cmd = args[0] if args else kwargs.get('args')
+        name = os.path.basename(cmd[0] if isinstance(cmd, (list, tuple)) else str(cmd).split()[0])
+        started = time.perf_counter()
+        try:
+            return self._original_run(*args, **kwargs)
+        finally:
+            self.calls[name] += 1
+            self.seconds[name] += time.perf_counter() - started
+
+    def install(self):
+        self._original_run = subprocess.run
+        subprocess.run = self._timed_run
+
+    def uninstall(self):
+        subprocess.run = self._original_run
+
+def profile_dir(base_dir=None):
+    return os.environ.get('BSL_PROFILE_DIR') or os.path.join(base_dir or os.getcwd(), "profiles")
+
+@contextmanager
+def profiled(name, mode='cprofile', output_dir=None):
+    """Profile the enclosed block and write profiles/<name>-<timestamp>.{prof,collapsed,txt}"""
+    output_dir = output_dir or profile_dir()
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.join(output_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+
+    profiler = cProfile.Profile() if mode == 'cprofile' else None
+    sampler = StackSampler()
+    children = ChildProcessTimer()
+
+    children.install()
+    sampler.start()
+    started = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+        wall = time.perf_counter() - started
+        sampler.stop()
+        children.uninstall()
+
+        sampler.write_collapsed(f"{stem}.collapsed")
+        with open(f"{stem}.txt", 'w', encoding='utf-8') as report:
+            report.write(f"{name}: {wall:.3f}s wall ({mode})\n\n")
+            report.write("Child processes (wall time):\n")
+            for child, seconds in children.seconds.most_common():
+                report.write(f"  {child:<12} {children.calls[child]:>6} calls {seconds:>9.3f}s "
+                             f"({seconds / wall:.0%} of run)\n")
+            if not children.calls:
+                report.write("  none\n")
+
+            total_samples = sum(sampler.stacks.values()) or 1
+            report.write(f"\nTop functions by samples ({total_samples} samples every {sampler.interval * 1000:.0f}ms):\n")
+            for function, count in sampler.top_functions():
+                report.write(f"  {count / total_samples:>6.1%}  {function}\n")
+
+            if profiler:
+                profiler.dump_stats(f"{stem}.prof")
+                report.write("\ncProfile (cumulative):\n")
+                pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(30)
+
+        ffmpeg_seconds = children.seconds.get('ffmpeg', 0.0)
+        print(f"\n🔬 Profile: {stem}.txt ({wall:.2f}s wall, {ffmpeg_seconds:.2f}s in ffmpeg)")
+        if profiler:
+            print(f"   cProfile: {stem}.prof  (python -m pstats {stem}.prof, or snakeviz)")
+        print(f"   Flamegraph input: {stem}.collapsed  (flamegraph.pl or speedscope)")
+
+def parse_profile_args(argv=None):
+    """Pull --profile [cprofile|sampled] out of argv, leaving the entry point's own arguments"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=['cprofile', 'sampled'])
+    args, remaining = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+    return args.profile, remaining
+
+def run_main(name, main):
+    """Run an entry point's main, profiled when --profile was given on the command line"""
+    mode, remaining = parse_profile_args()
+    sys.argv = [sys.argv[0]] + remaining
+    if not mode:
+        return main()
+    with profiled(name, mode):
+        return main()
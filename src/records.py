@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Compact record types for annotations, extraction jobs and extracted frames
+Slot-based classes replace per-item dicts in the hot loops. Frame records
+reference their preview by cache key: the image bytes stay in the frame cache
+and are only base64-encoded while a page is rendered.
+"""
+
+import os
+
+class Annotation:
+    """One annotation on the dominant tier (times in ms)"""
+    __slots__ = ('start_time', 'end_time', 'value')
+
+    def __init__(self, start_time, end_time, value):
+        self.start_time = start_time
+        self.end_time = end_time
+        self.value = value
+
+    @property
+    def duration(self):
+        return self.end_time - self.start_time
+
+    def time_at(self, percentage):
+        """Annotation time (ms) at a fraction of its duration"""
+        return self.start_time + self.duration * percentage
+
+class ExtractionJob:
+    """One preview to extract: an annotation, a video and a point within the annotation"""
+    __slots__ = ('annotation_idx', 'annotation', 'video_num', 'video_path', 'video_offset_ms', 'point', 'percentage')
+
+    def __init__(self, annotation_idx, annotation, video_num, video_path, video_offset_ms, point, percentage):
+        self.annotation_idx = annotation_idx
+        self.annotation = annotation
+        self.video_num = video_num
+        self.video_path = video_path
+        self.video_offset_ms = video_offset_ms
+        self.point = point
+        self.percentage = percentage
+
+    @property
+    def frame_key(self):
+        return f"ann{self.annotation_idx}_v{self.video_num}_{self.point}"
+
+    @property
+    def time_seconds(self):
+        """Video time of this point, with the video's TIME_ORIGIN offset applied"""
+        return (self.annotation.time_at(self.percentage) + self.video_offset_ms) / 1000.0
+
+class FrameRef:
+    """An extracted frame; its preview lives in the frame cache under key"""
+    __slots__ = ('key', 'point', 'percentage', 'time_seconds', 'video_path', 'video_offset_ms',
+                 'annotation_idx', 'annotation_value', 'annotation_start_ms', 'annotation_end_ms', 'video_num')
+
+    def __init__(self, key, point, percentage, time_seconds, video_path, video_offset_ms,
+                 annotation_idx, annotation_value, annotation_start_ms, annotation_end_ms, video_num):
+        self.key = key
+        self.point = point
+        self.percentage = percentage
+        self.time_seconds = time_seconds
+        self.video_path = video_path
+        self.video_offset_ms = video_offset_ms
+        self.annotation_idx = annotation_idx
+        self.annotation_value = annotation_value
+        self.annotation_start_ms = annotation_start_ms
+        self.annotation_end_ms = annotation_end_ms
+        self.video_num = video_num
+
+    @classmethod
+    def from_job(cls, job, time_seconds=None):
+        """time_seconds overrides the requested time with the one actually decoded"""
+        return cls(job.frame_key, job.point, job.percentage,
+                   job.time_seconds if time_seconds is None else time_seconds,
+                   job.video_path, job.video_offset_ms, job.annotation_idx, job.annotation.value,
+                   job.annotation.start_time, job.annotation.end_time, job.video_num)
+
+    @property
+    def requested_seconds(self):
+        """Video time of the point that was asked for (time_seconds is the frame actually decoded)"""
+        start, end = self.annotation_start_ms, self.annotation_end_ms
+        return (start + (end - start) * self.percentage + self.video_offset_ms) / 1000.0
+
+    @property
+    def drift_seconds(self):
+        """How far the decoded frame is from the requested point (fast decode lands on keyframes)"""
+        return self.time_seconds - self.requested_seconds
+
+    @property
+    def video_name(self):
+        return f"Video {self.video_num}"
+
+    @property
+    def video_filename(self):
+        return os.path.basename(self.video_path)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(**{name: values[name] for name in cls.__slots__})
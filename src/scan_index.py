@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Persistent scan and annotation index of EAF files
+Each EAF is parsed once; later scans reuse the stored entry until the
+file's size or modification time changes. Besides the counts that decide
+which files qualify, each entry keeps a compact annotation summary (tier
+inventory, dominant-tier gloss counts, GOOD intervals and media URLs) that
+corpus_stats.py answers questions from without parsing.
+"""
+
+import os
+import json
+from eaf_session import open_session, dominant_tier_for
+
+MIN_FILE_SIZE = 100 * 1024  # >100KB
+MIN_ANNOTATIONS = 20
+MIN_GOOD = 5
+INDEX_VERSION = 2  # entries written by an older layout are parsed again
+
+def qualifies(entry):
+    return entry['total'] >= MIN_ANNOTATIONS and entry['good'] >= MIN_GOOD
+
+class ScanIndex:
+    def __init__(self, base_dir=None):
+        base_dir = base_dir or os.getcwd()
+        self.index_file = os.path.join(base_dir, "scan_index.json")
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        temp_file = f"{self.index_file}.{os.getpid()}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(temp_file, self.index_file)
+
+    def parse(self, file_path, stat):
+        filename = os.path.basename(file_path)
+        entry = {
+            'path': file_path,
+            'filename': filename,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'dominant_tier': dominant_tier_for(filename),
+            'total': 0,
+            'good': 0,
+            'version': INDEX_VERSION,
+            'tiers': {},
+            'glosses': {},
+            'good_intervals': [],
+            'media': []
+        }
+        try:
+            # The parsed session is memoised, so a viewer preparing this file next does not parse it again
+            session = open_session(file_path)
+            if not session.has_dominant_tier:
+                entry['error'] = f"Tier {entry['dominant_tier']} not found"
+            entry['total'] = session.total
+            entry['good'] = len(session.good_annotations)
+            entry['tiers'] = session.tier_counts()
+            entry['glosses'] = session.gloss_counts()
+            entry['good_intervals'] = [list(interval) for interval in session.good_intervals]
+            entry['media'] = [media_url for media_url, _ in session.media]
+        except ImportError:
+            raise  # a missing pympi is not a property of the file, so never index it
+        except Exception as e:
+            entry['error'] = str(e)
+        return entry
+
+    def scan(self, eaf_folder, shard=None):
+        """Index entries for every candidate EAF under eaf_folder (in shard, if given), parsing only new or changed files"""
+        entries = []
+        changed = False
+        for root, dirs, files in os.walk(eaf_folder):
+            for file in files:
+                if not file.endswith('.eaf') or (shard and not shard.contains(file)):
+                    continue
+                file_path = os.path.join(root, file)
+                stat = os.stat(file_path)
+                if stat.st_size <= MIN_FILE_SIZE:
+                    continue
+
+                entry = self.entries.get(file_path)
+                if (entry is None or entry.get('version') != INDEX_VERSION
+                        or (entry['size'], entry['mtime']) != (stat.st_size, stat.st_mtime)):
+                    entry = self.parse(file_path, stat)
+                    self.entries[file_path] = entry
+                    changed = True
+                entries.append(entry)
+
+        if changed:
+            self.save()
+        return entries
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Region or hash sharding of the corpus across independent workers
+Workers (processes or lab machines) coordinate only through a shared manifest
+directory: each claims a shard, scans / precomputes / reviews only that
+shard's EAFs (BSL_SHARD), and publishes its decisions back; merge combines
+every shard's decisions deterministically (latest timestamp wins).
+
+Shard specs:  region:BF        one region prefix (or region:BF,LN for several)
+              hash:2/8         shard 2 of 8 by a stable filename hash
+
+Usage: python3 shards.py claim [--mode region|hash] [--count N]
+       python3 shards.py release SHARD
+       python3 shards.py publish SHARD
+       python3 shards.py merge
+       python3 shards.py status
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import zlib
+import socket
+import argparse
+from decision_store import DecisionStore, CSV_FIELDS
+
+CLAIM_TIMEOUT = 12 * 3600  # a claim not refreshed by publish for this long can be taken over
+
+def region_of(filename):
+    """BSL Corpus region prefix (BF, LN, ...), as in the standalone tool's video lookup"""
+    return os.path.basename(filename)[:2].upper()
+
+def hash_bucket(filename, count):
+    # crc32 is stable across machines and Python versions (unlike hash())
+    return zlib.crc32(os.path.basename(filename).encode('utf-8')) % count
+
+class Shard:
+    def __init__(self, mode, regions=None, index=None, count=None):
+        self.mode = mode
+        self.regions = regions or []
+        self.index = index
+        self.count = count
+
+    @property
+    def name(self):
+        if self.mode == 'region':
+            return '+'.join(self.regions)
+        return f"hash-{self.index}of{self.count}"
+
+    def contains(self, filename):
+        if self.mode == 'region':
+            return region_of(filename) in self.regions
+        return hash_bucket(filename, self.count) == self.index
+
+    def __str__(self):
+        if self.mode == 'region':
+            return f"region:{','.join(self.regions)}"
+        return f"hash:{self.index}/{self.count}"
+
+def parse_shard(spec):
+    """Shard from a spec string ('region:BF', 'hash:2/8'); None for no sharding"""
+    if not spec:
+        return None
+    mode, _, value = spec.partition(':')
+    if mode == 'region' and value:
+        return Shard('region', regions=[r.strip().upper() for r in value.split(',') if r.strip()])
+    if mode == 'hash':
+        try:
+            index, count = (int(v) for v in value.split('/'))
+        except ValueError:
+            index = count = 0
+        if count > 0 and 0 <= index < count:
+            return Shard('hash', index=index, count=count)
+    raise ValueError(f"Invalid shard {spec!r}: expected region:BF[,LN] or hash:I/N")
+
+def default_shard():
+    return parse_shard(os.environ.get('BSL_SHARD'))
+
+def default_manifest_dir():
+    return os.environ.get('BSL_MANIFEST_DIR', os.path.join(os.getcwd(), "manifest"))
+
+class ShardManifest:
+    """Claims, progress and published decisions in the shared manifest directory"""
+
+    def __init__(self, manifest_dir=None):
+        self.manifest_dir = manifest_dir or default_manifest_dir()
+        self.claims_dir = os.path.join(self.manifest_dir, "claims")
+        self.decisions_dir = os.path.join(self.manifest_dir, "decisions")
+        self.progress_dir = os.path.join(self.manifest_dir, "progress")
+        for folder in [self.claims_dir, self.decisions_dir, self.progress_dir]:
+            os.makedirs(folder, exist_ok=True)
+
+    def claim_path(self, shard):
+        return os.path.join(self.claims_dir, f"{shard.name}.json")
+
+    def _write_atomic(self, path, write):
+        temp_file = f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+        with open(temp_file, 'w', newline='', encoding='utf-8') as f:
+            write(f)
+        os.replace(temp_file, path)
+
+    def claims(self):
+        claims = {}
+        for name in sorted(os.listdir(self.claims_dir)):
+            if name.endswith('.json'):
+                try:
+                    with open(os.path.join(self.claims_dir, name), 'r', encoding='utf-8') as f:
+                        claims[name[:-len('.json')]] = json.load(f)
+                except (OSError, ValueError):
+                    continue
+        return claims
+
+    def claim(self, shard, owner):
+        """Claim a shard; O_EXCL creation makes this safe between machines on a shared filesystem"""
+        path = self.claim_path(shard)
+        if os.path.exists(path) and time.time() - os.path.getmtime(path) > CLAIM_TIMEOUT:
+            self._retire_stale_claim(path)  # abandoned by a worker that stopped publishing
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'shard': str(shard), 'owner': owner, 'claimed_at': time.time()}, f)
+        return True
+
+    def _retire_stale_claim(self, path):
+        """Move a stale claim aside; the rename succeeds for only one of several workers taking it over"""
+        tombstone = f"{path}.{socket.gethostname()}.{os.getpid()}.stale"
+        try:
+            os.rename(path, tombstone)
+        except FileNotFoundError:
+            return  # another worker retired it first
+        if time.time() - os.path.getmtime(tombstone) <= CLAIM_TIMEOUT:
+            # A fresh claim replaced the stale one after our check: put it back
+            try:
+                os.link(tombstone, path)
+            except FileExistsError:
+                pass
+        os.remove(tombstone)
+
+    def claim_next(self, shards, owner):
+        for shard in shards:
+            if self.claim(shard, owner):
+                return shard
+        return None
+
+    def release(self, shard):
+        try:
+            os.remove(self.claim_path(shard))
+        except FileNotFoundError:
+            pass
+
+    def publish(self, shard, store, progress):
+        """Write this shard's decisions and progress to the manifest and refresh the claim"""
+        rows = [row for row in store.rows() if shard.contains(row['filename'])]
+
+        def write_csv(f):
+            writer = csv.writer(f)
+            writer.writerow(CSV_FIELDS)
+            for row in rows:
+                writer.writerow([row[field] for field in CSV_FIELDS])
+
+        self._write_atomic(os.path.join(self.decisions_dir, f"{shard.name}.csv"), write_csv)
+        self._write_atomic(os.path.join(self.progress_dir, f"{shard.name}.json"),
+                           lambda f: json.dump(dict(progress, decided=len(rows), updated=time.time()), f))
+        if os.path.exists(self.claim_path(shard)):
+            os.utime(self.claim_path(shard))
+        return len(rows)
+
+    def progress(self):
+        progress = {}
+        for name in sorted(os.listdir(self.progress_dir)):
+            if name.endswith('.json'):
+                try:
+                    with open(os.path.join(self.progress_dir, name), 'r', encoding='utf-8') as f:
+                        progress[name[:-len('.json')]] = json.load(f)
+                except (OSError, ValueError):
+                    continue
+        return progress
+
+    def published_decisions(self):
+        """Latest decision per file across every shard; ties resolve the same way on every machine"""
+        latest = {}
+        for name in sorted(os.listdir(self.decisions_dir)):
+            if not name.endswith('.csv'):
+                continue
+            with open(os.path.join(self.decisions_dir, name), 'r', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    if not (row.get('filename') and row.get('decision')):
+                        continue
+                    key = (row['timestamp'], row['decision'], row.get('notes') or '')
+                    current = latest.get(row['filename'])
+                    if current is None or key > (current['timestamp'], current['decision'], current['notes']):
+                        latest[row['filename']] = {field: row.get(field) or '' for field in CSV_FIELDS}
+        return latest
+
+def all_shards(eaf_folder, mode, count):
+    """Every shard of the corpus: one per region found in eaf_folder, or count hash buckets"""
+    if mode == 'hash':
+        return [Shard('hash', index=i, count=count) for i in range(count)]
+    regions = set()
+    for root, dirs, files in os.walk(eaf_folder):
+        regions.update(region_of(f) for f in files if f.endswith('.eaf'))
+    return [Shard('region', regions=[r]) for r in sorted(regions)]
+
+if __name__ == "__main__":
+    from simple_viewer import SimpleSignAnnotate
+
+    parser = argparse.ArgumentParser(description="Coordinate sharded workers through a shared manifest directory")
+    parser.add_argument('command', choices=['claim', 'release', 'publish', 'merge', 'status'])
+    parser.add_argument('shard', nargs='?', help="Shard spec for release/publish (default: BSL_SHARD)")
+    parser.add_argument('--manifest', help="Shared manifest directory (default: BSL_MANIFEST_DIR or ./manifest)")
+    parser.add_argument('--mode', choices=['region', 'hash'], default='region', help="How claim partitions the corpus")
+    parser.add_argument('--count', type=int, default=4, help="Number of hash shards (default: 4)")
+    args = parser.parse_args()
+
+    manifest = ShardManifest(args.manifest)
+    owner = os.environ.get('BSL_ANNOTATOR') or f"{socket.gethostname()}:{os.getpid()}"
+
+    if args.command == 'claim':
+        viewer = SimpleSignAnnotate()
+        shard = manifest.claim_next(all_shards(viewer.eaf_folder, args.mode, args.count), owner)
+        if shard is None:
+            print("⏳ Every shard is already claimed", file=sys.stderr)
+            sys.exit(1)
+        # Only the spec goes to stdout: export BSL_SHARD=$(python3 shards.py claim)
+        print(f"🔒 Claimed {shard.name} for {owner}", file=sys.stderr)
+        print(shard)
+
+    elif args.command in ['release', 'publish']:
+        shard = parse_shard(args.shard) if args.shard else default_shard()
+        if shard is None:
+            print("❌ No shard given (pass one or set BSL_SHARD)")
+            sys.exit(1)
+        if args.command == 'release':
+            manifest.release(shard)
+            print(f"🔓 Released {shard.name}")
+        else:
+            viewer = SimpleSignAnnotate()
+            viewer.shard = shard
+            viewer.decision_log.compact()  # include journalled decisions not yet in the store
+            files = viewer.find_conversation_files()
+            pending = viewer.get_unprocessed_files(files)
+            count = manifest.publish(shard, viewer.decision_log.store, {
+                'shard': str(shard), 'owner': owner, 'files': len(files), 'pending': len(pending)
+            })
+            print(f"📤 Published {count} decisions for {shard.name} to {manifest.manifest_dir}")
+
+    elif args.command == 'merge':
+        store = DecisionStore(os.getcwd())
+        latest = manifest.published_decisions()
+        changed = store.merge_latest(latest.values()) if latest else 0
+        total = store.export_csv()
+        print(f"✅ Merged {len(latest)} published decisions ({changed} newer than the store)")
+        print(f"📊 Total decisions: {total}")
+
+    else:
+        claims = manifest.claims()
+        progress = manifest.progress()
+        for name in sorted(set(claims) | set(progress)):
+            claim = claims.get(name)
+            done = progress.get(name)
+            owner_text = claim['owner'] if claim else 'unclaimed'
+            progress_text = f"{done['decided']} decided, {done['pending']} pending of {done['files']}" if done else 'no progress published'
+            print(f"  {name:<16} {owner_text:<30} {progress_text}")
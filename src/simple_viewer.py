@@ -5,15 +5,19 @@ Shows one main frame at a time with arrow navigation
 """
 
 import os
-import sys
-import subprocess
-import tempfile
-import shutil
-import base64
-from pathlib import Path
 from datetime import datetime
-import pympi
 import csv
+from frame_cache import FrameCache
+from timing import Timer, default_log_file
+from profiling import run_main
+from scan_index import ScanIndex, qualifies
+from eaf_session import open_session
+from sampling import SAMPLING_CONFIGS
+from prepare import prepare_file
+from decision_log import DecisionLog
+from analysis_store import AnalysisStore
+from shards import default_shard
+from leases import lease_next_file, default_annotator, default_server_url, HEARTBEAT_SECONDS
 
 class SimpleSignAnnotate:
     def __init__(self, eaf_folder=None, video_folder=None, output_dir=None):
@@ -23,7 +27,16 @@ class SimpleSignAnnotate:
         self.video_folder = video_folder or os.path.join(base_dir, "CAVA_Data", "Videos")
         self.output_file = os.path.join(base_dir, "offset_assessment.html")
         self.csv_file = os.path.join(base_dir, "decisions.csv")
+        self.timer = Timer(default_log_file(base_dir))
+        self.frame_cache = FrameCache(os.path.join(base_dir, "frame_cache"), self.timer)
+        self.decision_log = DecisionLog(base_dir)
+        self.scan_index = ScanIndex(base_dir)
+        self.analysis_store = AnalysisStore(base_dir)  # offset estimates from offset_estimator.py
+        self.shard = default_shard()  # BSL_SHARD: only this worker's part of the corpus
+        self.server_url = default_server_url()
+        self.annotator = default_annotator()
         self.target_sign = "GOOD"
+        self.sampling_points = SAMPLING_CONFIGS['midpoint']  # the page shows one frame per video
 
     def ensure_csv_exists(self):
         """Create CSV file if it doesn't exist"""
@@ -37,252 +50,120 @@ class SimpleSignAnnotate:
         suitable_files = []
         print("Scanning files for annotation requirements...")
 
-        for root, dirs, files in os.walk(self.eaf_folder):
-            for file in files:
-                if file.endswith('.eaf'):
-                    file_path = os.path.join(root, file)
-                    if os.path.getsize(file_path) > 100 * 1024:  # >100KB
-                        try:
-                            eaf = pympi.Elan.Eaf(file_path)
-                            is_left_handed = file.upper().endswith('_LH.EAF')
-                            dominant_tier = "LH-IDgloss" if is_left_handed else "RH-IDgloss"
-                            dominant_data = eaf.get_annotation_data_for_tier(dominant_tier)
-
-                            total_annotations = len([1 for _, _, value in dominant_data if value and value.strip()])
-
-                            if total_annotations >= 20:
-                                good_count = sum(1 for _, _, value in dominant_data
-                                               if value and value.strip().upper() == "GOOD")
-                                if good_count >= 5:
-                                    suitable_files.append(file_path)
-                                    print(f"  Found {file}: {total_annotations} total, {good_count} GOOD")
-                        except:
-                            continue
+        # Counts come from the scan index; only new or changed EAFs are parsed
+        for entry in self.scan_index.scan(self.eaf_folder, self.shard):
+            if qualifies(entry):
+                suitable_files.append(entry['path'])
+                print(f"  Found {entry['filename']}: {entry['total']} total, {entry['good']} GOOD")
 
         return suitable_files
 
-    def get_processed_files(self):
-        """Get already processed files from CSV"""
-        processed = set()
-        if os.path.exists(self.csv_file):
-            with open(self.csv_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    processed.add(row['filename'])
-        return processed
-
-    def get_video_offset(self, eaf, video_filename):
-        """Get video offset from EAF media descriptors"""
-        offset = 0
-        try:
-            for descriptor in eaf.media_descriptors:
-                if (offset == 0) and ("MEDIA_URL" in descriptor) and ("TIME_ORIGIN" in descriptor) and (video_filename in descriptor["MEDIA_URL"]):
-                    offset = int(descriptor["TIME_ORIGIN"])
-                    break
-        except (AttributeError, KeyError, ValueError) as e:
-            print(f"   WARNING: Could not get video offset for {video_filename}: {e}")
-            offset = 0
-        return offset
-
-    def extract_frame_at_time(self, video_path, time_seconds, output_path):
-        """Extract frame using FFmpeg"""
-        try:
-            cmd = [
-                'ffmpeg', '-ss', str(time_seconds), '-i', video_path,
-                '-vframes', '1', '-q:v', '2', '-y', output_path
-            ]
-            subprocess.run(cmd, capture_output=True, check=True)
-            return True
-        except:
-            return False
-
-    def find_video_files(self, eaf_filename, eaf=None):
+    def get_unprocessed_files(self, all_files):
+        """Filter out files that already have a decision (indexed store lookups), likely-misaligned first"""
+        pending = set(self.decision_log.pending([os.path.basename(f) for f in all_files]))
+        return self.analysis_store.review_order([f for f in all_files if os.path.basename(f) in pending])
+
+    def get_video_offset(self, session, video_filename):
+        """Get video offset from EAF media descriptors (looked up once per video per session)"""
+        return session.video_offset(video_filename)
+
+    def find_video_files(self, eaf_filename, session=None):
         """Find corresponding video files from EAF media descriptors"""
-        if eaf is None:
+        if session is None:
             try:
                 eaf_path = os.path.join(self.eaf_folder, eaf_filename) if not os.path.isabs(eaf_filename) else eaf_filename
-                eaf = pympi.Elan.Eaf(eaf_path)
+                session = open_session(eaf_path, self.target_sign)
             except:
                 return []
-
-        found_videos = []
-
-        # Get video files from EAF media descriptors
-        for descriptor in eaf.media_descriptors:
-            if "MEDIA_URL" in descriptor:
-                media_url = descriptor["MEDIA_URL"]
-
-                # Extract filename from URL (handle both local files and URLs)
-                if "file://" in media_url:
-                    video_filename = os.path.basename(media_url)
-                else:
-                    video_filename = os.path.basename(media_url)
-
-                # Look for this video file in our video folder
-                # Try various extensions (.mov, .mp4)
-                base_name = os.path.splitext(video_filename)[0]
-                extensions = ['.mov', '.mp4', '.avi']
-
-                for ext in extensions:
-                    video_path = os.path.join(self.video_folder, base_name + ext)
-                    if os.path.exists(video_path):
-                        found_videos.append(video_path)
-                        print(f"   Video: Found video: {os.path.basename(video_path)}")
-                        break
-                else:
-                    # If exact match not found, try partial matching
-                    import glob
-                    search_pattern = os.path.join(self.video_folder, f"*{base_name.replace('-comp', '')}*")
-                    matches = glob.glob(search_pattern)
-                    for match in matches:
-                        if match not in found_videos:
-                            found_videos.append(match)
-                            print(f"   Video: Found video (partial match): {os.path.basename(match)}")
-                            break
-
-        # If still no videos found, try basic filename matching
-        if not found_videos:
-            base_name = os.path.splitext(eaf_filename)[0]
-            import glob
-            search_patterns = [
-                os.path.join(self.video_folder, f"{base_name}.*"),
-                os.path.join(self.video_folder, f"*{base_name}*"),
-            ]
-            for pattern in search_patterns:
-                matches = glob.glob(pattern)
-                for match in matches:
-                    if match.lower().endswith(('.mov', '.mp4', '.avi')):
-                        found_videos.append(match)
-
-        return found_videos
+        return session.find_videos(self.video_folder)
 
     def generate_html(self):
         """Generate simple arrow navigation interface"""
         self.ensure_csv_exists()
 
-        all_files = self.find_conversation_files()
-        processed_files = self.get_processed_files()
-        unprocessed_files = [f for f in all_files if os.path.basename(f) not in processed_files]
+        with self.timer.span('scan') as span:
+            all_files = self.find_conversation_files()
+            span['files'] = len(all_files)
+        with self.timer.span('pending') as span:
+            unprocessed_files = self.get_unprocessed_files(all_files)
+            span['files'] = len(unprocessed_files)
 
         if not unprocessed_files:
             print("COMPLETE: All files have been processed!")
             return
 
-        file_path = unprocessed_files[0]
+        # Lease a file so concurrent annotators each get a different one
+        with self.timer.span('lease'):
+            file_path = lease_next_file(unprocessed_files, self.server_url, self.annotator)
+        if file_path is None:
+            return
+
         filename = os.path.basename(file_path)
 
         print(f"Processing: Processing: {filename}")
         print(f"Remaining: Remaining files: {len(unprocessed_files)}")
 
-        temp_dir = tempfile.mkdtemp()
-
-        try:
-            eaf = pympi.Elan.Eaf(file_path)
-            is_left_handed = filename.upper().endswith('_LH.EAF')
-            dominant_tier = "LH-IDgloss" if is_left_handed else "RH-IDgloss"
-
-            dominant_data = eaf.get_annotation_data_for_tier(dominant_tier)
-            good_annotations = []
-            for start_time, end_time, value in dominant_data:
-                if value and value.strip().upper() == self.target_sign.upper():
-                    good_annotations.append({
-                        'start_time': start_time,
-                        'end_time': end_time,
-                        'value': value
-                    })
-
-            videos = self.find_video_files(filename, eaf)
-            all_frames = []
-
-            # Extract frames from all annotations and videos
-            for ann_idx, annotation in enumerate(good_annotations):
-                for vid_idx, video_path in enumerate(videos):
-                    frames = self.extract_annotation_frames(
-                        annotation, video_path, temp_dir, f"ann{ann_idx+1}", vid_idx+1, eaf
-                    )
-                    for frame in frames:
-                        frame['annotation_idx'] = ann_idx + 1
-                        frame['annotation_value'] = annotation['value']
-                        frame['video_name'] = f"Video {vid_idx+1}"
-                        frame['filename'] = filename
-                    all_frames.extend(frames)
-
-            # Generate simple navigation HTML
+        # Frames may already have been prepared overnight by precompute.py
+        with self.timer.span('payload_load', file=filename) as span:
+            all_frames = self.frame_cache.load_payload(filename, self.sampling_points)
+            span['frames'] = len(all_frames) if all_frames else 0
+        if all_frames is None:
+            all_frames = self.prepare_file(file_path)
+        else:
+            print(f"Cached: Using {len(all_frames)} precomputed frames")
+
+        # Generate simple navigation HTML
+        with self.timer.span('html_render', file=filename, frames=len(all_frames)) as span:
             html_content = self.generate_simple_html(filename, all_frames, len(unprocessed_files))
+            span['bytes'] = len(html_content)
 
+        with self.timer.span('html_write', file=filename) as span:
             with open(self.output_file, 'w', encoding='utf-8') as f:
                 f.write(html_content)
+            span['bytes'] = os.path.getsize(self.output_file)
 
-            print(f"Generated: HTML generated: {self.output_file}")
-            os.system(f'open "{self.output_file}"')
-
-        finally:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        print(f"Generated: HTML generated: {self.output_file}")
+        self.frame_cache.close()  # the page has its previews; release the archive maps
+        self.timer.summary()
+        os.system(f'open "{self.output_file}"')
 
-    def extract_annotation_frames(self, annotation, video_path, temp_dir, file_prefix, video_num, eaf):
-        """Extract only midpoint frame (45%-50%) per annotation per video"""
-        start_time_ms = annotation['start_time']
-        end_time_ms = annotation['end_time']
-        duration_ms = end_time_ms - start_time_ms
+    def prepare_file(self, file_path):
+        """Extract the midpoint frame (45%-50%) per GOOD annotation per video and store the page payload"""
+        return prepare_file(self.frame_cache, self.analysis_store, self.timer, file_path, self.sampling_points,
+                            lambda session: self.find_video_files(session.filename, session),
+                            self.video_offset_for, self.target_sign)
 
-        # Get video filename for offset lookup
+    def video_offset_for(self, session, video_path, video_num):
+        """TIME_ORIGIN offset from the EAF media descriptors, applied before sampling"""
         video_filename = os.path.basename(video_path)
-
-        # Get video offset from EAF media descriptors
-        video_offset_ms = self.get_video_offset(eaf, video_filename)
+        video_offset_ms = self.get_video_offset(session, video_filename)
 
         # Debug output for offset information
         if video_offset_ms > 0:
             print(f"   Offset: Video {video_num} offset: {video_offset_ms}ms for {video_filename}")
         else:
             print(f"   WARNING:  Video {video_num} no offset found for {video_filename}")
-
-        # Extract frame at midpoint (47.5% - perfect middle between 45-50%)
-        percentage = 0.475
-        point = "midpoint"
-
-        # Apply video offset to get correct timing
-        frame_time_ms = start_time_ms + (duration_ms * percentage) + video_offset_ms
-        frame_time_seconds = frame_time_ms / 1000.0
-
-        frame_filename = f"{file_prefix}_v{video_num}_{point}.png"
-        frame_path = os.path.join(temp_dir, frame_filename)
-
-        frames = []
-        if self.extract_frame_at_time(video_path, frame_time_seconds, frame_path):
-            with open(frame_path, 'rb') as f:
-                frame_data = base64.b64encode(f.read()).decode('utf-8')
-
-            frames.append({
-                'data': frame_data,
-                'point': point,
-                'percentage': percentage,
-                'time_seconds': frame_time_seconds,
-                'video_path': video_path,
-                'video_offset_ms': video_offset_ms,
-                'annotation_start_ms': start_time_ms,
-                'annotation_end_ms': end_time_ms
-            })
-
-        return frames
+        return video_offset_ms
 
     def generate_simple_html(self, filename, all_frames, remaining_count):
         """Generate simple HTML with arrow navigation"""
 
-        # Convert frames to JavaScript array
-        frames_js = "["
-        for i, frame in enumerate(all_frames):
-            if i > 0:
-                frames_js += ","
-            frames_js += f"""{{
-                data: "{frame['data']}",
-                point: "{frame['point']}",
-                percentage: {frame['percentage']},
-                annotation: {frame['annotation_idx']},
-                video: "{frame['video_name']}",
-                time: {frame['time_seconds']:.1f}
-            }}"""
-        frames_js += "]"
+        # Convert frames to JavaScript array; previews are read and base64-encoded only here
+        frame_entries = []
+        with self.timer.span('base64', file=filename, frames=len(all_frames)) as span:
+            for frame in all_frames:
+                frame_entries.append(f"""{{
+                data: "{self.frame_cache.preview_base64(filename, frame.key)}",
+                fullUrl: "{self.frame_cache.full_url(filename, frame.key, self.server_url)}",
+                point: "{frame.point}",
+                percentage: {frame.percentage},
+                annotation: {frame.annotation_idx},
+                video: "{frame.video_name}",
+                time: {frame.time_seconds:.1f},
+                drift: {frame.drift_seconds:.2f}
+            }}""")
+            frames_js = "[" + ",".join(frame_entries) + "]"
+            span['bytes'] = len(frames_js)
 
         html = f'''<!DOCTYPE html>
 <html lang="en">
@@ -383,6 +264,10 @@ class SimpleSignAnnotate:
             width: 100%;
             height: auto;
             display: block;
+            cursor: zoom-in;
+        }}
+        .frame-img.full {{
+            cursor: default;
         }}
         .frame-info {{
             padding: 10px;
@@ -484,8 +369,9 @@ class SimpleSignAnnotate:
             <h3>Remaining: File Status</h3>
             <p><strong>Current file:</strong> {filename}</p>
             <p><strong>Remaining files:</strong> {remaining_count}</p>
-            <p><strong>Total frames:</strong> {len(all_frames)} (4 time points × annotations × videos)</p>
+            <p><strong>Total frames:</strong> {len(all_frames)} ({len(self.sampling_points)} time point{'s' if len(self.sampling_points) != 1 else ''} × annotations × videos)</p>
             <p><strong>🎯 Task:</strong> Check if video timing matches annotation timing for "GOOD" signs</p>
+            <p><strong>🔍 Tip:</strong> Frames are small previews - click one to load it at full resolution</p>
         </div>
 
         <div class="file-header">
@@ -545,8 +431,8 @@ class SimpleSignAnnotate:
                         <div class="video-column">
                             <div class="video-header">Video: Video 1</div>
                             <div class="frame-card">
-                                <img src="data:image/png;base64,${{frame1.data}}" class="frame-img" alt="Video 1">
-                                <div class="frame-info">Time: ${{frame1.time}}s</div>
+                                <img src="data:image/jpeg;base64,${{frame1.data}}" data-full="${{frame1.fullUrl}}" class="frame-img" alt="Video 1" onclick="loadFullFrame(this)">
+                                <div class="frame-info">Time: ${{frame1.time}}s${{driftLabel(frame1)}}</div>
                             </div>
                         </div>
                     `;
@@ -559,8 +445,8 @@ class SimpleSignAnnotate:
                         <div class="video-column">
                             <div class="video-header">Video: Video 2</div>
                             <div class="frame-card">
-                                <img src="data:image/png;base64,${{frame2.data}}" class="frame-img" alt="Video 2">
-                                <div class="frame-info">Time: ${{frame2.time}}s</div>
+                                <img src="data:image/jpeg;base64,${{frame2.data}}" data-full="${{frame2.fullUrl}}" class="frame-img" alt="Video 2" onclick="loadFullFrame(this)">
+                                <div class="frame-info">Time: ${{frame2.time}}s${{driftLabel(frame2)}}</div>
                             </div>
                         </div>
                     `;
@@ -579,58 +465,122 @@ class SimpleSignAnnotate:
             container.innerHTML = html;
         }}
 
-        function recordDecision(decision) {{
-            const resultDiv = document.getElementById('result');
-            const timestamp = new Date().toISOString();
+        function driftLabel(frame) {{
+            // Fast decode mode shows the nearest keyframe: say how far it is from the requested point
+            if (Math.abs(frame.drift) < 0.05) return '';
+            return ` (${{frame.drift > 0 ? '+' : ''}}${{frame.drift.toFixed(2)}}s from requested)`;
+        }}
+
+        function loadFullFrame(img) {{
+            // Full resolution is extracted by the decision server on first request
+            if (img.classList.contains('full')) return;
+            const preview = img.src;
+            img.onerror = () => {{
+                img.onerror = null;
+                img.src = preview;
+                img.classList.remove('full');
+                console.log('WARNING: Full frame unavailable - is decision_server.py running?');
+            }};
+            img.classList.add('full');
+            img.src = img.dataset.full;
+        }}
 
-            // Update main CSV via server (immediate update)
-            fetch('http://localhost:8000/record_decision', {{
+        const SERVER_URL = '{self.server_url}';
+        const ANNOTATOR = '{self.annotator}';
+
+        // Keep the lease on this file while the page is open
+        function renewLease() {{
+            fetch(`${{SERVER_URL}}/lease/renew`, {{
                 method: 'POST',
                 headers: {{
                     'Content-Type': 'application/json',
                 }},
-                body: JSON.stringify({{
-                    filename: '{filename}',
-                    decision: decision,
-                    timestamp: timestamp,
-                    notes: decision === 'accept' ? 'Good offset alignment' : 'Poor offset alignment'
-                }})
+                body: JSON.stringify({{ annotator: ANNOTATOR, filename: '{filename}' }})
             }}).then(response => {{
-                if (response.ok) {{
-                    console.log('Generated: Main CSV updated successfully');
-                }} else {{
-                    console.log('WARNING: Server update failed (response not ok), backup download still works');
-                    console.log('Status:', response.status, response.statusText);
+                if (response.status === 409) {{
+                    console.log('WARNING: Lease lost - another annotator is now reviewing this file');
                 }}
+            }}).catch(() => {{}});
+        }}
+
+        setInterval(renewLease, {HEARTBEAT_SECONDS * 1000});
+
+        // Decisions wait in a persistent local queue until the server confirms them
+        const QUEUE_KEY = 'decisionQueue';
+        const BATCH_SIZE = 50;
+        let flushing = false;
+        let retryDelay = 1000;
+
+        function loadQueue() {{
+            try {{
+                return JSON.parse(localStorage.getItem(QUEUE_KEY)) || [];
+            }} catch (e) {{
+                return [];
+            }}
+        }}
+
+        function saveQueue(queue) {{
+            localStorage.setItem(QUEUE_KEY, JSON.stringify(queue));
+        }}
+
+        function newDecisionId() {{
+            if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+            return `${{Date.now()}}-${{Math.random().toString(36).slice(2)}}`;
+        }}
+
+        function flushQueue() {{
+            if (flushing) return Promise.resolve();
+            const batch = loadQueue().slice(0, BATCH_SIZE);
+            if (batch.length === 0) return Promise.resolve();
+
+            flushing = true;
+            return fetch(`${{SERVER_URL}}/record_decisions`, {{
+                method: 'POST',
+                headers: {{
+                    'Content-Type': 'application/json',
+                }},
+                body: JSON.stringify({{ decisions: batch }})
+            }}).then(response => {{
+                if (!response.ok) throw new Error(`${{response.status}} ${{response.statusText}}`);
+                return response.json();
+            }}).then(result => {{
+                // Accepted and already-recorded ids are both safe to drop
+                const done = new Set([...result.accepted, ...result.duplicates, ...result.invalid]);
+                saveQueue(loadQueue().filter(item => !done.has(item.id)));
+                console.log(`Generated: ${{result.accepted.length}} decision(s) recorded`);
+                flushing = false;
+                retryDelay = 1000;
+                return flushQueue();
             }}).catch(error => {{
-                console.log('WARNING: Server not available, backup download still works');
+                flushing = false;
+                console.log(`WARNING: Server not available, ${{loadQueue().length}} decision(s) queued - retrying`);
                 console.log('Error:', error.message);
+                setTimeout(flushQueue, retryDelay);
+                retryDelay = Math.min(retryDelay * 2, 30000);
             }});
+        }}
 
-            // Create backup CSV download (keep existing functionality)
-            const csvRecord = `{filename},${{decision}},${{timestamp}},\\n`;
-            const blob = new Blob([csvRecord], {{ type: 'text/csv' }});
-            const url = window.URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.style.display = 'none';
-            a.href = url;
-            a.download = `decision_${{decision}}_{filename}.csv`;
-            document.body.appendChild(a);
-            a.click();
-            window.URL.revokeObjectURL(url);
-            document.body.removeChild(a);
+        function recordDecision(decision) {{
+            const resultDiv = document.getElementById('result');
+
+            const queue = loadQueue();
+            queue.push({{
+                id: newDecisionId(),
+                annotator: ANNOTATOR,
+                filename: '{filename}',
+                decision: decision,
+                timestamp: new Date().toISOString(),
+                notes: decision === 'accept' ? 'Good offset alignment' : 'Poor offset alignment'
+            }});
+            saveQueue(queue);
 
             if (decision === 'accept') {{
                 resultDiv.innerHTML = `Generated: <span style="color: #27ae60;"><strong>Decision: ACCEPT for entire file</strong><br>
-                    Generated: Main CSV updated immediately!<br>
-                    Generated: Backup file downloaded to Downloads folder!<br>
-                    📁 File: decision_accept_{filename}.csv<br>
+                    Generated: Decision saved and sent to the decision server<br>
                     Processing: Refreshing page for next file in 3 seconds...</span>`;
             }} else {{
                 resultDiv.innerHTML = `❌ <span style="color: #e74c3c;"><strong>Decision: REJECT for entire file</strong><br>
-                    Generated: Main CSV updated immediately!<br>
-                    Generated: Backup file downloaded to Downloads folder!<br>
-                    📁 File: decision_reject_{filename}.csv<br>
+                    Generated: Decision saved and sent to the decision server<br>
                     Processing: Refreshing page for next file in 3 seconds...</span>`;
             }}
 
@@ -640,12 +590,15 @@ class SimpleSignAnnotate:
             // Scroll to result
             resultDiv.scrollIntoView({{ behavior: 'smooth' }});
 
-            // Auto-refresh for next file
+            // Auto-refresh for next file (anything still queued is sent after the reload)
+            flushQueue();
             setTimeout(() => {{
                 window.location.reload();
             }}, 3000);
         }}
 
+        window.addEventListener('online', flushQueue);
+
         // Keyboard shortcuts
         document.addEventListener('keydown', function(e) {{
             if (e.altKey) {{
@@ -657,8 +610,9 @@ class SimpleSignAnnotate:
             }}
         }});
 
-        // Initialize - load all annotations
+        // Initialize - load all annotations and send any decisions left from earlier pages
         loadAllAnnotations();
+        flushQueue();
         console.log('🎯 Review all annotations, then: Alt+A (Accept) | Alt+R (Reject)');
     </script>
 </body>
@@ -668,4 +622,4 @@ class SimpleSignAnnotate:
 
 if __name__ == "__main__":
     processor = SimpleSignAnnotate()
-    processor.generate_html()
\ No newline at end of file
+    run_main("simple_viewer", processor.generate_html)  # --profile [cprofile|sampled]
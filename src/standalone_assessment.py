@@ -5,15 +5,18 @@ Creates a single HTML file that can be reloaded reliably
 """
 
 import os
-import sys
-import subprocess
-import tempfile
-import shutil
-import base64
-from pathlib import Path
 from datetime import datetime
-import pympi
 import csv
+from frame_cache import FrameCache
+from timing import Timer, default_log_file
+from profiling import run_main
+from scan_index import ScanIndex, MIN_ANNOTATIONS, MIN_GOOD
+from sampling import default_sampling
+from prepare import prepare_file
+from decision_log import DecisionLog
+from analysis_store import AnalysisStore
+from shards import default_shard
+from leases import lease_next_file, default_annotator, default_server_url, HEARTBEAT_SECONDS
 
 class BadOffsetIdentifierStandalone:
     def __init__(self, eaf_folder=None, video_folder=None, output_dir=None):
@@ -23,7 +26,16 @@ class BadOffsetIdentifierStandalone:
         self.video_folder = video_folder or os.environ.get('BSL_VIDEO_FOLDER', '/Volumes/2TB HD/BSLC media/Conversation')
         self.output_file = os.path.join(base_dir, "offset_assessment.html")
         self.csv_file = os.path.join(base_dir, "decisions.csv")
+        self.timer = Timer(default_log_file(base_dir))
+        self.frame_cache = FrameCache(os.path.join(base_dir, "frame_cache"), self.timer)
+        self.decision_log = DecisionLog(base_dir)
+        self.scan_index = ScanIndex(base_dir)
+        self.analysis_store = AnalysisStore(base_dir)  # offset estimates from offset_estimator.py
+        self.shard = default_shard()  # BSL_SHARD: only this worker's part of the corpus
+        self.server_url = default_server_url()
+        self.annotator = default_annotator()
         self.target_sign = "GOOD"
+        self.sampling_points = default_sampling('four_point')
 
     def ensure_csv_exists(self):
         """Create CSV file if it doesn't exist"""
@@ -40,51 +52,20 @@ class BadOffsetIdentifierStandalone:
         print("   • Minimum 5 'GOOD' annotations per file")
         print()
 
-        for root, dirs, files in os.walk(self.eaf_folder):
-            for file in files:
-                if file.endswith('.eaf'):
-                    file_path = os.path.join(root, file)
-                    if os.path.getsize(file_path) > 100 * 1024:  # >100KB
-                        try:
-                            eaf = pympi.Elan.Eaf(file_path)
-
-                            # Check dominant hand based on filename
-                            is_left_handed = file.upper().endswith('_LH.EAF')
-                            dominant_tier = "LH-IDgloss" if is_left_handed else "RH-IDgloss"
-
-                            dominant_data = eaf.get_annotation_data_for_tier(dominant_tier)
-
-                            # Check total annotations first (must be >= 20)
-                            total_annotations = len([1 for _, _, value in dominant_data if value and value.strip()])
-
-                            if total_annotations >= 20:  # Minimum 20 total annotations
-                                # Then check for GOOD annotations
-                                good_count = sum(1 for _, _, value in dominant_data
-                                               if value and value.strip().upper() == "GOOD")
-                                if good_count >= 5:  # Minimum 5 GOOD annotations
-                                    suitable_files.append(file_path)
-                                    print(f"  ✅ {file}: {total_annotations} total annotations, {good_count} GOOD")
-                                else:
-                                    print(f"  ⏭️ {file}: {total_annotations} total annotations, only {good_count} GOOD (need 5+)")
-                            else:
-                                print(f"  ❌ {file}: Only {total_annotations} total annotations (need 20+)")
-                        except:
-                            continue
+        # Counts come from the scan index; only new or changed EAFs are parsed
+        for entry in self.scan_index.scan(self.eaf_folder, self.shard):
+            if 'error' in entry:
+                continue
+            if entry['total'] < MIN_ANNOTATIONS:  # Minimum 20 total annotations
+                print(f"  ❌ {entry['filename']}: Only {entry['total']} total annotations (need 20+)")
+            elif entry['good'] < MIN_GOOD:  # Minimum 5 GOOD annotations
+                print(f"  ⏭️ {entry['filename']}: {entry['total']} total annotations, only {entry['good']} GOOD (need 5+)")
+            else:
+                suitable_files.append(entry['path'])
+                print(f"  ✅ {entry['filename']}: {entry['total']} total annotations, {entry['good']} GOOD")
 
         return suitable_files
 
-    def extract_frame_at_time(self, video_path, time_seconds, output_path):
-        """Extract frame using FFmpeg"""
-        try:
-            cmd = [
-                'ffmpeg', '-ss', str(time_seconds), '-i', video_path,
-                '-vframes', '1', '-q:v', '2', '-y', output_path
-            ]
-            subprocess.run(cmd, capture_output=True, check=True)
-            return True
-        except:
-            return False
-
     def find_video_files(self, eaf_filename):
         """Find corresponding video files for BSL Corpus"""
         base_name = os.path.splitext(eaf_filename)[0]
@@ -108,125 +89,78 @@ class BadOffsetIdentifierStandalone:
 
         return found_videos
 
-    def get_processed_files(self):
-        """Get already processed files from CSV"""
-        processed = set()
-        if os.path.exists(self.csv_file):
-            with open(self.csv_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    processed.add(row['filename'])
-        return processed
+    def get_unprocessed_files(self, all_files):
+        """Filter out files that already have a decision (indexed store lookups), likely-misaligned first"""
+        pending = set(self.decision_log.pending([os.path.basename(f) for f in all_files]))
+        return self.analysis_store.review_order([f for f in all_files if os.path.basename(f) in pending])
 
     def generate_html(self):
         """Generate standalone HTML assessment interface"""
         self.ensure_csv_exists()
 
         # Get files to process
-        all_files = self.find_conversation_files()
-        processed_files = self.get_processed_files()
+        with self.timer.span('scan') as span:
+            all_files = self.find_conversation_files()
+            span['files'] = len(all_files)
 
         # Filter to unprocessed files
-        unprocessed_files = [f for f in all_files if os.path.basename(f) not in processed_files]
+        with self.timer.span('pending') as span:
+            unprocessed_files = self.get_unprocessed_files(all_files)
+            span['files'] = len(unprocessed_files)
 
         if not unprocessed_files:
             print("🎉 All files have been processed!")
             return
 
-        # Process first unprocessed file
-        file_path = unprocessed_files[0]
+        # Lease an unprocessed file so concurrent annotators each get a different one
+        with self.timer.span('lease'):
+            file_path = lease_next_file(unprocessed_files, self.server_url, self.annotator)
+        if file_path is None:
+            return
+
         filename = os.path.basename(file_path)
 
         print(f"🔄 Processing: {filename}")
         print(f"📊 Remaining files: {len(unprocessed_files)}")
 
-        # Create temporary directory for frames
-        temp_dir = tempfile.mkdtemp()
-
-        try:
-            # Parse EAF and extract frames
-            eaf = pympi.Elan.Eaf(file_path)
-
-            # Get GOOD annotations from dominant hand
-            is_left_handed = filename.upper().endswith('_LH.EAF')
-            dominant_tier = "LH-IDgloss" if is_left_handed else "RH-IDgloss"
-
-            dominant_data = eaf.get_annotation_data_for_tier(dominant_tier)
-            good_annotations = []
-            for start_time, end_time, value in dominant_data:
-                if value and value.strip().upper() == self.target_sign.upper():
-                    good_annotations.append({
-                        'start_time': start_time,
-                        'end_time': end_time,
-                        'value': value
-                    })
-
-            # Find videos
-            videos = self.find_video_files(filename)
-
-            # Extract frames
-            all_frames = []
-            for ann_idx, annotation in enumerate(good_annotations):
-                for vid_idx, video_path in enumerate(videos):
-                    frames = self.extract_annotation_frames(
-                        annotation, video_path, temp_dir, f"ann{ann_idx+1}", vid_idx+1
-                    )
-                    for frame in frames:
-                        frame['annotation_idx'] = ann_idx + 1
-                        frame['annotation_value'] = annotation['value']
-                        frame['video_name'] = f"Video {vid_idx+1}"
-                        frame['filename'] = filename
-                    all_frames.extend(frames)
-
-            # Generate HTML
+        # Frames may already have been prepared overnight by precompute.py --viewer standalone
+        with self.timer.span('payload_load', file=filename) as span:
+            all_frames = self.frame_cache.load_payload(filename, self.sampling_points)
+            span['frames'] = len(all_frames) if all_frames else 0
+        if all_frames is None:
+            all_frames = self.prepare_file(file_path)
+        else:
+            print(f"📦 Using {len(all_frames)} precomputed frames")
+
+        # Generate HTML
+        with self.timer.span('html_render', file=filename, frames=len(all_frames)) as span:
             html_content = self.generate_html_content(filename, all_frames, len(unprocessed_files))
+            span['bytes'] = len(html_content)
 
-            # Write HTML file
+        # Write HTML file
+        with self.timer.span('html_write', file=filename) as span:
             with open(self.output_file, 'w', encoding='utf-8') as f:
                 f.write(html_content)
+            span['bytes'] = os.path.getsize(self.output_file)
 
-            print(f"✅ HTML generated: {self.output_file}")
-
-            # Open in browser
-            os.system(f'open "{self.output_file}"')
-
-        finally:
-            shutil.rmtree(temp_dir, ignore_errors=True)
-
-    def extract_annotation_frames(self, annotation, video_path, temp_dir, file_prefix, video_num):
-        """Extract 4 frames per annotation"""
-        start_time_ms = annotation['start_time']
-        end_time_ms = annotation['end_time']
-        duration_ms = end_time_ms - start_time_ms
-
-        # Multi-point sampling strategy
-        sampling_points = [
-            ("early", 0.30),    # 30% - gesture formation
-            ("peak1", 0.45),    # 45% - primary peak
-            ("peak2", 0.65),    # 65% - sustained peak
-            ("late", 0.80)      # 80% - completion
-        ]
-
-        extracted_frames = []
-
-        for point_name, percentage in sampling_points:
-            sample_time_ms = start_time_ms + (duration_ms * percentage)
-            sample_time_s = sample_time_ms / 1000.0
+        print(f"✅ HTML generated: {self.output_file}")
+        self.frame_cache.close()  # the page has its previews; release the archive maps
+        self.timer.summary()
 
-            output_path = os.path.join(temp_dir, f"{file_prefix}_v{video_num}_{point_name}.png")
+        # Open in browser
+        os.system(f'open "{self.output_file}"')
 
-            if self.extract_frame_at_time(video_path, sample_time_s, output_path):
-                with open(output_path, 'rb') as f:
-                    frame_data = base64.b64encode(f.read()).decode('utf-8')
+    def prepare_file(self, file_path):
+        """Extract preview frames at every sampling point of every GOOD annotation and store the page payload"""
+        # Multi-point sampling strategy: early 30%, peak1 45%, peak2 65%, late 80% (see sampling.py)
+        return prepare_file(self.frame_cache, self.analysis_store, self.timer, file_path, self.sampling_points,
+                            lambda session: self.find_video_files(session.filename), target_sign=self.target_sign)
 
-                extracted_frames.append({
-                    'point': point_name,
-                    'percentage': percentage,
-                    'time_s': sample_time_s,
-                    'data': frame_data
-                })
-
-        return extracted_frames
+    def drift_label(self, frame):
+        """Fast decode mode shows the nearest keyframe: say how far it is from the requested point"""
+        if abs(frame.drift_seconds) < 0.05:
+            return ""
+        return f"<br>{frame.drift_seconds:+.2f}s from requested"
 
     def generate_html_content(self, filename, all_frames, remaining_count):
         """Generate HTML content with 45%/25% layout"""
@@ -234,10 +168,13 @@ class BadOffsetIdentifierStandalone:
         # Group frames by annotation
         frames_by_annotation = {}
         for frame in all_frames:
-            ann_idx = frame['annotation_idx']
-            if ann_idx not in frames_by_annotation:
-                frames_by_annotation[ann_idx] = []
-            frames_by_annotation[ann_idx].append(frame)
+            frames_by_annotation.setdefault(frame.annotation_idx, []).append(frame)
+
+        # Previews are read and base64-encoded only while rendering; each appears in the gallery and the grid
+        with self.timer.span('base64', file=filename, frames=len(all_frames)) as span:
+            previews = {frame.key: self.frame_cache.preview_base64(filename, frame.key) for frame in all_frames}
+            span['bytes'] = sum(len(data) for data in previews.values())
+        full_urls = {frame.key: self.frame_cache.full_url(filename, frame.key, self.server_url) for frame in all_frames}
 
         html = f"""<!DOCTYPE html>
 <html lang="en">
@@ -262,7 +199,8 @@ class BadOffsetIdentifierStandalone:
         .frame-card {{ background: white; border-radius: 8px; padding: 15px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); text-align: center; }}
         .frame-card.main {{ background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%); border: 3px solid #667eea; }}
 
-        .frame-img {{ max-width: 100%; height: auto; object-fit: cover; border-radius: 6px; border: 2px solid #ddd; }}
+        .frame-img {{ max-width: 100%; height: auto; object-fit: cover; border-radius: 6px; border: 2px solid #ddd; cursor: zoom-in; }}
+        .frame-img.full {{ cursor: default; }}
         .frame-img.main {{ height: 300px; }}
         .frame-img.secondary {{ height: 120px; }}
 
@@ -298,6 +236,7 @@ class BadOffsetIdentifierStandalone:
             <p><strong>✅ Requirements met:</strong> ≥20 total annotations + ≥5 "GOOD" signs</p>
             <p><strong>👁️ Focus:</strong> Only exact "GOOD" signs from dominant hand shown</p>
             <p><strong>🎯 Task:</strong> Check if video timing matches the annotation timing</p>
+            <p><strong>🔍 Tip:</strong> Frames are small previews - click one to load it at full resolution</p>
         </div>
 
         <div class="view-toggle">
@@ -312,7 +251,7 @@ class BadOffsetIdentifierStandalone:
             if ann_frames:
                 html += f"""
             <div class="annotation-group">
-                <div class="annotation-label">Annotation {ann_idx}: "{ann_frames[0]['annotation_value']}"</div>
+                <div class="annotation-label">Annotation {ann_idx}: "{ann_frames[0].annotation_value}"</div>
                 <div class="frame-gallery">"""
 
                 # Main frame (peak1 at 45%)
@@ -320,8 +259,8 @@ class BadOffsetIdentifierStandalone:
                 html += f"""
                     <div class="main-frame">
                         <div class="frame-card main">
-                            <img src="data:image/png;base64,{main_frame['data']}" class="frame-img main" alt="Main Frame">
-                            <div class="frame-label"><strong>MAIN:</strong> {main_frame['video_name']}<br>{main_frame['point']} ({int(main_frame['percentage']*100)}%)</div>
+                            <img src="data:image/jpeg;base64,{previews[main_frame.key]}" data-full="{full_urls[main_frame.key]}" class="frame-img main" alt="Main Frame" onclick="loadFullFrame(this)">
+                            <div class="frame-label"><strong>MAIN:</strong> {main_frame.video_name}<br>{main_frame.point} ({int(main_frame.percentage*100)}%){self.drift_label(main_frame)}</div>
                         </div>
                     </div>"""
 
@@ -333,8 +272,8 @@ class BadOffsetIdentifierStandalone:
                     for frame in secondary_frames[:3]:
                         html += f"""
                             <div class="frame-card">
-                                <img src="data:image/png;base64,{frame['data']}" class="frame-img secondary" alt="Secondary Frame">
-                                <div class="frame-label">{frame['video_name']}<br>{frame['point']} ({int(frame['percentage']*100)}%)</div>
+                                <img src="data:image/jpeg;base64,{previews[frame.key]}" data-full="{full_urls[frame.key]}" class="frame-img secondary" alt="Secondary Frame" onclick="loadFullFrame(this)">
+                                <div class="frame-label">{frame.video_name}<br>{frame.point} ({int(frame.percentage*100)}%){self.drift_label(frame)}</div>
                             </div>"""
                     html += f"""
                         </div>"""
@@ -352,9 +291,9 @@ class BadOffsetIdentifierStandalone:
         for frame in all_frames:
             html += f"""
             <div class="frame-card">
-                <div class="annotation-label">Ann {frame['annotation_idx']}: "{frame['annotation_value']}"</div>
-                <img src="data:image/png;base64,{frame['data']}" class="frame-img" alt="Frame">
-                <div class="frame-label">{frame['video_name']}<br>{frame['point']} ({int(frame['percentage']*100)}%)</div>
+                <div class="annotation-label">Ann {frame.annotation_idx}: "{frame.annotation_value}"</div>
+                <img src="data:image/jpeg;base64,{previews[frame.key]}" data-full="{full_urls[frame.key]}" class="frame-img" alt="Frame" onclick="loadFullFrame(this)">
+                <div class="frame-label">{frame.video_name}<br>{frame.point} ({int(frame.percentage*100)}%){self.drift_label(frame)}</div>
             </div>"""
 
         html += f"""
@@ -378,6 +317,23 @@ class BadOffsetIdentifierStandalone:
     </div>
 
     <script>
+        // Keep the lease on this file while the page is open
+        function renewLease() {{
+            fetch('{self.server_url}/lease/renew', {{
+                method: 'POST',
+                headers: {{
+                    'Content-Type': 'application/json',
+                }},
+                body: JSON.stringify({{ annotator: '{self.annotator}', filename: '{filename}' }})
+            }}).then(response => {{
+                if (response.status === 409) {{
+                    console.log('WARNING: Lease lost - another annotator is now reviewing this file');
+                }}
+            }}).catch(() => {{}});
+        }}
+
+        setInterval(renewLease, {HEARTBEAT_SECONDS * 1000});
+
         function switchView(viewType) {{
             const galleryContainer = document.getElementById('gallery-container');
             const gridContainer = document.getElementById('grid-container');
@@ -396,6 +352,20 @@ class BadOffsetIdentifierStandalone:
             }}
         }}
 
+        function loadFullFrame(img) {{
+            // Full resolution is extracted by the decision server on first request
+            if (img.classList.contains('full')) return;
+            const preview = img.src;
+            img.onerror = () => {{
+                img.onerror = null;
+                img.src = preview;
+                img.classList.remove('full');
+                console.log('WARNING: Full frame unavailable - is decision_server.py running?');
+            }};
+            img.classList.add('full');
+            img.src = img.dataset.full;
+        }}
+
         function recordDecision(decision) {{
             // Save decision locally and show command to run
             const resultDiv = document.getElementById('result');
@@ -441,4 +411,4 @@ class BadOffsetIdentifierStandalone:
 
 if __name__ == "__main__":
     processor = BadOffsetIdentifierStandalone()
-    processor.generate_html()
\ No newline at end of file
+    run_main("standalone_assessment", processor.generate_html)  # --profile [cprofile|sampled]
\ No newline at end of file
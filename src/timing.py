@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Lightweight per-stage timing for the review pipeline
+Each span (scan, EAF parse, video lookup, ffmpeg call, base64 encode, HTML
+render / write, ...) is written as one JSON line with its duration and
+whatever counts the caller attaches (bytes, file, videos, annotations), and
+an end-of-run summary table aggregates the spans by stage. Spans may nest
+(an ffmpeg call inside an extraction); shares in the summary are of the time
+spent in top-level spans, so nested time is not counted twice.
+The log goes to timings.jsonl in the working directory, or BSL_TIMING_LOG
+(set BSL_TIMING_LOG=off to only keep the in-memory summary).
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+def default_log_file(base_dir=None):
+    log_file = os.environ.get('BSL_TIMING_LOG')
+    if log_file == 'off':
+        return None
+    return log_file or os.path.join(base_dir or os.getcwd(), "timings.jsonl")
+
+class Timer:
+    def __init__(self, log_file=None):
+        self.log_file = log_file
+        self.run_id = f"{os.getpid()}-{int(time.time())}"
+        self.stages = {}  # stage -> [calls, total seconds, max seconds]
+        self.nested_stages = set()  # stages recorded inside another span
+        self.top_level_seconds = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()  # per-thread span depth
+
+    @contextmanager
+    def span(self, stage, **fields):
+        """Time a block; the yielded dict can take extra fields (bytes, counts) before it closes"""
+        record = dict(fields)
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
+        started = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record['error'] = type(e).__name__
+            raise
+        finally:
+            self._local.depth -= 1
+            self.record(stage, time.perf_counter() - started, **record)
+
+    def record(self, stage, seconds, **fields):
+        """Log one timed stage; it is nested if recorded while another span is open in this thread"""
+        nested = getattr(self._local, 'depth', 0) > 0
+        entry = {'ts': round(time.time(), 3), 'run': self.run_id, 'stage': stage,
+                 'duration_ms': round(seconds * 1000, 3)}
+        entry.update(fields)
+        with self._lock:
+            calls, total, longest = self.stages.get(stage, (0, 0.0, 0.0))
+            self.stages[stage] = (calls + 1, total + seconds, max(longest, seconds))
+            if nested:
+                self.nested_stages.add(stage)
+            else:
+                self.top_level_seconds += seconds
+            if self.log_file:
+                with open(self.log_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + '\n')
+
+    def summary(self):
+        """End-of-run table: calls, total, mean, max and share of the top-level timed total per stage"""
+        with self._lock:
+            stages = sorted(self.stages.items(), key=lambda item: item[1][1], reverse=True)
+            nested_stages = set(self.nested_stages)
+            grand_total = self.top_level_seconds or 1
+        if not stages:
+            return
+
+        print(f"\n⏱️  {'stage':<16} {'calls':>6} {'total s':>9} {'mean ms':>9} {'max ms':>9} {'share':>6}")
+        for stage, (calls, total, longest) in stages:
+            name = f"↳ {stage}" if stage in nested_stages else stage
+            print(f"   {name:<16} {calls:>6} {total:>9.3f} {total / calls * 1000:>9.1f} "
+                  f"{longest * 1000:>9.1f} {total / grand_total:>6.0%}")
+        if nested_stages:
+            print(f"   Shares are of {self.top_level_seconds:.3f}s in top-level spans; ↳ stages ran inside another span")
+        if self.log_file:
+            print(f"   Timings logged to {self.log_file} (run {self.run_id})")
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Tests for the automatic decision policy
+Run with: python -m pytest tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from auto_decisions import decide, default_policy
+
+def score(mismatch, correction_ms, annotations):
+    return {'video': 'BF1+2c.mp4', 'time_origin_ms': 0, 'suggested_offset_ms': correction_ms,
+            'mismatch': mismatch, 'annotations': annotations}
+
+def test_rejects_need_the_minimum_evidence():
+    policy = default_policy()
+    assert decide(policy, [score(0.95, 900, 1)], None)[0] is None
+    assert decide(policy, [score(0.95, 900, 6)], None)[0] == 'reject'
+    estimate = {'lag_seconds': 1.0, 'confidence': 0.9, 'windows': 1}
+    assert decide(policy, [score(0.05, 40, 6)], estimate)[0] is None
+    assert decide(policy, [score(0.05, 40, 6)], dict(estimate, windows=6))[0] == 'reject'
+
+def test_accept_needs_the_minimum_evidence():
+    policy = default_policy()
+    assert decide(policy, [score(0.05, 40, 1)], None)[0] is None
+    assert decide(policy, [score(0.05, 40, 6)], None)[0] == 'accept'
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the write-behind decision cache
+Run with: python -m pytest tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import pytest
+from decision_log import DecisionLog
+from decision_cache import DecisionCache
+from metrics import Metrics
+
+def make_cache(base_dir):
+    return DecisionCache(DecisionLog(str(base_dir)), flush_interval=3600)
+
+def test_failed_append_is_not_remembered(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path)
+    decision = {'id': 'abc', 'filename': 'BF01F28WDC.eaf', 'decision': 'accept'}
+    try:
+        def failing_append(entries):
+            raise OSError(5, "Input/output error")
+        monkeypatch.setattr(cache.decision_log, 'append_entries', failing_append)
+        with pytest.raises(OSError):
+            cache.record([decision])
+        assert cache.pending(['BF01F28WDC.eaf']) == ['BF01F28WDC.eaf']
+        monkeypatch.undo()
+
+        # The page's retry is recorded, not answered as a duplicate
+        entries, duplicates = cache.record([decision])
+        assert [entry['id'] for entry in entries] == ['abc']
+        assert duplicates == []
+        assert cache.pending(['BF01F28WDC.eaf']) == []
+        assert [entry['id'] for entry in cache.decision_log.read_journal()] == ['abc']
+    finally:
+        cache.close()
+
+def test_repeated_id_in_one_batch_is_a_duplicate(tmp_path):
+    cache = make_cache(tmp_path)
+    decision = {'id': 'abc', 'filename': 'BF01F28WDC.eaf', 'decision': 'accept'}
+    try:
+        entries, duplicates = cache.record([decision, decision])
+        assert len(entries) == 1
+        assert duplicates == ['abc']
+    finally:
+        cache.close()
+
+def test_lookups_count_toward_the_hit_rate(tmp_path):
+    metrics = Metrics()
+    cache = DecisionCache(DecisionLog(str(tmp_path)), flush_interval=3600, metrics=metrics)
+    try:
+        cache.record([{'id': 'abc', 'filename': 'BF01F28WDC.eaf', 'decision': 'accept'}])
+        cache.record([{'id': 'abc', 'filename': 'BF01F28WDC.eaf', 'decision': 'accept'}])
+        cache.pending(['BF01F28WDC.eaf', 'BF02F28WDC.eaf'])
+        assert metrics.counters['decision_cache_hits'] == 2
+        assert metrics.counters['decision_cache_misses'] == 2
+        assert metrics.to_json()['hit_rates']['decision_cache'] == 0.5
+    finally:
+        cache.close()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for the packed per-file frame archive
+Run with: python -m pytest tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from frame_archive import FrameArchive, MAGIC
+
+def test_torn_append_falls_back_to_the_last_complete_trailer(tmp_path):
+    path = str(tmp_path / "BF01F28WDC.eaf.frames")
+    FrameArchive.write(path, {'page.json': b'{}', 'a_preview.jpg': b'jpeg' + MAGIC + b'more'})
+    complete_size = os.path.getsize(path)
+
+    # An append interrupted after its entries, before the new index and trailer
+    with open(path, 'ab') as f:
+        f.write(b'\x89PNG half a frame')
+
+    archive = FrameArchive(path)
+    assert archive.names() == {'page.json', 'a_preview.jpg'}
+    assert archive.read('a_preview.jpg') == b'jpeg' + MAGIC + b'more'
+
+    # The next append replaces the torn tail
+    archive.append({'a_full.png': b'png'})
+    assert archive.read('a_full.png') == b'png'
+    assert archive.read('page.json') == b'{}'
+    assert os.path.getsize(path) > complete_size
+    archive.close()
+
+def test_closed_archive_maps_again_on_read(tmp_path):
+    path = str(tmp_path / "BF01F28WDC.eaf.frames")
+    FrameArchive.write(path, {'page.json': b'{}'})
+    archive = FrameArchive(path)
+    assert archive.read('page.json') == b'{}'
+    archive.close()
+    assert archive.read('page.json') == b'{}'
+    archive.close()
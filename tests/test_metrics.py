@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Tests for the decision server metrics
+Run with: python -m pytest tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from metrics import Metrics
+
+def test_prometheus_escapes_annotator_labels():
+    metrics = Metrics()
+    metrics.record_decisions(1, 'j"o\\e\nx')
+    assert 'bsl_reviewer_decisions_total{annotator="j\\"o\\\\e\\nx"} 1' in metrics.to_prometheus().splitlines()
+
+def test_prometheus_counters_end_in_total():
+    metrics = Metrics()
+    metrics.increment('frame_cache_hits')
+    metrics.record_decisions(1)
+    lines = metrics.to_prometheus().splitlines()
+    assert 'bsl_frame_cache_hits_total 1' in lines
+    assert 'bsl_decisions_total 1' in lines